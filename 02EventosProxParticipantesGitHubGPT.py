@@ -10,6 +10,11 @@ Created on Wed Sep 17 12:06:59 2025
 """
 Extractor de participantes de FlowAgility - Basado en Módulo 1
 Extrae información detallada de participantes usando las URLs obtenidas del Módulo 1
+Salida reanudable: cada participante se añade a un diario JSONL
+(participantes_detallados_YYYY-MM-DD.journal.jsonl); el JSON completo solo se reescribe
+al compactar (cuando el diario alcanza JOURNAL_COMPACT_RATIO × el JSON, y al final).
+Reanudación indexada: evento → BinomIDs en memoria (O(1)) y persistido en .idx.json junto a
+cada JSON escrito; con el índice al día el JSON solo se lee si hay que tocar algún evento.
 """
 
 import os
@@ -21,11 +26,22 @@ import argparse
 import traceback
 import unicodedata
 import random
+import shutil
 from datetime import datetime
 from urllib.parse import urljoin
 from pathlib import Path
 from glob import glob
 
+import flow_cards
+import flow_lite
+import flow_ratelimit
+import flow_records
+import flow_session
+import flow_snapshots
+import flow_store
+import flow_throttle
+import flow_waits
+
 # Third-party imports
 try:
     from bs4 import BeautifulSoup
@@ -57,7 +73,7 @@ except ImportError:
 # ============================== CONFIGURACIÓN GLOBAL ==============================
 
 # Configuración base
-BASE = "https://www.flowagility.com"
+BASE = os.getenv("FLOW_BASE_URL", "https://www.flowagility.com").rstrip("/")  # p. ej. flow_liveview_fake
 EVENTS_URL = f"{BASE}/zone/events"
 SCRIPT_DIR = Path(__file__).resolve().parent
 
@@ -132,17 +148,10 @@ def _event_key(info: dict) -> str:
             or info.get('event_nombre')
             or "")
 
-def _find_existing_event(data_list, key):
-    """Devuelve (idx, ref) de evento por key, o (None, None)."""
-    for i, e in enumerate(data_list):
-        if _event_key(e.get('informacion_evento', {})) == key:
-            return i, e
-    return None, None
-
-def _load_existing_output(today_str: str):
+def _resume_candidates(today_str: str):
     """
-    Carga el JSON de salida si existe (para RESUME). Devuelve (data_list, out_path, latest_path).
-    Política:
+    Rutas de la salida para RESUME (sin leerlas). Devuelve (candidatos, out_path, latest_path).
+    Política (gana el primero que exista y sea válido):
       1) RESUME_FILE si está definido,
       2) participantes_detallados_{today}.json,
       3) participantes_detallados.json,
@@ -155,36 +164,312 @@ def _load_existing_output(today_str: str):
     if RESUME_FILE:
         candidates.append(RESUME_FILE)
     candidates.extend([out_path_today, latest_path])
+    return [c for c in candidates if c], out_path_today, latest_path
 
-    for path in candidates:
-        try:
-            if path and os.path.exists(path):
-                with open(path, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                if isinstance(data, list):
-                    return data, out_path_today, latest_path
-        except Exception:
-            pass
-    return [], out_path_today, latest_path
+def _read_output(path):
+    """Lista de eventos de un JSON de salida (filas compactadas) o None si no es válido."""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    except Exception:
+        return None
+    if not isinstance(data, list):
+        return None
+    for ev in data:
+        if isinstance(ev, dict) and isinstance(ev.get('participantes'), list):
+            ev['participantes'] = flow_records.compact_rows(ev['participantes'])
+    return data
 
 def _save_output_atomic(data_list, out_path, latest_path=None):
     """Escritura atómica: escribe a .tmp y luego reemplaza."""
     os.makedirs(os.path.dirname(out_path), exist_ok=True)
     tmp = out_path + ".tmp"
     with open(tmp, 'w', encoding='utf-8') as f:
-        json.dump(data_list, f, ensure_ascii=False, indent=2)
+        json.dump(data_list, f, ensure_ascii=False, indent=2, default=flow_records.json_default)
     os.replace(tmp, out_path)
     if latest_path:
         tmp2 = latest_path + ".tmp"
         with open(tmp2, 'w', encoding='utf-8') as f:
-            json.dump(data_list, f, ensure_ascii=False, indent=2)
+            json.dump(data_list, f, ensure_ascii=False, indent=2, default=flow_records.json_default)
         os.replace(tmp2, latest_path)
 
+def _copy_output_atomic(src, out_path, latest_path=None):
+    """Sin cambios que volcar: copia el JSON de origen a las salidas (sin parsearlo)."""
+    for dst in (out_path, latest_path):
+        if dst and os.path.abspath(dst) != os.path.abspath(src):
+            os.makedirs(os.path.dirname(dst) or ".", exist_ok=True)
+            shutil.copyfile(src, dst + ".tmp")
+            os.replace(dst + ".tmp", dst)
+
+# ---------- Índice de reanudación (evento → BinomIDs) ----------
+
+def _index_path(out_path):
+    return os.path.splitext(out_path)[0] + ".idx.json"
+
+def _file_stamp(path):
+    try:
+        st = os.stat(path)
+        return [st.st_size, st.st_mtime_ns]
+    except OSError:
+        return None
+
+class _ResumeIndex:
+    """
+    Índice de la salida para reanudar: _event_key → set de BinomID (y nombre / nº de
+    participantes por evento para el resumen). "¿Evento ya guardado?" y "¿participante
+    ya hecho?" son búsquedas O(1); se mantiene al añadir, sin volver a recorrer la lista.
+    Se persiste junto al JSON (.idx.json) con el sello (tamaño, mtime) de ese JSON.
+    Al reanudar se consulta primero el índice del archivo que realmente se carga: si su
+    sello coincide no se lee el JSON. La lista de eventos (data) se carga entera la
+    primera vez que hace falta un cuerpo: al tocar un evento, al reaplicar el diario o
+    al compactar con cambios.
+    """
+    def __init__(self, candidates):
+        self.src = None       # JSON del que se reanuda (None = salida nueva)
+        self._data = None     # lista de eventos; None = aún sin cargar
+        self.keys = []        # _event_key por posición en la lista
+        self.rows = []        # [nombre, nº participantes] por posición
+        self.first = {}       # _event_key → primera posición (gana el primero)
+        self.events = {}      # _event_key → evento (solo con la lista cargada)
+        self.bids = {}
+        for path in candidates:
+            if not os.path.exists(path):
+                continue
+            if self._load(path):
+                self.src = path
+                return
+            data = _read_output(path)
+            if data is not None:
+                self.src = path
+                self._data = data
+                self.rebuild()
+                return
+        self._data = []
+
+    @property
+    def loaded(self):
+        return self._data is not None
+
+    @property
+    def data(self):
+        if self._data is None:
+            data = _read_output(self.src)
+            if data is None:
+                raise IOError(f"No se pudo leer {self.src} para reanudar")
+            self._data = data
+            if [_event_key(e.get('informacion_evento', {})) for e in data] != self.keys:
+                self.rebuild()  # el índice no corresponde a este JSON: se rehace
+            else:
+                self.events = {key: data[pos] for key, pos in self.first.items()}
+        return self._data
+
+    def rebuild(self):
+        self.keys, self.rows, self.first, self.events, self.bids = [], [], {}, {}, {}
+        for pos, e in enumerate(self._data):
+            info = e.get('informacion_evento', {})
+            key = _event_key(info)
+            self.keys.append(key)
+            self.rows.append([info.get('event_nombre', ''), len(e.get('participantes', []))])
+            if key in self.first:
+                continue  # como la búsqueda lineal de antes: gana el primero
+            self.first[key] = pos
+            self.events[key] = e
+            self.bids[key] = {p.get("BinomID") for p in e.get('participantes', []) if p.get("BinomID")}
+
+    def _load(self, path):
+        try:
+            with open(_index_path(path), encoding="utf-8") as f:
+                idx = json.load(f)
+        except (OSError, ValueError):
+            return False
+        entries = idx.get("events")
+        if idx.get("output") != _file_stamp(path) or not isinstance(entries, list):
+            return False
+        keys, rows, first, bids = [], [], {}, {}
+        for pos, entry in enumerate(entries):
+            if not isinstance(entry, list) or len(entry) != 4:
+                return False  # formato anterior (sin nombre/nº): se rehace leyendo el JSON
+            key, ev_bids, nombre, n = entry
+            keys.append(key)
+            rows.append([nombre, n])
+            if key not in first:
+                first[key] = pos
+                bids[key] = set(ev_bids)
+        self.keys, self.rows, self.first, self.bids = keys, rows, first, bids
+        return True
+
+    def save(self, out_path):
+        """Tras escribir el JSON: guarda a su lado el índice con el sello de ese JSON."""
+        idx = {
+            "output": _file_stamp(out_path),
+            "events": [[key, sorted(self.bids.get(key, ())) if self.first.get(key) == pos else [], *row]
+                       for pos, (key, row) in enumerate(zip(self.keys, self.rows))],
+        }
+        path = _index_path(out_path)
+        with open(path + ".tmp", 'w', encoding='utf-8') as f:
+            json.dump(idx, f, ensure_ascii=False, separators=(",", ":"))
+        os.replace(path + ".tmp", path)
+
+    def has(self, key):
+        return key in self.first
+
+    def event(self, key):
+        """Cuerpo del evento (carga la lista si aún no lo estaba)."""
+        if key not in self.first:
+            return None
+        self.data
+        return self.events[key]
+
+    def add_event(self, key, ev):
+        data = self.data
+        if key not in self.first:
+            self.first[key] = len(data)
+            self.events[key] = ev
+            self.bids[key] = set()
+        data.append(ev)
+        self.keys.append(key)
+        self.rows.append([ev.get('informacion_evento', {}).get('event_nombre', ''), len(ev.get('participantes', []))])
+        return ev
+
+    def update_info(self, key, info):
+        """Actualiza informacion_evento del evento y devuelve el dict resultante."""
+        ev = self.event(key)
+        ev['informacion_evento'].update(info)
+        self.rows[self.first[key]][0] = ev['informacion_evento'].get('event_nombre', '')
+        return ev['informacion_evento']
+
+    def done_bids(self, key):
+        """Set vivo de BinomID del evento (pertenencia O(1))."""
+        return self.bids.setdefault(key, set())
+
+    def count(self, key):
+        return self.rows[self.first[key]][1] if key in self.first else 0
+
+    def add(self, key, row):
+        """Añade la fila si su BinomID no estaba. Devuelve False si ya existía."""
+        bid = row.get("BinomID")
+        seen = self.done_bids(key)
+        if bid and bid in seen:
+            return False
+        ev = self.event(key)
+        if bid:
+            seen.add(bid)
+        ev['participantes'].append(row)
+        self.rows[self.first[key]][1] += 1
+        return True
+
+    def totals(self):
+        """(nº eventos, nº participantes, [(nombre, nº)] ordenado de mayor a menor) sin cargar la lista."""
+        ranked = sorted(((nombre, n) for nombre, n in self.rows), key=lambda t: t[1], reverse=True)
+        return len(self.rows), sum(n for _, n in self.rows), ranked
+
+# ---------- Diario JSONL (solo añadir) + compactación ----------
+
+def _journal_path(out_path):
+    return os.path.splitext(out_path)[0] + ".journal.jsonl"
+
+class _Journal:
+    """
+    Diario solo-añadir de la salida de participantes: una línea por participante y
+    marcas de evento ('event' al abrirlo, 'done' al cerrarlo). compact() vuelca la lista
+    completa al JSON (fechado + latest) y vacía el diario. Se compacta cuando el diario
+    pesa JOURNAL_COMPACT_RATIO × el último JSON escrito: bytes escritos lineales.
+    """
+    def __init__(self, path, sync_every=10, ratio=1.0, min_bytes=256 * 1024):
+        self.path = path
+        self.sync_every = max(1, sync_every)
+        self.ratio = ratio
+        self.min_bytes = min_bytes
+        self.pending = 0
+        self.base_bytes = 0
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.fh = open(path, "a", encoding="utf-8")
+        if self.fh.tell() > 0:
+            self.fh.write("\n")  # por si la última línea quedó cortada (la línea vacía se ignora)
+
+    def _append(self, rec):
+        self.fh.write(json.dumps(rec, ensure_ascii=False, default=flow_records.json_default) + "\n")
+        self.pending += 1
+        if self.pending >= self.sync_every:
+            self.sync()
+
+    def sync(self):
+        self.fh.flush()
+        os.fsync(self.fh.fileno())
+        self.pending = 0
+
+    def event(self, key, info):
+        self._append({"t": "event", "key": key, "info": info})
+
+    def participant(self, key, row):
+        self._append({"t": "p", "key": key, "row": row})
+
+    def done(self, key, info):
+        self._append({"t": "done", "key": key, "info": info})
+        self.sync()
+
+    def due(self):
+        return self.fh.tell() >= max(self.min_bytes, self.base_bytes * self.ratio)
+
+    def compact(self, index, out_path, latest_path=None):
+        self.sync()
+        if index.loaded:
+            _save_output_atomic(index.data, out_path, latest_path)
+        else:
+            # Lista sin cargar = sin cambios: basta copiar el JSON del que se reanudó
+            _copy_output_atomic(index.src, out_path, latest_path)
+        self.base_bytes = os.path.getsize(out_path)
+        for path in (out_path, latest_path):
+            if path:
+                index.save(path)
+        # El JSON ya lo contiene todo: se vacía el diario (y los de otros días ya volcados)
+        self.fh.close()
+        self.fh = open(self.path, "w", encoding="utf-8")
+        for old in glob(os.path.join(os.path.dirname(self.path) or ".", "participantes_detallados*.journal.jsonl")):
+            if os.path.abspath(old) != os.path.abspath(self.path):
+                try:
+                    os.remove(old)
+                except OSError:
+                    pass
+
+    def close(self):
+        try:
+            self.sync()
+            self.fh.close()
+        except Exception:
+            pass
+
+def _replay_journals(index, out_path):
+    """
+    Reaplica sobre la salida (vía su índice) los diarios pendientes, de más antiguo a más
+    reciente. Idempotente: un BinomID ya presente en el evento no se duplica.
+    Devuelve nº de registros aplicados.
+    """
+    paths = glob(os.path.join(os.path.dirname(out_path) or ".", "participantes_detallados*.journal.jsonl"))
+    n = 0
+    for path in sorted(paths, key=os.path.getmtime):
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    rec = json.loads(line)
+                except ValueError:
+                    continue  # última línea cortada por una parada brusca
+                key = rec.get("key", "")
+                if not index.has(key):
+                    index.add_event(key, {'informacion_evento': dict(rec.get("info") or {}), 'participantes': []})
+                if rec.get("t") == "p":
+                    if not index.add(key, flow_records.GitHubRow.from_dict(rec.get("row") or {})):
+                        continue
+                else:
+                    index.update_info(key, rec.get("info") or {})
+                n += 1
+    return n
+
 # ============================== FUNCIONES DE NAVEGACIÓN ==============================
 
 #  Aqui instalacion de Chomdriver para GitHub # 😊✨😊✨😊✨😊. Esto hay que quitarlo en Spyder y poner el siguiente
-def _get_driver(headless=True):
-    #Crea y configura el driver de Selenium
+def _get_driver(headless=True, capture_network=False):
+    #Crea y configura el driver de Selenium (capture_network: performance log CDP con frames websocket)
     if not HAS_SELENIUM:
         raise ImportError("Selenium no está instalado")
     
@@ -211,6 +496,10 @@ def _get_driver(headless=True):
     # Configuración adicional para evitar detección
     opts.add_experimental_option("excludeSwitches", ["enable-automation"])
     opts.add_experimental_option('useAutomationExtension', False)
+
+    if capture_network:
+        flow_cdp.enable_performance_log(opts)
+    flow_lite.apply_options(opts)
     
     try:
         # USAR CHROME Y CHROMEDRIVER INSTALADOS CORRECTAMENTE
@@ -239,6 +528,8 @@ def _get_driver(headless=True):
         # Ejecutar script para evitar detección
         driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
         
+        flow_lite.activate(driver)
+
         driver.set_page_load_timeout(90)
         driver.implicitly_wait(30)
         return driver
@@ -251,6 +542,10 @@ def _get_driver(headless=True):
         return None
 
 def _login(driver):
+    """Login con caché de sesión compartida (flow_session); formulario solo si hace falta."""
+    return flow_session.login(driver, _form_login, BASE, FLOW_EMAIL, log=log)
+
+def _form_login(driver):
     #Inicia sesión en FlowAgility
     if not driver:
         return False
@@ -468,12 +763,11 @@ def _full_scroll(driver):
     #Scroll completo para cargar todos los elementos
     last_height = driver.execute_script("return document.body.scrollHeight")
     for _ in range(MAX_SCROLLS):
-        driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-        time.sleep(SCROLL_WAIT_S)
-        new_height = driver.execute_script("return document.body.scrollHeight")
-        if new_height == last_height:
+        # SCROLL_WAIT_S es ahora el máximo: se sigue en cuanto la página crece
+        grown = flow_waits.scroll_and_wait_growth(driver, SCROLL_WAIT_S, height=last_height, label="full_scroll")
+        if not grown:
             break
-        last_height = new_height
+        last_height = grown["h"]
 #  Hasta Aqui instalacion de Chomdriver para GitHub # 😊✨😊✨😊✨😊. Esto hay que quitarlo en Spyder y poner el siguiente
 
 
@@ -497,10 +791,12 @@ def extract_events(limit: int | None = None):
             raise Exception("No se pudo iniciar sesión")
         
         log("Navegando a la página de eventos...")
+        flow_ratelimit.acquire("page")
         driver.get(EVENTS_URL)
         WebDriverWait(driver, 30).until(
             EC.presence_of_element_located((By.TAG_NAME, "body"))
         )
+        flow_lite.record(driver, "events")
         
         _accept_cookies(driver)
         
@@ -509,77 +805,13 @@ def extract_events(limit: int | None = None):
         slow_pause(2, 3)
         
         page_html = driver.page_source
-        soup = BeautifulSoup(page_html, 'html.parser')
-        
-        event_containers = soup.find_all('div', class_='group mb-6')
+        event_containers = flow_cards.card_elements(page_html)
         log(f"Encontrados {len(event_containers)} contenedores de eventos")
         
         events = []
         for i, container in enumerate(event_containers, 1):
             try:
-                event_data = {}
-                
-                event_id = container.get('id', '')
-                if event_id:
-                    event_data['id'] = event_id.replace('event-card-', '')
-                
-                name_elem = container.find('div', class_='font-caption text-lg text-black truncate -mt-1')
-                if name_elem:
-                    event_data['nombre'] = _clean(name_elem.get_text())
-                
-                date_elem = container.find('div', class_='text-xs')
-                if date_elem:
-                    event_data['fechas'] = _clean(date_elem.get_text())
-                
-                org_elems = container.find_all('div', class_='text-xs')
-                if len(org_elems) > 1:
-                    event_data['organizacion'] = _clean(org_elems[1].get_text())
-                
-                club_elem = container.find('div', class_='text-xs mb-0.5 mt-0.5')
-                if club_elem:
-                    event_data['club'] = _clean(club_elem.get_text())
-                else:
-                    for div in container.find_all('div', class_='text-xs'):
-                        text = _clean(div.get_text())
-                        if text and not any(x in text for x in ['/', 'Spain', 'España']):
-                            event_data['club'] = text
-                            break
-                
-                location_divs = container.find_all('div', class_='text-xs')
-                for div in location_divs:
-                    text = _clean(div.get_text())
-                    if '/' in text and any(x in text for x in ['Spain', 'España', 'Madrid', 'Barcelona']):
-                        event_data['lugar'] = text
-                        break
-                
-                if 'lugar' not in event_data:
-                    for div in location_divs:
-                        text = _clean(div.get_text())
-                        if '/' in text and len(text) < 100:
-                            event_data['lugar'] = text
-                            break
-                
-                event_data['enlaces'] = {}
-                
-                info_link = container.find('a', href=lambda x: x and '/info/' in x)
-                if info_link:
-                    event_data['enlaces']['info'] = urljoin(BASE, info_link['href'])
-                
-                participant_links = container.find_all('a', href=lambda x: x and any(term in x for term in ['/participants', '/participantes']))
-                for link in participant_links:
-                    href = link.get('href', '')
-                    if '/participants_list' in href or '/participantes' in href:
-                        event_data['enlaces']['participantes'] = urljoin(BASE, href)
-                        break
-                
-                if 'participantes' not in event_data['enlaces'] and 'id' in event_data:
-                    event_data['enlaces']['participantes'] = f"{BASE}/zone/events/{event_data['id']}/participants_list"
-                
-                flag_elem = container.find('div', class_='text-md')
-                if flag_elem:
-                    event_data['pais_bandera'] = _clean(flag_elem.get_text())
-                else:
-                    event_data['pais_bandera'] = '🇪🇸'
+                event_data = flow_cards.parse_card(container, BASE, _clean)
                 
                 events.append(event_data)
                 log(f"✅ Evento {i} procesado: {event_data.get('nombre', 'Sin nombre')}")
@@ -606,6 +838,7 @@ def extract_events(limit: int | None = None):
         latest_file = os.path.join(OUT_DIR, '01events.json')
         with open(latest_file, 'w', encoding='utf-8') as f:
             json.dump(events, f, ensure_ascii=False, indent=2)
+        flow_store.save_events(events)
         
         log(f"✅ Extracción completada. {len(events)} eventos guardados en {output_file}")
         
@@ -634,11 +867,37 @@ THROTTLE_PAGE_MIN_S    = float(os.getenv("THROTTLE_PAGE_MIN_S", "1.2"))
 THROTTLE_PAGE_MAX_S    = float(os.getenv("THROTTLE_PAGE_MAX_S", "2.5"))
 THROTTLE_TOGGLE_MIN_S  = float(os.getenv("THROTTLE_TOGGLE_MIN_S", "0.9"))
 THROTTLE_TOGGLE_MAX_S  = float(os.getenv("THROTTLE_TOGGLE_MAX_S", "2.2"))
-AUTO_SAVE_EVERY        = int(os.getenv("AUTO_SAVE_EVERY", "10"))       # guarda cada N participantes nuevos
+THROTTLE_RPM           = int(os.getenv("THROTTLE_RPM", "60"))            # techo de peticiones/minuto
+
+# Pausas adaptativas (AIMD) partiendo de los rangos fijos; THROTTLE_MODE=fixed = comportamiento anterior
+THROTTLE = flow_throttle.Throttle({
+    "page":   (THROTTLE_PAGE_MIN_S, THROTTLE_PAGE_MAX_S),
+    "toggle": (THROTTLE_TOGGLE_MIN_S, THROTTLE_TOGGLE_MAX_S),
+    "event":  (THROTTLE_EVENT_S, THROTTLE_EVENT_S + 0.8),
+}, rpm=THROTTLE_RPM)
+AUTO_SAVE_EVERY        = int(os.getenv("AUTO_SAVE_EVERY", "10"))       # fsync del diario cada N participantes nuevos
+JOURNAL_COMPACT_RATIO  = float(os.getenv("JOURNAL_COMPACT_RATIO", "1.0"))  # compacta si diario >= ratio × JSON
 
 RESUME                 = os.getenv("RESUME", "true").lower() == "true" # lee destino y continúa
 RESUME_FILE            = os.getenv("RESUME_FILE", "").strip()          # si vacío, autodetecta
 
+# Motor de detalle: "selenium" (clicks en Chrome), "liveview" (websocket directo, sin clicks)
+# o "cdp" (clicks en Chrome, datos leídos de los frames LiveView del performance log)
+PARTICIPANTS_ENGINE    = os.getenv("PARTICIPANTS_ENGINE", "selenium").strip().lower()
+LIVEVIEW_PANEL_MAX_S   = float(os.getenv("LIVEVIEW_PANEL_MAX_S", "8"))
+
+try:
+    import flow_liveview
+    HAS_LIVEVIEW = flow_liveview.HAS_REQUESTS and flow_liveview.HAS_WEBSOCKET
+except ImportError:
+    HAS_LIVEVIEW = False
+
+try:
+    import flow_cdp
+    HAS_CDP = True
+except ImportError:
+    HAS_CDP = False
+
 
 
 
@@ -683,13 +942,29 @@ def _click_toggle_by_pid(driver, pid, By, WebDriverWait, EC):
             btn = driver.find_element(By.CSS_SELECTOR, sel)
             driver.execute_script("arguments[0].scrollIntoView({block:'center'});", btn)
             driver.execute_script("arguments[0].click();", btn)
-            WebDriverWait(driver, 8).until(lambda d: d.find_element(By.ID, pid))
-            return driver.find_element(By.ID, pid)
+            block = flow_waits.wait_element_id(driver, pid, 8, label="toggle_block")
+            if block is not None:
+                return block
+            raise TimeoutException(f"Sin bloque para {pid}")
         except Exception:
             time.sleep(0.4)
             driver.execute_script("window.scrollBy(0, 160);")
     return None
 
+def _click_toggle_js(driver, pid):
+    """Click en el toggle sin esperar al DOM (el panel llega por los frames CDP)."""
+    try:
+        return bool(driver.execute_script("""
+            const btn = document.querySelector(
+              "[phx-click='booking_details_show'][phx-value-booking_id='" + CSS.escape(arguments[0]) + "']");
+            if (!btn) return false;
+            btn.scrollIntoView({block: 'center'});
+            btn.click();
+            return true;
+        """, pid))
+    except Exception:
+        return False
+
 # 3) Mapper JS rico (extrae campos + hasta 6 bloques Día/Fecha/Mangas)
 JS_MAP_PARTICIPANT_RICH = r"""
 const pid = arguments[0];
@@ -799,7 +1074,78 @@ def _fallback_map_participant(driver, pid, By):
         })
     return {"fields": fields, "schedule": schedule}
 
-# 5) Función principal del Módulo 2 (usa LIMIT_EVENTS si está definido)
+# 5) Payload {fields, schedule} → fila de salida (común a Selenium y LiveView)
+def _payload_to_row(pid, payload):
+    fields = (payload.get("fields") or {})
+    schedule = (payload.get("schedule") or [])
+
+    def pick(keys, default=""):
+        for k in keys:
+            v = fields.get(k)
+            if v:
+                return _clean(v)
+        return default
+
+    row = {
+        "BinomID": pid,
+        "Dorsal": pick(["Dorsal"]),
+        "Guía": pick(["Guía","Guia"]),
+        "Perro": pick(["Perro"]),
+        "Raza": pick(["Raza"]),
+        "Edad": pick(["Edad"]),
+        "Género": pick(["Género","Genero"]),
+        "Altura (cm)": pick(["Altura (cm)","Altura"]),
+        "Nombre de Pedigree": pick(["Nombre de Pedigree","Nombre de Pedrigree"]),
+        "País": pick(["País","Pais"]),
+        "Licencia": pick(["Licencia"]),
+        "Club": pick(["Club"]),
+        "Federación": pick(["Federación","Federacion"]),
+        "Equipo": pick(["Equipo"]),
+    }
+    # Registro compacto (flow_records): Día/Fecha/Mangas 1..6 como tupla, cadenas repetidas internadas
+    days = [(_clean(b["day"]), _clean(b["fecha"]), _clean(b["mangas"])) for b in schedule[:6]]
+    return flow_records.GitHubRow(row, days)
+
+# 5b) HTML del panel para el archivo de snapshots (SNAPSHOTS=1, ver flow_snapshots)
+def _panel_snapshot_html(driver, lv, tap, pid):
+    try:
+        if lv is not None:
+            return lv.panel_html(pid)
+        html = tap.panel_html(pid) if tap is not None else ""
+        return html or driver.execute_script(
+            "const e = document.getElementById(arguments[0]); return e ? e.outerHTML : '';", pid) or ""
+    except Exception:
+        return ""
+
+# 6) Motor LiveView: se une al participants_list por websocket con las cookies del driver
+def _open_liveview(driver, plist):
+    """Devuelve un LiveViewClient conectado (relogin una vez si la sesión caducó) o None."""
+    for attempt in range(2):
+        lv = flow_liveview.LiveViewClient(
+            plist,
+            cookies=driver.get_cookies(),
+            user_agent=driver.execute_script("return navigator.userAgent"),
+            panel_timeout=LIVEVIEW_PANEL_MAX_S,
+            bilingual=False,
+        )
+        try:
+            return lv.connect()
+        except flow_liveview.LiveViewLoginRequired:
+            lv.close()
+            if attempt == 0:
+                log("Sesión caducada (LiveView); reintentando login…")
+                THROTTLE.penalize()
+                if _login(driver):
+                    continue
+            log("No se pudo relogar, salto evento.")
+            return None
+        except Exception as e:
+            lv.close()
+            log(f"⚠️  LiveView no disponible ({e})")
+            return None
+    return None
+
+# 7) Función principal del Módulo 2 (usa LIMIT_EVENTS si está definido)
 def extract_participants_info():
     """Extrae info detallada de participantes con cortesía (lenta) y reanudación segura."""
     if not HAS_SELENIUM:
@@ -829,22 +1175,45 @@ def extract_participants_info():
 
     # 2) Cargar/crear salida (para RESUME)
     today_str = datetime.now().strftime("%Y-%m-%d")
-    existing_list, out_path, latest_path = _load_existing_output(today_str)
+    candidates, out_path, latest_path = _resume_candidates(today_str)
     log(f"🗂️  Archivo de trabajo: {out_path}")
-    if existing_list:
-        log(f"♻️  Reanudación activada: {len(existing_list)} eventos ya guardados")
+    resume = _ResumeIndex(candidates)
+    replayed = _replay_journals(resume, out_path)
+    if replayed:
+        log(f"📓 Diario reaplicado: {replayed} registros pendientes de compactar")
+    if resume.keys:
+        log(f"♻️  Reanudación activada: {len(resume.keys)} eventos ya guardados ({resume.src}, "
+            f"{'cargado' if resume.loaded else 'solo índice'})")
+    journal = _Journal(_journal_path(out_path), sync_every=AUTO_SAVE_EVERY, ratio=JOURNAL_COMPACT_RATIO)
+    if os.path.exists(out_path):
+        journal.base_bytes = os.path.getsize(out_path)
+
+    engine = PARTICIPANTS_ENGINE
+    if engine == "liveview" and not HAS_LIVEVIEW:
+        log("⚠️  PARTICIPANTS_ENGINE=liveview requiere requests + websocket-client; uso selenium")
+        engine = "selenium"
+    if engine == "cdp" and not HAS_CDP:
+        log("⚠️  PARTICIPANTS_ENGINE=cdp requiere lxml; uso selenium")
+        engine = "selenium"
+    log(f"🔧 Motor de participantes: {engine}")
 
     # 3) Driver y login
-    driver = _get_driver(headless=HEADLESS)
+    driver = _get_driver(headless=HEADLESS, capture_network=(engine == "cdp"))
     if not driver:
         log("❌ No se pudo crear el driver de Chrome")
         return None
 
+    tap = None
+    if engine == "cdp":
+        # Mismo criterio de etiquetas que JS_MAP_PARTICIPANT_RICH de este módulo (solo ES)
+        tap = flow_cdp.LiveViewFrameTap(flow_cdp.PerfLogPump(driver), bilingual=False)
+
     try:
         if not _login(driver):
             raise Exception("No se pudo iniciar sesión")
 
         # 4) Procesar eventos
+        lv = None
         for i, event in enumerate(events, 1):
             try:
                 plist = (event.get('enlaces') or {}).get('participantes')
@@ -857,7 +1226,7 @@ def extract_participants_info():
                     polite_pause(1.2, 1.8)
                     continue
 
-                # Preparar estructura en existing_list para RESUME
+                # Preparar estructura en la salida para RESUME (el cuerpo solo se carga si se toca)
                 target_info = {
                     'event_id': event.get('id', ''),
                     'event_nombre': event.get('nombre', ''),
@@ -867,20 +1236,18 @@ def extract_participants_info():
                     'event_url_participantes': plist,
                 }
                 ekey = _event_key(target_info)
-                idx, existing_event = _find_existing_event(existing_list, ekey)
-                if existing_event is None:
-                    existing_event = {
+                if not resume.has(ekey):
+                    new_event = resume.add_event(ekey, {
                         'informacion_evento': {
                             **target_info,
                             'total_participantes': 0,
                             'timestamp_extraccion': datetime.now().isoformat()
                         },
                         'participantes': []
-                    }
-                    existing_list.append(existing_event)
-                    idx = len(existing_list) - 1
+                    })
+                    journal.event(ekey, new_event['informacion_evento'])
 
-                processed_bids = {p.get("BinomID") for p in existing_event.get('participantes', []) if p.get("BinomID")}
+                processed_bids = resume.done_bids(ekey)
                 already = len(processed_bids)
 
                 log(f"Procesando participantes {i}/{len(events)}: {event.get('nombre','(sin nombre)')}")
@@ -889,52 +1256,66 @@ def extract_participants_info():
                     log(f"  ♻️  Reanudación: {already} participantes ya guardados, continuaré desde el siguiente.")
 
                 # 5) Abrir lista y esperar toggles
-                driver.get(plist)
-                WebDriverWait(driver, 30).until(EC.presence_of_element_located((By.TAG_NAME, "body")))
-                _accept_cookies(driver)
-                polite_pause()  # cortesía tras cargar página
-
-                # Detectar estado básico
-                state = "timeout"
-                t0 = time.time()
-                while time.time() - t0 < 25:
-                    if "/user/login" in (driver.current_url or ""):
-                        state = "login"; break
-                    if driver.find_elements(By.CSS_SELECTOR, "[phx-click='booking_details_show']"):
-                        state = "ok"; break
-                    if driver.find_elements(By.XPATH, "//p[contains(., 'No hay') or contains(., 'No results')]"):
-                        state = "empty"; break
-                    time.sleep(0.25)
-
-                if state == "login":
-                    log("Sesión caducada; reintentando login…")
-                    if not _login(driver):
-                        log("No se pudo relogar, salto evento.")
-                        polite_pause()
+                lv = None
+                t_page = time.time()
+                if engine == "liveview":
+                    flow_ratelimit.acquire("page")
+                    lv = _open_liveview(driver, plist)
+                    if lv is None:
+                        THROTTLE.observe("page", time.time() - t_page, ok=False)
+                        THROTTLE.pause("page")
                         continue
+                    state = "ok" if lv.booking_ids() else "empty"
+                    THROTTLE.observe("page", time.time() - t_page)
+                else:
+                    flow_ratelimit.acquire("page")
                     driver.get(plist)
-                    WebDriverWait(driver, 25).until(EC.presence_of_element_located((By.TAG_NAME, "body")))
-                    polite_pause(0.8, 1.5)
+                    WebDriverWait(driver, 30).until(EC.presence_of_element_located((By.TAG_NAME, "body")))
+                    flow_lite.record(driver, "participants_list")
+                    _accept_cookies(driver)
+
+                    # Detectar estado básico (login / ok / empty / timeout) sin sondeo
+                    state = flow_waits.wait_list_state(driver, 25)
+                    THROTTLE.observe("page", time.time() - t_page, ok=state in ("ok", "empty"))
+                    THROTTLE.pause("page")  # cortesía tras cargar página
+
+                    if state == "login":
+                        log("Sesión caducada; reintentando login…")
+                        THROTTLE.penalize()
+                        if not _login(driver):
+                            log("No se pudo relogar, salto evento.")
+                            polite_pause()
+                            continue
+                        driver.get(plist)
+                        WebDriverWait(driver, 25).until(EC.presence_of_element_located((By.TAG_NAME, "body")))
+                        polite_pause(0.8, 1.5)
 
                 if state == "empty":
                     log("participants_list sin participantes.")
-                    existing_event['informacion_evento'].update({
-                        'total_participantes': len(existing_event['participantes']),
+                    if lv is not None:
+                        lv.close()
+                    info = resume.update_info(ekey, {
+                        'total_participantes': resume.count(ekey),
                         'timestamp_extraccion': datetime.now().isoformat()
                     })
-                    _save_output_atomic(existing_list, out_path, latest_path)
-                    polite_pause(THROTTLE_EVENT_S, THROTTLE_EVENT_S + 0.6)
+                    journal.done(ekey, info)
+                    THROTTLE.pause("event")
                     continue
 
                 # 6) Recoger booking_ids
-                booking_ids = _collect_booking_ids(driver)
+                booking_ids = lv.booking_ids() if lv is not None else _collect_booking_ids(driver)
                 total = len(booking_ids)
+                if flow_snapshots.enabled():
+                    flow_snapshots.save_list("github", event, 1, lv.html() if lv is not None else driver.page_source,
+                                             url=plist)
                 log(f"  ✅ Detectados {total} participantes (toggles)")
 
                 # Si ya teníamos todos, saltamos evento
                 if total and len(processed_bids) >= total:
                     log("  ♻️  Evento completo previamente. Paso al siguiente.")
-                    polite_pause(THROTTLE_EVENT_S, THROTTLE_EVENT_S + 0.6)
+                    if lv is not None:
+                        lv.close()
+                    THROTTLE.pause("event")
                     continue
 
                 # 7) Iterar participantes con pausas y guardado incremental
@@ -943,110 +1324,108 @@ def extract_participants_info():
                     if not pid or pid in processed_bids:
                         continue
 
-                    # Desplegar bloque + esperar render
-                    block = _click_toggle_by_pid(driver, pid, By, WebDriverWait, EC)
-                    if not block:
-                        polite_pause(0.5, 1.0)
-                        continue
-
-                    # Espera a STRONG pintados (valores)
-                    painted = False
-                    end = time.time() + 12.0
-                    while time.time() < end:
-                        strongs = block.find_elements(By.XPATH, ".//div[contains(@class,'font-bold') and contains(@class,'text-sm')]")
-                        if strongs:
-                            painted = True
+                    flow_ratelimit.acquire("toggle")
+                    t_toggle = time.time()
+                    js_payload = None  # salida del JS_MAP_PARTICIPANT_RICH del navegador (paridad en reparse)
+                    if lv is not None:
+                        # LiveView: evento booking_details_show por websocket + diff decodificado
+                        try:
+                            payload = lv.open_booking(pid)
+                        except flow_liveview.LiveViewError as e:
+                            log(f"  ⚠️  LiveView: {e}")
                             break
-                        time.sleep(0.25)
-                    if not painted:
-                        polite_pause(0.6, 1.1)
-                        continue
-
-                    # 1º intento: JS map
-                    try:
-                        payload = driver.execute_script(JS_MAP_PARTICIPANT_RICH, pid)
-                    except Exception:
+                        if not payload:
+                            THROTTLE.observe("toggle", time.time() - t_toggle, ok=False)
+                            THROTTLE.pause("toggle")
+                            continue
+                    else:
                         payload = None
-                    # Fallback
-                    if not payload or not isinstance(payload, dict):
-                        payload = _fallback_map_participant(driver, pid, By)
-
-                    fields = (payload.get("fields") or {})
-                    schedule = (payload.get("schedule") or [])
-
-                    def pick(keys, default=""):
-                        for k in keys:
-                            v = fields.get(k)
-                            if v:
-                                return _clean(v)
-                        return default
-
-                    row = {
-                        "BinomID": pid,
-                        "Dorsal": pick(["Dorsal"]),
-                        "Guía": pick(["Guía","Guia"]),
-                        "Perro": pick(["Perro"]),
-                        "Raza": pick(["Raza"]),
-                        "Edad": pick(["Edad"]),
-                        "Género": pick(["Género","Genero"]),
-                        "Altura (cm)": pick(["Altura (cm)","Altura"]),
-                        "Nombre de Pedigree": pick(["Nombre de Pedigree","Nombre de Pedrigree"]),
-                        "País": pick(["País","Pais"]),
-                        "Licencia": pick(["Licencia"]),
-                        "Club": pick(["Club"]),
-                        "Federación": pick(["Federación","Federacion"]),
-                        "Equipo": pick(["Equipo"]),
-                    }
-                    for j in range(1, 7):
-                        day = schedule[j-1]["day"] if j-1 < len(schedule) else ""
-                        fec = schedule[j-1]["fecha"] if j-1 < len(schedule) else ""
-                        man = schedule[j-1]["mangas"] if j-1 < len(schedule) else ""
-                        row[f"Día {j}"]    = _clean(day)
-                        row[f"Fecha {j}"]  = _clean(fec)
-                        row[f"Mangas {j}"] = _clean(man)
-
-                    # Añadir y marcar como procesado
-                    existing_event['participantes'].append(row)
-                    processed_bids.add(pid)
+                        if tap is not None:
+                            # CDP: click en JS y lectura del diff LiveView capturado (sin DOM)
+                            if _click_toggle_js(driver, pid):
+                                payload = tap.wait_panel(pid, LIVEVIEW_PANEL_MAX_S)
+                            if payload is None:
+                                log(f"  ↩️  Sin frame LiveView para {pid}; uso DOM")
+
+                    if payload is None and lv is None:
+                        # Desplegar bloque + esperar render (respaldo DOM también para CDP:
+                        # si el click JS ya abrió el panel, no volver a pulsar el toggle)
+                        opened = driver.execute_script("return document.getElementById(arguments[0]);", pid) if tap is not None else None
+                        block = opened or _click_toggle_by_pid(driver, pid, By, WebDriverWait, EC)
+                        if not block:
+                            THROTTLE.observe("toggle", time.time() - t_toggle, ok=False)
+                            THROTTLE.pause("toggle")
+                            continue
+
+                        # Espera a STRONG pintados (valores)
+                        painted = flow_waits.wait_panel(driver, pid, 12.0, grid=False, label="painted") is not None
+                        if not painted:
+                            THROTTLE.observe("toggle", time.time() - t_toggle, ok=False)
+                            THROTTLE.pause("toggle")
+                            continue
+
+                        # 1º intento: JS map
+                        try:
+                            payload = driver.execute_script(JS_MAP_PARTICIPANT_RICH, pid)
+                        except Exception:
+                            payload = None
+                        js_payload = payload if isinstance(payload, dict) else None
+                        # Fallback
+                        if not payload or not isinstance(payload, dict):
+                            payload = _fallback_map_participant(driver, pid, By)
+
+                    THROTTLE.observe("toggle", time.time() - t_toggle)
+                    if flow_snapshots.enabled():
+                        flow_snapshots.save_panel("github", event.get('id', ''), pid,
+                                                  _panel_snapshot_html(driver, lv, tap, pid), payload=js_payload)
+                    row = _payload_to_row(pid, payload)
+
+                    # Añadir y marcar como procesado (índice: BinomID del evento)
+                    if not resume.add(ekey, row):
+                        THROTTLE.pause("toggle")
+                        continue
                     new_counter += 1
 
-                    # Guardado incremental
-                    if new_counter % AUTO_SAVE_EVERY == 0:
-                        existing_event['informacion_evento'].update({
-                            'total_participantes': len(existing_event['participantes']),
-                            'timestamp_extraccion': datetime.now().isoformat()
-                        })
-                        _save_output_atomic(existing_list, out_path, latest_path)
+                    # Guardado incremental: una línea en el diario (fsync cada AUTO_SAVE_EVERY)
+                    journal.participant(ekey, row)
+
+                    # Pausa entre toggles (adaptativa; ver flow_throttle)
+                    THROTTLE.pause("toggle")
 
-                    # Pausa entre toggles (más lenta que antes)
-                    time.sleep(random.uniform(THROTTLE_TOGGLE_MIN_S, THROTTLE_TOGGLE_MAX_S))
+                if lv is not None:
+                    lv.close()
 
                 # 8) Cierre de evento + guardado
-                existing_event['informacion_evento'].update({
+                info = resume.update_info(ekey, {
                     'event_fechas': event.get('fechas', ''),
                     'event_club':  event.get('club', ''),
                     'event_lugar': event.get('lugar', ''),
-                    'total_participantes': len(existing_event['participantes']),
+                    'total_participantes': resume.count(ekey),
                     'timestamp_extraccion': datetime.now().isoformat()
                 })
-                _save_output_atomic(existing_list, out_path, latest_path)
-                log(f"  ✅ Evento OK: {len(existing_event['participantes'])} participantes acumulados")
-                polite_pause(THROTTLE_EVENT_S, THROTTLE_EVENT_S + 0.8)  # cortesía entre eventos
+                journal.done(ekey, info)
+                flow_store.save_participants(resume.event(ekey)['participantes'], "github", info)
+                if journal.due():
+                    journal.compact(resume, out_path, latest_path)
+                log(f"  ✅ Evento OK: {resume.count(ekey)} participantes acumulados")
+                THROTTLE.pause("event")  # cortesía entre eventos
 
             except Exception as e:
                 log(f"❌ Error en evento {i}: {e}")
                 traceback.print_exc()
-                # guarda lo que haya antes de continuar
+                if lv is not None:
+                    lv.close()
+                # lo ya procesado está en el diario: basta con asegurarlo en disco
                 try:
-                    _save_output_atomic(existing_list, out_path, latest_path)
+                    journal.sync()
                 except Exception:
                     pass
                 polite_pause(THROTTLE_EVENT_S, THROTTLE_EVENT_S + 1.2)
                 continue
 
-        # 9) Resumen
-        total_events = len(existing_list)
-        total_people = sum(len(e.get('participantes', [])) for e in existing_list)
+        # 9) Compactación final + resumen
+        journal.compact(resume, out_path, latest_path)
+        total_events, total_people, ranked = resume.totals()
         log(f"✅ Guardado final en {out_path}")
         print("\n" + "="*80)
         print("RESUMEN FINAL PARTICIPANTES:")
@@ -1054,19 +1433,23 @@ def extract_participants_info():
         print(f"Eventos (presentes en archivo): {total_events}")
         print(f"Total participantes (acumulado): {total_people}")
         if total_events:
-            top = sorted(existing_list, key=lambda x: len(x.get('participantes', [])), reverse=True)[:5]
             print("\n📊 Top eventos por nº de participantes:")
-            for t in top:
-                print(f"  {t['informacion_evento'].get('event_nombre','(sin nombre)')}: {len(t.get('participantes', []))}")
+            for nombre, n in ranked[:5]:
+                print(f"  {nombre or '(sin nombre)'}: {n}")
         print("\n" + "="*80 + "\n")
+        flow_waits.report(log)
+        THROTTLE.report(log)
+        flow_ratelimit.report(log)
 
-        return existing_list
+        # Resumen (no la lista: con reanudación sin cambios ni siquiera se ha cargado)
+        return {"eventos": total_events, "participantes": total_people} if total_events else None
 
     except Exception as e:
         log(f"❌ Error global en participantes: {e}")
         traceback.print_exc()
         return None
     finally:
+        journal.close()
         try:
             driver.quit()
         except:
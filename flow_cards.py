@@ -0,0 +1,292 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+FLOWAGILITY - PARSER DE TARJETAS DE EVENTO (UNA PASADA, LXML)
+- card_elements(html): solo las tarjetas div.group.mb-6 (XPath compilado; equivale a
+  BeautifulSoup class_='group mb-6', atributo class exacto).
+- parse_card(card, base, clean): recorre los descendientes div/a de la tarjeta UNA vez,
+  limpia cada texto una sola vez y aplica las mismas reglas que el parseo BeautifulSoup
+  de siempre (fechas, organización, club, lugar, enlaces, bandera): salida idéntica.
+- 'clean' lo pone cada script (02EventosProxParticipantesGitHubGPT quita emojis).
+- Sin lxml: BeautifulSoup + SoupStrainer (solo tarjetas), mismo recorrido.
+
+Comparativa con el parseo BeautifulSoup actual sobre una página sintética:
+    python flow_cards.py bench [n_tarjetas=2000]
+"""
+
+import re
+import sys
+import time
+import unicodedata
+from urllib.parse import urljoin
+
+try:
+    import lxml.html
+    from lxml import etree
+    HAS_LXML = True
+except ImportError:
+    HAS_LXML = False
+
+from bs4 import BeautifulSoup, SoupStrainer
+
+BASE = "https://www.flowagility.com"
+
+CARD_CLASS = "group mb-6"
+NAME_CLASS = "font-caption text-lg text-black truncate -mt-1"
+CLUB_CLASS = "text-xs mb-0.5 mt-0.5"
+
+if HAS_LXML:
+    _XP_CARDS = etree.XPath(f"//div[normalize-space(@class)='{CARD_CLASS}']")
+
+
+def clean_text(s):
+    """Mismo _clean que flow_events.py."""
+    if not s:
+        return ""
+    s = str(s)
+    s = unicodedata.normalize("NFKC", s)
+    s = re.sub(r"[ \t]+", " ", s)
+    return s.strip(" \t\r\n-•*·:;")
+
+
+def card_elements(html):
+    """Tarjetas de evento de un HTML (página completa o fragmentos concatenados)."""
+    if not html:
+        return []
+    if HAS_LXML:
+        try:
+            doc = lxml.html.document_fromstring(html)
+        except ValueError:  # str con declaración de encoding
+            doc = lxml.html.document_fromstring(html.encode("utf-8"))
+        except etree.ParserError:  # documento vacío
+            return []
+        return _XP_CARDS(doc)
+    soup = BeautifulSoup(html, "html.parser", parse_only=SoupStrainer("div", class_=CARD_CLASS))
+    return soup.find_all("div", class_=CARD_CLASS)
+
+
+# ---------- acceso uniforme lxml / BeautifulSoup ----------
+
+def _is_lxml(el):
+    return HAS_LXML and isinstance(el, etree._Element)
+
+
+def _descendants(card):
+    return card.iterdescendants("div", "a") if _is_lxml(card) else card.find_all(["div", "a"])
+
+
+def _classes(el):
+    cls = el.get("class") or ""
+    return cls if isinstance(cls, list) else cls.split()
+
+
+def _text(el):
+    return el.text_content() if _is_lxml(el) else el.get_text()
+
+
+def parse_card(card, base=BASE, clean=clean_text):
+    """Tarjeta (lxml o BeautifulSoup) → dict de evento, en una sola pasada."""
+    ev = {}
+    event_id = card.get("id", "")
+    if event_id:
+        ev["id"] = event_id.replace("event-card-", "")
+
+    name_el = club_el = flag_el = None
+    info_href = part_href = None
+    xs = []  # divs .text-xs en orden de documento
+    for el in _descendants(card):
+        if (el.tag if _is_lxml(el) else el.name) == "a":
+            href = el.get("href") or ""
+            if info_href is None and "/info/" in href:
+                info_href = href
+            if part_href is None and ("/participants_list" in href or "/participantes" in href):
+                part_href = href
+            continue
+        toks = _classes(el)
+        if not toks:
+            continue
+        joined = " ".join(toks)
+        if name_el is None and joined == NAME_CLASS:
+            name_el = el
+        if "text-xs" in toks:
+            xs.append(el)
+            if club_el is None and joined == CLUB_CLASS:
+                club_el = el
+        if flag_el is None and "text-md" in toks:
+            flag_el = el
+
+    if name_el is not None:
+        ev["nombre"] = clean(_text(name_el))
+
+    texts = [clean(_text(el)) for el in xs]
+    if texts:
+        ev["fechas"] = texts[0]
+    if len(texts) > 1:
+        ev["organizacion"] = texts[1]
+
+    if club_el is not None:
+        ev["club"] = texts[xs.index(club_el)]
+    else:
+        for t in texts:
+            if t and not any(x in t for x in ["/", "Spain", "España"]):
+                ev["club"] = t; break
+
+    for t in texts:
+        if "/" in t and any(x in t for x in ["Spain", "España", "Madrid", "Barcelona"]):
+            ev["lugar"] = t; break
+    if "lugar" not in ev:
+        for t in texts:
+            if "/" in t and len(t) < 100:
+                ev["lugar"] = t; break
+
+    ev["enlaces"] = {}
+    if info_href is not None:
+        ev["enlaces"]["info"] = urljoin(base, info_href)
+    if part_href is not None:
+        ev["enlaces"]["participantes"] = urljoin(base, part_href)
+    elif "id" in ev:
+        ev["enlaces"]["participantes"] = f"{base}/zone/events/{ev['id']}/participants_list"
+
+    ev["pais_bandera"] = clean(_text(flag_el)) if flag_el is not None else "🇪🇸"
+    return ev
+
+
+def parse_cards(html, base=BASE, clean=clean_text):
+    """Todas las tarjetas de 'html' → lista de eventos (sin control de errores por tarjeta)."""
+    return [parse_card(c, base, clean) for c in card_elements(html)]
+
+
+# ---------------------------------------------------------------------------
+# Benchmark: parser actual (BeautifulSoup html.parser + find_all) vs este
+# ---------------------------------------------------------------------------
+
+_CARD_TEMPLATES = [
+    """<div class="group mb-6" id="event-card-{uid}"><div class="flex">
+  <div class="text-md">🇪🇸</div>
+  <div><div class="font-caption text-lg text-black truncate -mt-1">  Trofeo {i} &amp; Open  </div>
+  <div class="text-xs">{d:02d}/03/2025 - {d2:02d}/03/2025</div>
+  <div class="text-xs">Real Sociedad Canina {i}</div>
+  <div class="text-xs mb-0.5 mt-0.5">Club Agility {i}</div>
+  <div class="text-xs">Alcobendas / Madrid, Spain</div></div>
+  <a href="/zone/events/{uid}/info/general">Info</a>
+  <a href="/zone/events/{uid}/participants_list">Participantes</a>
+</div></div>""",
+    """<div class="group mb-6" id="event-card-{uid}">
+  <div class="font-caption text-lg text-black truncate -mt-1">Copa {i}</div>
+  <div class="text-xs">{d:02d}/04/2025</div>
+  <div class="text-xs">- Federación {i} -</div>
+  <div class="text-xs">Lisboa / Portugal</div>
+  <a href="https://www.flowagility.com/zone/events/{uid}/participantes">Inscritos</a>
+</div>""",
+    """<div class="group mb-6" id="event-card-{uid}">
+  <div class="font-caption text-lg text-black truncate -mt-1">Liga {i}</div>
+  <div class="text-xs">{d:02d}/05/2025</div>
+  <div class="text-md">🇫🇷</div>
+</div>""",
+]
+
+
+def synthetic_page(n=2000):
+    cards = []
+    for i in range(n):
+        tpl = _CARD_TEMPLATES[i % len(_CARD_TEMPLATES)]
+        cards.append(tpl.format(uid=f"{i:08x}-aaaa-bbbb-cccc-{i:012d}", i=i, d=i % 28 + 1, d2=i % 28 + 2))
+    return ("<html><head><title>Eventos</title></head><body><div id='events'>"
+            + "\n".join(cards) + "</div><footer class='text-xs'>© Flow</footer></body></html>")
+
+
+def _legacy_parse_card(c, base, _clean):
+    """Parseo anterior (find/find_all por campo) tal cual, como referencia del benchmark."""
+    ev = {}
+    event_id = c.get('id', '')
+    if event_id:
+        ev['id'] = event_id.replace('event-card-', '')
+
+    name_elem = c.find('div', class_='font-caption text-lg text-black truncate -mt-1')
+    if name_elem:
+        ev['nombre'] = _clean(name_elem.get_text())
+
+    date_elem = c.find('div', class_='text-xs')
+    if date_elem:
+        ev['fechas'] = _clean(date_elem.get_text())
+
+    org_elems = c.find_all('div', class_='text-xs')
+    if len(org_elems) > 1:
+        ev['organizacion'] = _clean(org_elems[1].get_text())
+
+    club_elem = c.find('div', class_='text-xs mb-0.5 mt-0.5')
+    if club_elem:
+        ev['club'] = _clean(club_elem.get_text())
+    else:
+        for d in c.find_all('div', class_='text-xs'):
+            t = _clean(d.get_text())
+            if t and not any(x in t for x in ['/', 'Spain', 'España']):
+                ev['club'] = t; break
+
+    location_divs = c.find_all('div', class_='text-xs')
+    for d in location_divs:
+        t = _clean(d.get_text())
+        if '/' in t and any(x in t for x in ['Spain', 'España', 'Madrid', 'Barcelona']):
+            ev['lugar'] = t; break
+    if 'lugar' not in ev:
+        for d in location_divs:
+            t = _clean(d.get_text())
+            if '/' in t and len(t) < 100:
+                ev['lugar'] = t; break
+
+    ev['enlaces'] = {}
+    info_link = c.find('a', href=lambda x: x and '/info/' in x)
+    if info_link:
+        ev['enlaces']['info'] = urljoin(base, info_link['href'])
+
+    participant_links = c.find_all('a', href=lambda x: x and any(term in x for term in ['/participants', '/participantes']))
+    for lk in participant_links:
+        href = lk.get('href', '')
+        if '/participants_list' in href or '/participantes' in href:
+            ev['enlaces']['participantes'] = urljoin(base, href); break
+    if 'participantes' not in ev['enlaces'] and 'id' in ev:
+        ev['enlaces']['participantes'] = f"{base}/zone/events/{ev['id']}/participants_list"
+
+    flag_elem = c.find('div', class_='text-md')
+    ev['pais_bandera'] = _clean(flag_elem.get_text()) if flag_elem else '🇪🇸'
+    return ev
+
+
+def bench(n=2000, repeat=3):
+    html = synthetic_page(n)
+
+    def old():
+        soup = BeautifulSoup(html, "html.parser")
+        return [_legacy_parse_card(c, BASE, clean_text) for c in soup.find_all("div", class_=CARD_CLASS)]
+
+    def new():
+        return parse_cards(html, BASE, clean_text)
+
+    ref, got = old(), new()
+    if ref != got:
+        diff = next(i for i, (a, b) in enumerate(zip(ref, got)) if a != b) if len(ref) == len(got) else None
+        print(f"❌ Salidas distintas ({len(ref)} vs {len(got)}); primera diferencia en {diff}")
+        return False
+
+    def best(fn):
+        times = []
+        for _ in range(repeat):
+            t0 = time.perf_counter()
+            fn()
+            times.append(time.perf_counter() - t0)
+        return min(times)
+
+    t_old, t_new = best(old), best(new)
+    print(f"📊 {n} tarjetas ({len(html) / 1024:.0f} KB), mejor de {repeat}:")
+    print(f"   BeautifulSoup html.parser: {t_old * 1000:8.1f} ms")
+    print(f"   flow_cards ({'lxml' if HAS_LXML else 'bs4'}):        {t_new * 1000:8.1f} ms  (x{t_old / t_new:.1f})")
+    print("✅ Salida idéntica campo a campo")
+    return True
+
+
+if __name__ == "__main__":
+    if len(sys.argv) >= 2 and sys.argv[1] == "bench":
+        sys.exit(0 if bench(int(sys.argv[2]) if len(sys.argv) > 2 else 2000) else 1)
+    print("Uso: python flow_cards.py bench [n_tarjetas]")
+    sys.exit(2)
@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+FLOWAGILITY - CAPTURA DE RED VÍA CDP (PERFORMANCE LOG DE CHROME)
+- enable_performance_log(opts): activa 'goog:loggingPrefs' performance con eventos Network.
+- PerfLogPump: vacía driver.get_log("performance") una sola vez y reparte cada evento CDP
+  a todos los oyentes suscritos (el log se consume al leerlo, así que hay un único lector).
+- LiveViewFrameTap: sigue los frames del websocket de LiveView (phx_join, phx_reply, diff),
+  mantiene el árbol 'rendered' con flow_liveview.Rendered y mapea el panel de un booking_id
+  directamente desde los payloads, sin leer el DOM.
+"""
+
+import json
+import time
+
+from lxml import html as lxml_html
+
+import flow_liveview
+
+WS_METHODS = frozenset([
+    "Network.webSocketCreated",
+    "Network.webSocketClosed",
+    "Network.webSocketFrameSent",
+    "Network.webSocketFrameReceived",
+])
+
+
+def enable_performance_log(opts):
+    """Configura Options de Chrome para registrar eventos Network en el performance log."""
+    opts.set_capability("goog:loggingPrefs", {"performance": "ALL"})
+    opts.add_experimental_option("perfLoggingPrefs", {"enableNetwork": True, "enablePage": False})
+    return opts
+
+
+class PerfLogPump:
+    """Lector único del performance log; reparte (method, params) a los oyentes."""
+
+    def __init__(self, driver):
+        self.driver = driver
+        self.listeners = []
+
+    def subscribe(self, fn, methods=None):
+        self.listeners.append((frozenset(methods) if methods else None, fn))
+
+    def drain(self):
+        """Lee lo acumulado en el log y lo despacha. Devuelve nº de entradas leídas."""
+        try:
+            entries = self.driver.get_log("performance")
+        except Exception:
+            return 0
+        for entry in entries:
+            try:
+                msg = json.loads(entry["message"])["message"]
+            except (KeyError, TypeError, ValueError):
+                continue
+            method = msg.get("method", "")
+            params = msg.get("params") or {}
+            for methods, fn in self.listeners:
+                if methods is None or method in methods:
+                    fn(method, params)
+        return len(entries)
+
+
+class LiveViewFrameTap:
+    """Reconstruye los LiveView de la página a partir de los frames del websocket."""
+
+    def __init__(self, pump, socket_hint="/live/websocket", bilingual=True, poll_s=0.1):
+        self.pump = pump
+        self.socket_hint = socket_hint
+        self.bilingual = bilingual
+        self.poll_s = poll_s
+        self.sockets = set()      # requestId de sockets LiveView
+        self.joins = {}           # (requestId, ref) -> topic de un phx_join pendiente
+        self.views = {}           # topic -> Rendered
+        self.view_socket = {}     # topic -> requestId
+        self._docs = {}           # topic -> documento lxml (cache)
+        self.frames = 0
+        pump.subscribe(self._on_event, WS_METHODS)
+
+    # ---------- frames ----------
+
+    def _on_event(self, method, params):
+        rid = params.get("requestId")
+        if method == "Network.webSocketCreated":
+            if self.socket_hint in (params.get("url") or ""):
+                self.sockets.add(rid)
+            return
+        if method == "Network.webSocketClosed":
+            self.sockets.discard(rid)
+            for topic in [t for t, r in self.view_socket.items() if r == rid]:
+                self._drop(topic)
+            return
+        if rid not in self.sockets:
+            return
+
+        data = (params.get("response") or {}).get("payloadData")
+        try:
+            msg = json.loads(data)
+        except (TypeError, ValueError):
+            return
+        if not isinstance(msg, list) or len(msg) != 5:
+            return
+        self.frames += 1
+        _join_ref, ref, topic, event, payload = msg
+
+        if method == "Network.webSocketFrameSent":
+            if event == "phx_join":
+                self._drop(topic)
+                self.joins[(rid, ref)] = topic
+            return
+
+        if event == "phx_reply":
+            resp = (payload or {}).get("response") or {}
+            if self.joins.pop((rid, ref), None) is not None:
+                if (payload or {}).get("status") == "ok" and resp.get("rendered"):
+                    self.views[topic] = flow_liveview.Rendered(resp["rendered"])
+                    self.view_socket[topic] = rid
+                    self._docs.pop(topic, None)
+            elif resp.get("diff"):
+                self._apply(topic, resp["diff"])
+        elif event == "diff":
+            self._apply(topic, payload)
+
+    def _apply(self, topic, diff):
+        view = self.views.get(topic)
+        if view is not None and diff:
+            view.merge(diff)
+            self._docs.pop(topic, None)
+
+    def _drop(self, topic):
+        self.views.pop(topic, None)
+        self.view_socket.pop(topic, None)
+        self._docs.pop(topic, None)
+
+    # ---------- consulta ----------
+
+    def _document(self, topic):
+        doc = self._docs.get(topic)
+        if doc is None:
+            html = self.views[topic].to_html() or "<div></div>"
+            doc = self._docs[topic] = lxml_html.fromstring(html)
+        return doc
+
+    def panel_element(self, pid):
+        for topic in list(self.views):
+            el = flow_liveview.find_by_id(self._document(topic), pid)
+            if flow_liveview.panel_ready(el):
+                return el
+        return None
+
+    def panel_html(self, pid):
+        el = self.panel_element(pid)
+        return lxml_html.tostring(el, encoding="unicode") if el is not None else ""
+
+    def wait_panel(self, pid, timeout):
+        """
+        Espera a que los frames recibidos contengan el panel de 'pid' y devuelve
+        {fields, schedule}; None si no llega en 'timeout' (el llamador usa el DOM).
+        """
+        end = time.time() + timeout
+        while True:
+            self.pump.drain()
+            el = self.panel_element(pid)
+            if el is not None:
+                return flow_liveview.map_participant_rich(el, pid, bilingual=self.bilingual)
+            if time.time() >= end:
+                return None
+            time.sleep(self.poll_s)
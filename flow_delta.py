@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+FLOWAGILITY - DELTA DE PARTICIPANTES ENTRE EJECUCIONES
+- Compara 02participants.json con el de la ejecución anterior por (event_id, BinomID)
+  y escribe 02participants_delta.json:
+    version       contador que sube en cada delta (el anterior se lee de la base)
+    added         registros nuevos completos
+    removed       [{event_id, BinomID}] que ya no aparecen
+    changed       [{event_id, BinomID, set: {campo: valor}, unset: [campos]}]
+    events        event_id con algún cambio (para subir solo sus 02p_<id>.json)
+- Sin base (primera ejecución) todo va en 'added' con "full": true.
+- apply_delta(base, delta) reconstruye la lista nueva: lo que haría un consumidor.
+
+    python flow_delta.py [--new output/02participants.json] [--prev output/prev]
+                         [--out output/02participants_delta.json] [--rotate]
+
+--prev es un directorio con la base (02participants.json o .json.gz) y el delta
+anterior (02participants_delta.json[.gz], para la versión). --rotate copia la salida
+nueva como base de la próxima ejecución (uso local; en Actions la base se descarga).
+"""
+
+import os
+import sys
+import json
+import gzip
+import shutil
+import argparse
+from datetime import datetime
+from pathlib import Path
+
+from flow_store import _binom_id
+
+# Campos que no describen al participante (solo aparecen con DEBUG_PARTICIPANTS)
+IGNORED_FIELDS = ("raw_panel_html",)
+
+
+def _load(path):
+    """JSON o JSON.gz; None si no existe o no se puede leer."""
+    for p in (Path(path), Path(str(path) + ".gz")):
+        if not p.exists():
+            continue
+        try:
+            opener = gzip.open if p.suffix == ".gz" else open
+            with opener(p, "rt", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"⚠️ No se pudo leer {p}: {e}")
+            return None
+    return None
+
+
+def record_key(r):
+    return (str(r.get("event_id") or ""), _binom_id(r))
+
+
+def _strip(r):
+    return {k: v for k, v in r.items() if k not in IGNORED_FIELDS}
+
+
+def _index(records):
+    """(event_id, BinomID) → registro (gana el último, como al re-procesar un evento)."""
+    return {record_key(r): _strip(r) for r in records or [] if isinstance(r, dict)}
+
+
+def diff(prev, new, prev_version=0):
+    new_ix = _index(new)
+    full = prev is None
+    prev_ix = {} if full else _index(prev)
+
+    added, removed, changed, events = [], [], [], set()
+    for key, rec in new_ix.items():
+        old = prev_ix.get(key)
+        if old is None:
+            added.append(rec)
+            events.add(key[0])
+        elif old != rec:
+            upd = {k: v for k, v in rec.items() if k not in old or old[k] != v}
+            gone = [k for k in old if k not in rec]
+            changed.append({"event_id": key[0], "BinomID": key[1], "set": upd, "unset": gone})
+            events.add(key[0])
+    for key in prev_ix:
+        if key not in new_ix:
+            removed.append({"event_id": key[0], "BinomID": key[1]})
+            events.add(key[0])
+
+    return {
+        "version": prev_version + 1,
+        "base_version": prev_version,
+        "full": full,
+        "generated_at": datetime.now().isoformat(timespec="seconds"),
+        "base_count": len(prev_ix),
+        "count": len(new_ix),
+        "events": sorted(events),
+        "added": added,
+        "removed": removed,
+        "changed": changed,
+    }
+
+
+def apply_delta(base, delta):
+    """Aplica un delta sobre la lista base → lista nueva (orden: base y luego añadidos)."""
+    ix = {} if delta.get("full") else _index(base)
+    for r in delta.get("removed", []):
+        ix.pop((r["event_id"], r["BinomID"]), None)
+    for c in delta.get("changed", []):
+        rec = ix.get((c["event_id"], c["BinomID"]))
+        if rec is not None:
+            rec.update(c.get("set", {}))
+            for k in c.get("unset", []):
+                rec.pop(k, None)
+    for r in delta.get("added", []):
+        ix[record_key(r)] = dict(r)
+    return list(ix.values())
+
+
+def _write_json(path, data):
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, separators=(",", ":"))
+    os.replace(tmp, path)
+
+
+def run(new_path, prev_dir, out_path, rotate=False):
+    new = _load(new_path)
+    if not isinstance(new, list):
+        print(f"❌ No hay participantes en {new_path}")
+        return False
+    prev_dir = Path(prev_dir)
+    prev = _load(prev_dir / "02participants.json")
+    if prev is not None and not isinstance(prev, list):
+        prev = None
+    prev_delta = _load(prev_dir / "02participants_delta.json") or {}
+    delta = diff(prev, new, int(prev_delta.get("version") or 0))
+    _write_json(out_path, delta)
+
+    size = os.path.getsize(out_path)
+    kind = "completo (sin base)" if delta["full"] else f"sobre la v{delta['base_version']}"
+    print(f"✅ Delta v{delta['version']} {kind}: +{len(delta['added'])} "
+          f"-{len(delta['removed'])} ~{len(delta['changed'])} en {len(delta['events'])} eventos "
+          f"→ {out_path} ({size / 1024:.1f} KB)")
+
+    if rotate:
+        prev_dir.mkdir(parents=True, exist_ok=True)
+        shutil.copyfile(new_path, prev_dir / "02participants.json")
+        shutil.copyfile(out_path, prev_dir / "02participants_delta.json")
+    return True
+
+
+def main():
+    out_dir = Path(os.getenv("OUT_DIR", "./output"))
+    ap = argparse.ArgumentParser(description="Delta de 02participants.json frente a la ejecución anterior")
+    ap.add_argument("--new", default=str(out_dir / "02participants.json"), help="Salida nueva")
+    ap.add_argument("--prev", default=str(out_dir / "prev"), help="Directorio con la base anterior")
+    ap.add_argument("--out", default=str(out_dir / "02participants_delta.json"), help="Fichero delta")
+    ap.add_argument("--rotate", action="store_true", help="Deja la salida nueva como base siguiente")
+    args = ap.parse_args()
+    return run(args.new, args.prev, args.out, args.rotate)
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
@@ -4,7 +4,9 @@
 """
 FLOWAGILITY SCRAPER - SOLO EVENTOS (01events)
 - Login
-- Scroll completo y parseo estático con BeautifulSoup
+- Scroll completo y parseo de tarjetas en una pasada (flow_cards, lxml)
+- EVENTS_ENGINE=http: sin navegador; sesión HTTP (pool) con la cookie de login,
+  listado + paginación / "cargar más" (LiveView) y el mismo parseo de tarjetas
 - Salida: 01events.json y 01events_YYYY-MM-DD.json en OUT_DIR
 """
 
@@ -48,6 +50,28 @@ try:
 except ImportError:
     HAS_WEBDRIVER_MANAGER = False
 
+import flow_cards
+import flow_lite
+import flow_ratelimit
+import flow_session
+import flow_snapshots
+import flow_store
+import flow_waits
+
+try:
+    import requests
+    from requests.adapters import HTTPAdapter
+    from urllib3.util.retry import Retry
+    HAS_REQUESTS = True
+except ImportError:
+    HAS_REQUESTS = False
+
+try:
+    import flow_liveview
+    HAS_LIVEVIEW = flow_liveview.HAS_WEBSOCKET
+except ImportError:
+    HAS_LIVEVIEW = False
+
 # ============================== CONFIGURACIÓN GLOBAL ==============================
 
 BASE = "https://www.flowagility.com"
@@ -71,8 +95,12 @@ INCOGNITO      = os.getenv("INCOGNITO", "true").lower() == "true"
 MAX_SCROLLS    = int(os.getenv("MAX_SCROLLS", "15"))
 SCROLL_WAIT_S  = float(os.getenv("SCROLL_WAIT_S", "3.0"))
 OUT_DIR        = os.getenv("OUT_DIR", "./output")
+EVENTS_ENGINE  = os.getenv("EVENTS_ENGINE", "selenium").strip().lower()  # selenium | http
+HTTP_POOL_SIZE = int(os.getenv("HTTP_POOL_SIZE", "4"))
+HTTP_TIMEOUT_S = float(os.getenv("HTTP_TIMEOUT_S", "45"))
+CHROME_UA      = os.getenv("CHROME_UA", "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36")
 
-print(f"📋 Configuración: HEADLESS={HEADLESS}, OUT_DIR={OUT_DIR}")
+print(f"📋 Configuración: HEADLESS={HEADLESS}, OUT_DIR={OUT_DIR}, EVENTS_ENGINE={EVENTS_ENGINE}")
 
 # ============================== UTILIDADES ==============================
 
@@ -111,11 +139,12 @@ def _get_driver(headless=True):
     opts.add_argument("--disable-setuid-sandbox")
     opts.add_argument("--ignore-certificate-errors")
     opts.add_argument("--window-size=1920,1080")
-    ua = os.getenv("CHROME_UA", "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36")
-    opts.add_argument(f"--user-agent={ua}")
+    opts.add_argument(f"--user-agent={CHROME_UA}")
     opts.add_experimental_option("excludeSwitches", ["enable-automation"])
     opts.add_experimental_option('useAutomationExtension', False)
 
+    flow_lite.apply_options(opts)
+
     chrome_bin = os.getenv("CHROME_BIN")
     if chrome_bin and os.path.exists(chrome_bin):
         opts.binary_location = chrome_bin
@@ -138,6 +167,8 @@ def _get_driver(headless=True):
         # Anti-detección básica
         driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
 
+        flow_lite.activate(driver)
+
         # Timeouts
         driver.set_page_load_timeout(75)
         driver.implicitly_wait(2)
@@ -148,6 +179,10 @@ def _get_driver(headless=True):
         return None
 
 def _login(driver):
+    """Login con caché de sesión compartida (flow_session); formulario solo si hace falta."""
+    return flow_session.login(driver, _form_login, BASE, FLOW_EMAIL, log=log)
+
+def _form_login(driver):
     """Login clásico, con varios selectores."""
     if not driver:
         return False
@@ -263,19 +298,116 @@ def _accept_cookies(driver):
         log(f"Error manejando cookies: {e}")
         return False
 
-def _full_scroll(driver):
-    last_h = driver.execute_script("return document.body.scrollHeight")
-    for _ in range(MAX_SCROLLS):
-        driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-        time.sleep(SCROLL_WAIT_S)
-        new_h = driver.execute_script("return document.body.scrollHeight")
-        if new_h == last_h:
+# Devuelve solo las tarjetas aún no cosechadas (las marca con data-flow-harvested) y el total.
+# Mismo criterio que BeautifulSoup class_='group mb-6': atributo class exacto.
+JS_HARVEST_NEW_CARDS = r"""
+const nodes = document.querySelectorAll("div.group.mb-6");
+const all = Array.from(nodes).filter(el => el.getAttribute("class") === "group mb-6");
+const fresh = [];
+for (const el of all){
+  if (el.dataset.flowHarvested) continue;
+  el.dataset.flowHarvested = "1";
+  fresh.push({ id: el.id || "", html: el.outerHTML });
+}
+return { cards: fresh, total: nodes.length };
+"""
+
+def _harvest_new_cards(driver, seen):
+    """Una cosecha: eventos de las tarjetas nuevas (en orden de página) y nº total de tarjetas."""
+    res = driver.execute_script(JS_HARVEST_NEW_CARDS) or {}
+    fresh = []
+    # Un solo parseo para todas las tarjetas nuevas del paso
+    html = "".join(card.get("html") or "" for card in res.get("cards") or [])
+    flow_snapshots.save_cards("events", html)
+    for card in flow_cards.card_elements(html):
+        cid = card.get("id", "")
+        if cid and cid in seen:
+            continue
+        try:
+            ev = flow_cards.parse_card(card, BASE, _clean)
+        except Exception as e:
+            log(f"❌ Error procesando tarjeta {cid or '(sin id)'}: {e}")
+            continue
+        if cid:
+            seen.add(cid)
+        fresh.append(ev)
+    return fresh, res.get("total") or 0
+
+def iter_event_cards(driver):
+    """
+    Generador de eventos durante el scroll infinito: tras cada paso cosecha por JS solo
+    las tarjetas nuevas y las entrega al momento; para en cuanto un scroll no trae ids nuevos.
+    No serializa page_source ni parsea la página completa.
+    """
+    seen = set()
+    n = 0
+    for step in range(MAX_SCROLLS + 1):
+        fresh, total = _harvest_new_cards(driver, seen)
+        for ev in fresh:
+            n += 1
+            log(f"✅ Evento {n} procesado: {ev.get('nombre', 'Sin nombre')}")
+            yield ev
+        if step == MAX_SCROLLS or (step > 0 and not fresh):
+            break
+        # SCROLL_WAIT_S es el máximo: se sigue en cuanto aparecen tarjetas nuevas
+        grown = flow_waits.scroll_and_wait_growth(
+            driver, SCROLL_WAIT_S, selector="div.group.mb-6", count=total, label="cards_scroll")
+        if not grown:
+            # Última cosecha por si algo llegó justo al vencer la espera
+            for ev in _harvest_new_cards(driver, seen)[0]:
+                n += 1
+                log(f"✅ Evento {n} procesado: {ev.get('nombre', 'Sin nombre')}")
+                yield ev
             break
-        last_h = new_h
 
 # ============================== EXTRACCIÓN DE EVENTOS ==============================
 
+def _parse_event_cards(page_html, events=None, seen_ids=None):
+    """
+    Parsea las tarjetas de un HTML y las añade a 'events' (sin repetir id).
+    Devuelve el nº de eventos nuevos añadidos.
+    """
+    events = [] if events is None else events
+    seen_ids = set() if seen_ids is None else seen_ids
+    flow_snapshots.save_cards("events", page_html)
+
+    event_containers = flow_cards.card_elements(page_html)
+    log(f"Encontrados {len(event_containers)} contenedores de eventos")
+
+    added = 0
+    for c in event_containers:
+        cid = c.get('id', '')
+        if cid and cid in seen_ids:
+            continue
+        i = len(events) + 1
+        try:
+            ev = flow_cards.parse_card(c, BASE, _clean)
+            events.append(ev)
+            if cid:
+                seen_ids.add(cid)
+            added += 1
+            log(f"✅ Evento {i} procesado: {ev.get('nombre', 'Sin nombre')}")
+        except Exception as e:
+            log(f"❌ Error procesando evento {i}: {e}")
+            continue
+    return added
+
+def _save_events(events):
+    today_str = datetime.now().strftime("%Y-%m-%d")
+    os.makedirs(OUT_DIR, exist_ok=True)
+    with open(os.path.join(OUT_DIR, f'01events_{today_str}.json'), 'w', encoding='utf-8') as f:
+        json.dump(events, f, ensure_ascii=False, indent=2)
+    with open(os.path.join(OUT_DIR, '01events.json'), 'w', encoding='utf-8') as f:
+        json.dump(events, f, ensure_ascii=False, indent=2)
+    flow_store.save_events(events)
+
 def extract_events():
+    if EVENTS_ENGINE == "http":
+        events = extract_events_http()
+        if events:
+            return events
+        log("⚠️ Motor HTTP sin resultados; vuelvo a Selenium")
+
     if not HAS_SELENIUM:
         log("Error: Selenium no está instalado"); return None
 
@@ -289,88 +421,15 @@ def extract_events():
             raise Exception("No se pudo iniciar sesión")
 
         log("Navegando a la página de eventos…")
+        flow_ratelimit.acquire("page")
         driver.get(EVENTS_URL)
         WebDriverWait(driver, 25).until(EC.presence_of_element_located((By.TAG_NAME, "body")))
+        flow_lite.record(driver, "events")
         _accept_cookies(driver)
 
-        log("Cargando todos los eventos…")
-        _full_scroll(driver)
-        slow_pause(1.5, 2.5)
-
-        page_html = driver.page_source
-        soup = BeautifulSoup(page_html, 'html.parser')
-
-        event_containers = soup.find_all('div', class_='group mb-6')
-        log(f"Encontrados {len(event_containers)} contenedores de eventos")
-
-        events = []
-        for i, c in enumerate(event_containers, 1):
-            try:
-                ev = {}
-                event_id = c.get('id', '')
-                if event_id:
-                    ev['id'] = event_id.replace('event-card-', '')
-
-                name_elem = c.find('div', class_='font-caption text-lg text-black truncate -mt-1')
-                if name_elem:
-                    ev['nombre'] = _clean(name_elem.get_text())
-
-                date_elem = c.find('div', class_='text-xs')
-                if date_elem:
-                    ev['fechas'] = _clean(date_elem.get_text())
-
-                org_elems = c.find_all('div', class_='text-xs')
-                if len(org_elems) > 1:
-                    ev['organizacion'] = _clean(org_elems[1].get_text())
-
-                club_elem = c.find('div', class_='text-xs mb-0.5 mt-0.5')
-                if club_elem:
-                    ev['club'] = _clean(club_elem.get_text())
-                else:
-                    for d in c.find_all('div', class_='text-xs'):
-                        t = _clean(d.get_text())
-                        if t and not any(x in t for x in ['/', 'Spain', 'España']):
-                            ev['club'] = t; break
-
-                location_divs = c.find_all('div', class_='text-xs')
-                for d in location_divs:
-                    t = _clean(d.get_text())
-                    if '/' in t and any(x in t for x in ['Spain', 'España', 'Madrid', 'Barcelona']):
-                        ev['lugar'] = t; break
-                if 'lugar' not in ev:
-                    for d in location_divs:
-                        t = _clean(d.get_text())
-                        if '/' in t and len(t) < 100:
-                            ev['lugar'] = t; break
-
-                ev['enlaces'] = {}
-                info_link = c.find('a', href=lambda x: x and '/info/' in x)
-                if info_link:
-                    ev['enlaces']['info'] = urljoin(BASE, info_link['href'])
-
-                participant_links = c.find_all('a', href=lambda x: x and any(term in x for term in ['/participants', '/participantes']))
-                for lk in participant_links:
-                    href = lk.get('href', '')
-                    if '/participants_list' in href or '/participantes' in href:
-                        ev['enlaces']['participantes'] = urljoin(BASE, href); break
-                if 'participantes' not in ev['enlaces'] and 'id' in ev:
-                    ev['enlaces']['participantes'] = f"{BASE}/zone/events/{ev['id']}/participants_list"
-
-                flag_elem = c.find('div', class_='text-md')
-                ev['pais_bandera'] = _clean(flag_elem.get_text()) if flag_elem else '🇪🇸'
-
-                events.append(ev)
-                log(f"✅ Evento {i} procesado: {ev.get('nombre', 'Sin nombre')}")
-            except Exception as e:
-                log(f"❌ Error procesando evento {i}: {e}")
-                continue
-
-        today_str = datetime.now().strftime("%Y-%m-%d")
-        os.makedirs(OUT_DIR, exist_ok=True)
-        with open(os.path.join(OUT_DIR, f'01events_{today_str}.json'), 'w', encoding='utf-8') as f:
-            json.dump(events, f, ensure_ascii=False, indent=2)
-        with open(os.path.join(OUT_DIR, '01events.json'), 'w', encoding='utf-8') as f:
-            json.dump(events, f, ensure_ascii=False, indent=2)
+        log("Cargando todos los eventos (cosecha incremental)…")
+        events = list(iter_event_cards(driver))
+        _save_events(events)
 
         log(f"✅ Extracción completada. {len(events)} eventos guardados")
         return events
@@ -385,6 +444,213 @@ def extract_events():
         except:
             pass
 
+# ============================== MOTOR HTTP (SIN NAVEGADOR) ==============================
+
+def _http_session():
+    """Sesión requests con pool de conexiones keep-alive y reintentos en GET."""
+    s = requests.Session()
+    retry = Retry(total=3, backoff_factor=1.0, status_forcelist=(429, 500, 502, 503, 504),
+                  allowed_methods=("GET",))
+    adapter = HTTPAdapter(pool_connections=HTTP_POOL_SIZE, pool_maxsize=HTTP_POOL_SIZE, max_retries=retry)
+    s.mount("https://", adapter)
+    s.mount("http://", adapter)
+    s.headers.update({
+        "User-Agent": CHROME_UA,
+        "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+        "Accept-Language": "es-ES,es;q=0.9,en;q=0.8",
+    })
+    return s
+
+def _http_login(session):
+    """
+    Login HTTP con la caché de flow_session: comprobación, formulario y guardado bajo
+    store.lock(), como el login con driver (un solo worker rellena el formulario).
+    Deja la cookie de sesión en 'session'.
+    """
+    store = flow_session.SessionStore(BASE, FLOW_EMAIL)
+    with store.lock():
+        cached = store.load()
+        if cached and store.is_valid(cached):
+            for c in cached:
+                session.cookies.set(c["name"], c["value"], domain=c.get("domain"), path=c.get("path", "/"))
+            log("🍪 Sesión HTTP reutilizada desde caché")
+            return True
+        if not _http_form_login(session):
+            return False
+        try:
+            store.save([{"name": c.name, "value": c.value, "domain": c.domain, "path": c.path,
+                         "secure": bool(c.secure), "expiry": c.expires} for c in session.cookies])
+        except OSError:
+            pass
+        return True
+
+def _http_form_login(session):
+    """Login por formulario (POST con _csrf_token)."""
+    flow_ratelimit.acquire("page")
+    r = session.get(f"{BASE}/user/login", timeout=HTTP_TIMEOUT_S)
+    r.raise_for_status()
+    if "/user/login" not in r.url:
+        log("Ya autenticado (redirección detectada)")
+        return True
+    if not FLOW_EMAIL or not FLOW_PASS:
+        log("❌ Faltan credenciales FLOW_EMAIL/FLOW_PASS"); return False
+
+    soup = BeautifulSoup(r.text, 'html.parser')
+    form = None
+    for f in soup.find_all('form'):
+        if f.find('input', attrs={'type': 'password'}):
+            form = f; break
+    if form is None:
+        log("❌ No se encontró formulario de login"); return False
+
+    data = {}
+    for inp in form.find_all('input'):
+        name = inp.get('name')
+        if not name:
+            continue
+        if inp.get('type') in ('checkbox', 'radio') and not inp.has_attr('checked'):
+            continue
+        data[name] = inp.get('value', '')
+    for name in list(data):
+        if 'email' in name:
+            data[name] = FLOW_EMAIL
+        elif 'password' in name:
+            data[name] = FLOW_PASS
+    if '_csrf_token' not in data:
+        meta = soup.find('meta', attrs={'name': 'csrf-token'})
+        if meta:
+            data['_csrf_token'] = meta.get('content', '')
+
+    action = urljoin(r.url, form.get('action') or '/user/login')
+    flow_ratelimit.acquire("page")
+    r = session.post(action, data=data, timeout=HTTP_TIMEOUT_S, headers={"Referer": r.url})
+    if "/user/login" in r.url:
+        log("❌ Login HTTP falló - aún en página de login")
+        return False
+    log(f"✅ Login HTTP exitoso - {r.url}")
+    return True
+
+def _next_page_url(page_html, current_url):
+    """Enlace a la página siguiente (rel=next o ?page=N+1), si existe."""
+    soup = BeautifulSoup(page_html, 'html.parser')
+    a = soup.find('a', attrs={'rel': 'next'}, href=True)
+    if a:
+        return urljoin(current_url, a['href'])
+    m = re.search(r"[?&]page=(\d+)", current_url)
+    nxt = (int(m.group(1)) if m else 1) + 1
+    for a in soup.find_all('a', href=True):
+        if re.search(rf"[?&]page={nxt}(?:&|$)", a['href']):
+            return urljoin(current_url, a['href'])
+    return None
+
+def _load_more_binding(page_html):
+    """
+    Detecta el disparador de "cargar más" del LiveView:
+    phx-viewport-bottom (scroll infinito) o un botón phx-click de cargar más.
+    Devuelve (evento, tipo, valores, cid) o None.
+    """
+    soup = BeautifulSoup(page_html, 'html.parser')
+    el = soup.find(attrs={'phx-viewport-bottom': True})
+    if el:
+        return el['phx-viewport-bottom'], "hook", {}, None
+    for el in soup.find_all(attrs={'phx-click': True}):
+        ev = el.get('phx-click', '')
+        label = _clean(el.get_text()).lower()
+        if ev.startswith('[') or ev == 'booking_details_show':
+            continue
+        if re.search(r"load|more|next|cargar|más|mas", f"{ev} {label}"):
+            values = {k[len('phx-value-'):]: v for k, v in el.attrs.items() if k.startswith('phx-value-')}
+            target = (el.get('phx-target') or '').strip()
+            return ev, "click", values, (int(target) if target.isdigit() else None)
+    return None
+
+def _http_session_from_driver(driver):
+    """Sesión HTTP que reutiliza las cookies del navegador ya autenticado (sin segundo login)."""
+    session = _http_session()
+    for c in driver.get_cookies():
+        session.cookies.set(c["name"], c["value"], domain=c.get("domain") or "", path=c.get("path", "/"))
+    return session
+
+def iter_events_http(session):
+    """
+    Generador de eventos por HTTP con una sesión ya autenticada: entrega las tarjetas
+    de cada página / "cargar más" en cuanto se parsean, sin esperar al listado completo.
+    """
+    flow_ratelimit.acquire("page")
+    r = session.get(EVENTS_URL, timeout=HTTP_TIMEOUT_S)
+    r.raise_for_status()
+    if "/user/login" in r.url:
+        raise Exception("Sesión no válida al pedir eventos")
+
+    events, seen = [], set()
+    _parse_event_cards(r.text, events, seen)
+    yield from events
+
+    # 1) Paginación clásica (?page=N)
+    page_html, page_url, visited = r.text, r.url, {r.url}
+    for _ in range(MAX_SCROLLS):
+        nxt = _next_page_url(page_html, page_url)
+        if not nxt or nxt in visited:
+            break
+        visited.add(nxt)
+        flow_ratelimit.acquire("page")
+        rp = session.get(nxt, timeout=HTTP_TIMEOUT_S)
+        rp.raise_for_status()
+        page_html, page_url = rp.text, rp.url
+        n = len(events)
+        if not _parse_event_cards(page_html, events, seen):
+            break
+        yield from events[n:]
+
+    # 2) "Cargar más" del LiveView: se empuja el evento por websocket hasta que no haya tarjetas nuevas
+    binding = _load_more_binding(r.text)
+    if binding and HAS_LIVEVIEW:
+        event, kind, values, cid = binding
+        log(f"Cargando más eventos vía LiveView ({event})…")
+        lv = flow_liveview.LiveViewClient(EVENTS_URL, session=session, timeout=HTTP_TIMEOUT_S)
+        try:
+            lv.connect()
+            n = len(events)
+            _parse_event_cards(lv.html(), events, seen)
+            yield from events[n:]
+            for _ in range(MAX_SCROLLS):
+                flow_ratelimit.acquire("page")
+                lv.push_event(event, values, cid=cid, type_=kind)
+                n = len(events)
+                if not _parse_event_cards(lv.html(), events, seen):
+                    break
+                yield from events[n:]
+        finally:
+            lv.close()
+    elif binding:
+        log("⚠️ Hay 'cargar más' pero falta websocket-client; solo primera página")
+
+def extract_events_http():
+    """Listado de eventos sin navegador: mismo 01events.json que el motor Selenium."""
+    if not HAS_REQUESTS:
+        log("⚠️ EVENTS_ENGINE=http requiere 'requests'"); return None
+
+    log("=== EXTRACCIÓN DE EVENTOS (01events) · HTTP ===")
+    t0 = time.time()
+    session = _http_session()
+    try:
+        if not _http_login(session):
+            return None
+
+        events = list(iter_events_http(session))
+        if not events:
+            return None
+        _save_events(events)
+        log(f"✅ Extracción HTTP completada. {len(events)} eventos guardados en {time.time() - t0:.1f}s")
+        return events
+
+    except Exception as e:
+        log(f"❌ Error en extracción HTTP de eventos: {e}")
+        traceback.print_exc()
+        return None
+    finally:
+        session.close()
+
 # ============================== MAIN ==============================
 
 def main():
@@ -396,6 +662,7 @@ def main():
 
     try:
         events = extract_events()
+        flow_waits.report(log)
         ok = bool(events)
         if ok:
             print(f"\n📁 ARCHIVOS GENERADOS EN {OUT_DIR}:")
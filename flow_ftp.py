@@ -0,0 +1,431 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+FLOWAGILITY - SUBIDA FTPS CON CONEXIONES REUTILIZADAS Y EN PARALELO
+- FTP_WORKERS conexiones de control FTPS (TLS + PROT P) abiertas una vez y reutilizadas:
+  un solo handshake por conexión, no uno por fichero como con curl.
+- Directorios remotos creados una vez por ejecución (caché compartida).
+- Reintentos con reconexión; si una transferencia se corta, el reintento continúa desde
+  el tamaño remoto (REST), solo si esos bytes los subió esta misma ejecución (si no, el
+  remoto es la copia anterior y se sube entero). Tamaño verificado (SIZE) al final.
+- Guiado por el manifiesto (flow_manifest): 'sync' sube solo lo que cambió respecto al
+  manifiesto remoto y, si todo fue bien, sube manifest.json el último.
+- Informe de rendimiento: ficheros/s y MB/s.
+
+    python flow_ftp.py sync [patrón ...] [--remote-manifest output/prev/manifest.json] [--merge]
+                            [--also 02participants.json.gz ...]   # estos se suben siempre
+    python flow_ftp.py put  LOCAL[=REMOTO] ...      # rutas remotas relativas al directorio base
+    python flow_ftp.py get  REMOTO=LOCAL ...        # descargas opcionales (no falla si no existe)
+    python flow_ftp.py selftest [--files N] [--kb K] # contra un servidor pyftpdlib local
+
+Variables: FTP_SERVER (host[:puerto]), FTP_USERNAME, FTP_PASSWORD, FTP_REMOTE_DIR,
+FTP_SUBDIR (Competiciones/EventosProx/Flow/data), FTP_TLS (1), FTP_WORKERS (4),
+FTP_RETRIES (3), FTP_TIMEOUT_S (60).
+"""
+
+import os
+import sys
+import time
+import queue
+import ftplib
+import socket
+import argparse
+import tempfile
+import threading
+import posixpath
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+
+import flow_manifest
+
+BLOCK = 64 * 1024
+DEFAULT_SUBDIR = "Competiciones/EventosProx/Flow/data"
+_NET_ERRORS = ftplib.all_errors + (socket.timeout,)  # all_errors ya incluye OSError y EOFError
+
+
+class FtpConfig:
+    def __init__(self, host, user, password, base_dir="/", port=21, tls=True, timeout=60.0):
+        self.host = host
+        self.port = port
+        self.user = user
+        self.password = password
+        self.base_dir = "/" + base_dir.strip("/") if base_dir.strip("/") else "/"
+        self.tls = tls
+        self.timeout = timeout
+
+    @classmethod
+    def from_env(cls):
+        server = os.getenv("FTP_SERVER", "").strip()
+        host, _, port = server.partition(":")
+        base = posixpath.join(os.getenv("FTP_REMOTE_DIR", "").strip() or "/",
+                              os.getenv("FTP_SUBDIR", DEFAULT_SUBDIR).strip())
+        return cls(host, os.getenv("FTP_USERNAME", ""), os.getenv("FTP_PASSWORD", ""), base,
+                   port=int(port or 21),
+                   tls=os.getenv("FTP_TLS", "1").strip().lower() not in ("0", "false", "no"),
+                   timeout=float(os.getenv("FTP_TIMEOUT_S", "60")))
+
+    def complete(self):
+        return bool(self.host and self.user and self.password)
+
+    def remote(self, rel):
+        return posixpath.join(self.base_dir, rel.lstrip("/"))
+
+
+class _Conn:
+    """Una conexión de control (reconecta bajo demanda)."""
+
+    def __init__(self, cfg):
+        self.cfg = cfg
+        self.ftp = None
+
+    def open(self):
+        if self.ftp is not None:
+            return self.ftp
+        ftp = ftplib.FTP_TLS(timeout=self.cfg.timeout) if self.cfg.tls else ftplib.FTP(timeout=self.cfg.timeout)
+        ftp.connect(self.cfg.host, self.cfg.port)
+        ftp.login(self.cfg.user, self.cfg.password)
+        if self.cfg.tls:
+            ftp.prot_p()  # canal de datos cifrado, como --ssl-reqd
+        # PASV con la IP del control (ftplib ignora la del servidor: como --ftp-skip-pasv-ip)
+        ftp.set_pasv(True)
+        ftp.voidcmd("TYPE I")
+        self.ftp = ftp
+        return ftp
+
+    def close(self):
+        if self.ftp is None:
+            return
+        try:
+            self.ftp.quit()
+        except Exception:
+            try:
+                self.ftp.close()
+            except Exception:
+                pass
+        self.ftp = None
+
+    def size(self, path):
+        try:
+            return self.open().size(path)
+        except ftplib.error_perm:
+            return None
+
+
+class Uploader:
+    """Reparte transferencias entre 'workers' conexiones persistentes."""
+
+    def __init__(self, cfg, workers=None, retries=None, log=print):
+        self.cfg = cfg
+        self.workers = max(1, int(workers or os.getenv("FTP_WORKERS", "4")))
+        self.retries = max(1, int(retries or os.getenv("FTP_RETRIES", "3")))
+        self.log = log
+        self.pool = queue.Queue()
+        for _ in range(self.workers):
+            self.pool.put(_Conn(cfg))
+        self.dirs = set()
+        self.dirs_lock = threading.Lock()
+        self.stats_lock = threading.Lock()
+        self.stats = {}
+
+    # ---------- directorios ----------
+
+    def _ensure_dir(self, conn, remote_dir):
+        with self.dirs_lock:
+            if remote_dir in self.dirs:
+                return
+        ftp = conn.open()
+        path = ""
+        for part in remote_dir.strip("/").split("/"):
+            path += "/" + part
+            with self.dirs_lock:
+                if path in self.dirs:
+                    continue
+            try:
+                ftp.mkd(path)
+            except ftplib.error_perm:
+                pass  # ya existe (o sin permiso: lo dirá el STOR)
+            with self.dirs_lock:
+                self.dirs.add(path)
+
+    # ---------- un fichero ----------
+
+    def _put_one(self, local, rel):
+        remote = self.cfg.remote(rel)
+        total = os.path.getsize(local)
+        offset = 0
+        sent = [0]  # hasta qué byte llegó lo enviado en ESTA ejecución (0: nada nuestro en el servidor)
+        last_error = None
+
+        def progress(buf):
+            sent[0] = max(sent[0], pos[0] + len(buf))
+            pos[0] += len(buf)
+
+        for attempt in range(1, self.retries + 1):
+            conn = self.pool.get()
+            pos = [offset]
+            try:
+                self._ensure_dir(conn, posixpath.dirname(remote))
+                ftp = conn.open()
+                with open(local, "rb") as f:
+                    if offset:
+                        f.seek(offset)
+                    ftp.storbinary(f"STOR {remote}", f, blocksize=BLOCK, callback=progress, rest=offset or None)
+                got = conn.size(remote)
+                if got != total:
+                    raise ftplib.error_reply(f"tamaño remoto {got} != local {total}")
+                with self.stats_lock:
+                    self.stats["files"] += 1
+                    self.stats["bytes"] += total - offset
+                    self.stats["resumed"] += 1 if offset else 0
+                return True
+            except _NET_ERRORS as e:
+                last_error = e
+                conn.close()
+                # Reanudar solo sobre bytes que subió esta ejecución: si el fallo fue antes del
+                # STOR, el remoto es la copia anterior (otro contenido) y se empieza de cero
+                got = None
+                if sent[0]:
+                    try:
+                        got = conn.size(remote)
+                    except _NET_ERRORS:
+                        conn.close()
+                offset = got if got and 0 < got <= sent[0] and got < total else 0
+                self.log(f"⚠️ {rel}: intento {attempt}/{self.retries} falló ({e})"
+                         + (f"; continúo desde {offset} B" if offset else ""))
+                time.sleep(min(2 ** attempt, 10))
+            finally:
+                self.pool.put(conn)
+        with self.stats_lock:
+            self.stats["failed"].append(rel)
+        self.log(f"❌ No se pudo subir {rel}: {last_error}")
+        return False
+
+    # ---------- lotes ----------
+
+    def upload(self, pairs):
+        """pairs: [(ruta_local, ruta_remota_relativa)]. Devuelve True si todo subió."""
+        pairs = list(pairs)
+        self.stats = {"files": 0, "bytes": 0, "resumed": 0, "failed": []}
+        if not pairs:
+            self.log("📤 FTP: nada que subir")
+            return True
+        t0 = time.time()
+        with ThreadPoolExecutor(max_workers=self.workers) as ex:
+            results = list(ex.map(lambda p: self._put_one(*p), pairs))
+        self.report(time.time() - t0)
+        return all(results)
+
+    def download(self, rel, local):
+        """Descarga opcional: False si el remoto no existe."""
+        conn = self.pool.get()
+        try:
+            ftp = conn.open()
+            tmp = f"{local}.part"
+            Path(local).parent.mkdir(parents=True, exist_ok=True)
+            with open(tmp, "wb") as f:
+                ftp.retrbinary(f"RETR {self.cfg.remote(rel)}", f.write, blocksize=BLOCK)
+            os.replace(tmp, local)
+            return True
+        except ftplib.error_perm:
+            try:
+                os.remove(f"{local}.part")
+            except OSError:
+                pass
+            return False
+        finally:
+            self.pool.put(conn)
+
+    def report(self, secs):
+        st = self.stats
+        secs = max(secs, 1e-6)
+        mb = st["bytes"] / (1024 * 1024)
+        self.log(f"📤 FTP: {st['files']} ficheros, {mb:.2f} MB en {secs:.1f}s → "
+                 f"{st['files'] / secs:.1f} ficheros/s, {mb / secs:.2f} MB/s "
+                 f"({self.workers} conexiones, {st['resumed']} reanudados, {len(st['failed'])} fallidos)")
+
+    def close(self):
+        while not self.pool.empty():
+            self.pool.get().close()
+
+
+# ---------------------------------------------------------------------------
+# Comandos
+# ---------------------------------------------------------------------------
+
+def _pair(spec, out_dir, sep="="):
+    local, _, remote = spec.partition(sep)
+    if not remote:
+        p = Path(local).resolve()
+        try:
+            remote = p.relative_to(Path(out_dir).resolve()).as_posix()
+        except ValueError:
+            remote = p.name
+    return local, remote
+
+
+def cmd_sync(up, out_dir, patterns, remote_manifest, merge, also=()):
+    """Sube lo cambiado (y 'also' siempre) en un solo lote; manifest.json al final si todo fue bien."""
+    out_dir = Path(out_dir)
+    remote = flow_manifest.load(remote_manifest) if remote_manifest else {}
+    local = flow_manifest.build(out_dir, remote=remote, merge=merge)
+    rels = flow_manifest.changed(local, remote, patterns or None)
+    rels = [r for r in rels if (out_dir / r).exists()]  # las heredadas con --merge no están aquí
+    print(f"📦 {len(rels)} de {len(local['files'])} ficheros cambiaron respecto al manifiesto remoto")
+    rels = [r for r in also if (out_dir / r).exists() and r not in rels] + rels
+    ok = up.upload([(str(out_dir / r), r) for r in rels])
+    if ok:
+        ok = up.upload([(str(out_dir / flow_manifest.MANIFEST_NAME), flow_manifest.MANIFEST_NAME)])
+    else:
+        print("⚠️ Hubo fallos: no se actualiza manifest.json remoto (la próxima vez se reintenta)")
+    return ok
+
+
+def cmd_get(up, specs):
+    for spec in specs:
+        rel, _, local = spec.partition("=")
+        local = local or Path(rel).name
+        if up.download(rel, local):
+            print(f"📥 {rel} → {local}")
+        else:
+            print(f"ℹ️ Sin {rel} remoto")
+    return True
+
+
+class _CutReader:
+    """Fichero que corta la lectura tras 'limit' bytes (selftest: transferencia interrumpida)."""
+
+    def __init__(self, fp, limit):
+        self.fp = fp
+        self.left = limit
+
+    def read(self, n=-1):
+        if self.left <= 0:
+            raise ConnectionResetError("corte simulado")
+        data = self.fp.read(min(n, self.left) if n >= 0 else self.left)
+        self.left -= len(data)
+        return data
+
+
+def selftest(n_files=200, kb=64, workers=4):
+    """Sube n_files ficheros a un pyftpdlib local (FTP plano), verifica y prueba la reanudación."""
+    try:
+        from pyftpdlib.authorizers import DummyAuthorizer
+        from pyftpdlib.handlers import FTPHandler
+        from pyftpdlib.servers import ThreadedFTPServer
+    except ImportError:
+        print("❌ selftest requiere pyftpdlib: pip install pyftpdlib")
+        return False
+
+    with tempfile.TemporaryDirectory() as root, tempfile.TemporaryDirectory() as src:
+        auth = DummyAuthorizer()
+        auth.add_user("flow", "flow", root, perm="elradfmwMT")
+        handler = type("H", (FTPHandler,), {"authorizer": auth, "passive_ports": None})
+        server = ThreadedFTPServer(("127.0.0.1", 0), handler)
+        port = server.socket.getsockname()[1]
+        th = threading.Thread(target=server.serve_forever, kwargs={"timeout": 0.2}, daemon=True)
+        th.start()
+        try:
+            files = []
+            for i in range(n_files):
+                rel = f"participants/02p_{i:05d}.json.gz"
+                p = Path(src) / rel
+                p.parent.mkdir(parents=True, exist_ok=True)
+                p.write_bytes(os.urandom(kb * 1024))
+                files.append((str(p), rel))
+
+            cfg = FtpConfig("127.0.0.1", "flow", "flow", "/data", port=port, tls=False, timeout=10)
+            up = Uploader(cfg, workers=workers)
+            ok = up.upload(files)
+            bad = [rel for local, rel in files
+                   if (Path(root) / "data" / rel).read_bytes() != Path(local).read_bytes()]
+
+            # Reanudación por el Uploader: el primer STOR se corta a mitad (los bytes que
+            # llegaron se quedan en el servidor) y el reintento continúa con REST
+            local, rel = files[0]
+            Path(local).write_bytes(os.urandom(kb * 1024 + 3 * BLOCK))
+            cut = Path(local).stat().st_size // 2
+            real_stor = ftplib.FTP.storbinary
+            faults = {"cut": 1}
+
+            def flaky_stor(ftp, cmd, fp, *args, **kwargs):
+                if faults["cut"] and cmd.endswith(rel):
+                    faults["cut"] -= 1
+                    fp = _CutReader(fp, cut)
+                return real_stor(ftp, cmd, fp, *args, **kwargs)
+
+            ftplib.FTP.storbinary = flaky_stor
+            try:
+                ok_cut = up.upload([(local, rel)])
+            finally:
+                ftplib.FTP.storbinary = real_stor
+            resumed_ok = (ok_cut and up.stats["resumed"] == 1
+                          and (Path(root) / "data" / rel).read_bytes() == Path(local).read_bytes())
+
+            # Copia anterior más corta en el servidor y fallo antes del STOR: no se reanuda
+            # sobre ella (quedaría la cabeza vieja con la cola nueva), se sube entera
+            local, rel = files[1]
+            (Path(root) / "data" / rel).write_bytes(b'[{"old":1}]')
+            Path(local).write_bytes(b'[{"new":2},{"new":3}]')
+            real_dir = up._ensure_dir
+            faults["dir"] = 1
+
+            def flaky_dir(conn, remote_dir):
+                if faults["dir"]:
+                    faults["dir"] -= 1
+                    raise ftplib.error_temp("421 fallo simulado antes del STOR")
+                return real_dir(conn, remote_dir)
+
+            up._ensure_dir = flaky_dir
+            ok_stale = up.upload([(local, rel)])
+            stale_ok = (ok_stale and up.stats["resumed"] == 0
+                        and (Path(root) / "data" / rel).read_bytes() == Path(local).read_bytes())
+            up.close()
+        finally:
+            server.close_all()
+    print(f"{'✅' if ok and not bad and resumed_ok and stale_ok else '❌'} {n_files} ficheros subidos y "
+          f"comparados ({len(bad)} distintos); reanudación tras corte {'OK' if resumed_ok else 'FALLÓ'}; "
+          f"copia anterior sin reanudar {'OK' if stale_ok else 'FALLÓ'}")
+    return ok and not bad and resumed_ok and stale_ok
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Subida FTPS de las salidas de FlowAgility")
+    ap.add_argument("cmd", choices=["sync", "put", "get", "selftest"])
+    ap.add_argument("args", nargs="*", help="sync: patrones · put: LOCAL[=REMOTO] · get: REMOTO=LOCAL")
+    ap.add_argument("--out", default=os.getenv("OUT_DIR", "./output"), help="Directorio de salidas")
+    ap.add_argument("--remote-manifest", default=None, help="sync: manifiesto subido la vez anterior")
+    ap.add_argument("--merge", action="store_true", help="sync: conserva entradas remotas ausentes aquí")
+    ap.add_argument("--also", nargs="+", default=[], help="sync: rutas (relativas a --out) que se suben siempre")
+    ap.add_argument("--workers", type=int, default=None, help="Conexiones en paralelo (FTP_WORKERS)")
+    ap.add_argument("--files", type=int, default=200, help="selftest: nº de ficheros")
+    ap.add_argument("--kb", type=int, default=64, help="selftest: KB por fichero")
+    a = ap.parse_args()
+
+    if a.cmd == "selftest":
+        return selftest(a.files, a.kb, a.workers or 4)
+
+    cfg = FtpConfig.from_env()
+    if not cfg.complete():
+        print("❌ Variables FTP no configuradas (FTP_SERVER, FTP_USERNAME, FTP_PASSWORD)")
+        return a.cmd == "get"  # sin FTP no hay base anterior: no es un error
+    up = Uploader(cfg, workers=a.workers)
+    try:
+        if a.cmd == "sync":
+            return cmd_sync(up, a.out, a.args, a.remote_manifest, a.merge, a.also)
+        if a.cmd == "put":
+            pairs = [_pair(s, a.out) for s in a.args]
+            missing = [l for l, _ in pairs if not os.path.exists(l)]
+            for l in missing:
+                print(f"ℹ️ No existe {l}; se omite")
+            return up.upload([p for p in pairs if p[0] not in missing])
+        return cmd_get(up, a.args)
+    except _NET_ERRORS as e:
+        print(f"❌ FTP: {e}")
+        return a.cmd == "get"
+    finally:
+        up.close()
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+FLOWAGILITY - ESCRITURA EN STREAMING DE ARRAYS JSON
+- JsonArrayWriter(path): cada append/extend serializa y escribe esos elementos en el
+  momento; en memoria solo queda el elemento en curso (RSS independiente del total).
+- Bytes idénticos a json.dumps(lista, ensure_ascii=False, indent=2) (también '[]').
+- Se escribe en '<path>.part' y close() lo renombra a 'path': quien lea nunca ve un
+  array a medias, y una parada brusca deja el fichero anterior intacto.
+- Acepta los registros compactos de flow_records (se serializan como dict).
+- terminate_on_sigterm(): SIGTERM → SystemExit, para que los with/finally cierren el
+  array (y el navegador) al cancelar un job.
+"""
+
+import os
+import json
+import signal
+import threading
+
+import flow_records
+
+
+class JsonArrayWriter:
+    def __init__(self, path, indent=2):
+        self.path = str(path)
+        self.tmp = self.path + ".part"
+        self.indent = indent
+        self.count = 0
+        self.closed = False
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        self.fh = open(self.tmp, "w", encoding="utf-8")
+        # Separador de elementos y sangría extra de cada línea del elemento
+        self._pad = "\n" + " " * indent
+
+    def append(self, item):
+        # Dentro del array cada línea del elemento lleva un nivel más de sangría;
+        # las cadenas JSON no contienen saltos de línea literales, así que es seguro
+        text = json.dumps(item, ensure_ascii=False, indent=self.indent,
+                          default=flow_records.json_default).replace("\n", self._pad)
+        self.fh.write(("[" if self.count == 0 else ",") + self._pad + text)
+        self.count += 1
+
+    def extend(self, items):
+        for item in items or []:
+            self.append(item)
+        self.fh.flush()
+
+    def close(self):
+        """Cierra el array y publica el fichero. Idempotente."""
+        if self.closed:
+            return
+        self.closed = True
+        self.fh.write("[]" if self.count == 0 else "\n]")
+        self.fh.close()
+        os.replace(self.tmp, self.path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+
+def _raise_exit(signum, frame):
+    raise SystemExit(128 + signum)
+
+
+def terminate_on_sigterm():
+    """Convierte SIGTERM en SystemExit (solo desde el hilo principal)."""
+    if threading.current_thread() is threading.main_thread():
+        signal.signal(signal.SIGTERM, _raise_exit)
@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+FLOWAGILITY - PERFIL DE NAVEGADOR "LITE"
+- LITE_PROFILE=1: Chrome sin imágenes (content setting) y con Network.setBlockedURLs (CDP)
+  para fuentes, media y hosts de consentimiento/analítica de terceros.
+- Nunca bloquea JS ni websocket del propio sitio: LiveView (/assets/*.js, /live) sigue vivo.
+- LITE_STATS=1 (activo por defecto con LITE_PROFILE): por cada página registra en
+  OUT_DIR/lite_stats.jsonl el tiempo de carga, las peticiones y los bytes transferidos
+  (Resource Timing). Los bytes son una cota inferior: un recurso de otro origen sin
+  Timing-Allow-Origin informa transferSize 0; esos se cuentan aparte (opaque).
+
+Comparar una ejecución normal (LITE_STATS=1, LITE_PROFILE=0) con una lite:
+    python flow_lite.py compare ./output/lite_stats.jsonl
+"""
+
+import os
+import sys
+import json
+import time
+from pathlib import Path
+from urllib.parse import urlparse
+
+
+def _flag(name, default="0"):
+    return os.getenv(name, default).strip().lower() in ("1", "true", "yes")
+
+
+# Se leen en cada llamada: los scripts cargan .env después de importar este módulo.
+def enabled():
+    return _flag("LITE_PROFILE")
+
+
+def stats_enabled():
+    return _flag("LITE_STATS", "1" if enabled() else "0")
+
+
+# Patrones de Network.setBlockedURLs ('*' comodín). Solo tipos no esenciales.
+BLOCK_FONT_MEDIA = [
+    "*.woff", "*.woff2", "*.ttf", "*.otf", "*.eot",
+    "*.mp4", "*.webm", "*.mp3", "*.ogg",
+]
+BLOCK_IMAGES = [
+    "*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.avif", "*.ico", "*.bmp",
+]
+BLOCK_CSS = ["*.css", "*fonts.googleapis.com*"]
+BLOCK_HOSTS = [
+    "*googletagmanager.com*", "*google-analytics.com*", "*analytics.google.com*",
+    "*doubleclick.net*", "*googlesyndication.com*", "*connect.facebook.net*",
+    "*hotjar.com*", "*clarity.ms*", "*cookiebot.com*", "*cookielaw.org*",
+    "*onetrust.com*", "*consensu.org*", "*iubenda.com*", "*fonts.gstatic.com*",
+]
+
+JS_PAGE_STATS = r"""
+const nav = performance.getEntriesByType('navigation')[0];
+const res = performance.getEntriesByType('resource');
+let bytes = nav ? (nav.transferSize || 0) : 0;
+let opaque = 0;
+const byType = {}, reqByType = {};
+for (const r of res) {
+  bytes += r.transferSize || 0;
+  byType[r.initiatorType] = (byType[r.initiatorType] || 0) + (r.transferSize || 0);
+  reqByType[r.initiatorType] = (reqByType[r.initiatorType] || 0) + 1;
+  // Otro origen sin Timing-Allow-Origin: tamaños y tiempos a 0 (no es caché: ahí decodedBodySize > 0)
+  if (!r.transferSize && !r.decodedBodySize && !r.responseStart) opaque++;
+}
+return {
+  url: location.href,
+  load_ms: nav ? Math.round((nav.loadEventEnd || nav.domContentLoadedEventEnd) - nav.startTime) : null,
+  dcl_ms: nav ? Math.round(nav.domContentLoadedEventEnd - nav.startTime) : null,
+  bytes: bytes,                 // cota inferior (sin los opaque)
+  resources: res.length,
+  requests: res.length + (nav ? 1 : 0),
+  opaque: opaque,
+  bytes_by_type: byType,
+  requests_by_type: reqByType
+};
+"""
+
+
+def profile_name():
+    return "lite" if enabled() else "full"
+
+
+def blocked_patterns():
+    extra = [p.strip() for p in os.getenv("LITE_BLOCK_EXTRA", "").split(",") if p.strip()]
+    pats = BLOCK_FONT_MEDIA + BLOCK_IMAGES + BLOCK_HOSTS + extra
+    if _flag("LITE_BLOCK_CSS"):
+        pats = pats + BLOCK_CSS
+    return pats
+
+
+def apply_options(opts):
+    """Ajustes de Options antes de crear el driver (no hace nada si LITE_PROFILE está apagado)."""
+    if not enabled():
+        return opts
+    opts.add_argument("--blink-settings=imagesEnabled=false")
+    opts.add_experimental_option("prefs", {
+        "profile.managed_default_content_settings.images": 2,
+        "profile.default_content_setting_values.notifications": 2,
+    })
+    return opts
+
+
+def activate(driver):
+    """
+    Activa el bloqueo por CDP en la pestaña actual del driver. setBlockedURLs es por
+    pestaña: llamarlo también tras abrir pestañas nuevas.
+    """
+    if not enabled() or driver is None:
+        return False
+    try:
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": blocked_patterns()})
+        return True
+    except Exception as e:
+        print(f"[lite] ⚠️ No se pudo activar el bloqueo CDP: {e}", flush=True)
+        return False
+
+
+def _stats_path():
+    custom = os.getenv("LITE_STATS_FILE", "").strip()
+    return Path(custom) if custom else Path(os.getenv("OUT_DIR", "./output")) / "lite_stats.jsonl"
+
+
+def record(driver, label=""):
+    """Añade una línea con load_ms/bytes de la página actual. Devuelve el registro o None."""
+    if not stats_enabled() or driver is None:
+        return None
+    try:
+        st = driver.execute_script(JS_PAGE_STATS) or {}
+    except Exception:
+        return None
+    st.update({"profile": profile_name(), "label": label, "ts": time.time()})
+    try:
+        path = _stats_path()
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(st, ensure_ascii=False) + "\n")
+    except Exception:
+        pass
+    return st
+
+
+# ---------------------------------------------------------------------------
+# Comparativa full vs lite
+# ---------------------------------------------------------------------------
+
+def _route(url):
+    """Agrupa URLs por ruta sin ids (/zone/events/<id>/participants_list -> .../:id/...)."""
+    parts = [("/:id" if any(ch.isdigit() for ch in p) and len(p) > 8 else "/" + p)
+             for p in urlparse(url or "").path.split("/") if p]
+    return "".join(parts) or "/"
+
+
+def compare(path):
+    rows = {}
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                st = json.loads(line)
+            except ValueError:
+                continue
+            key = (_route(st.get("url")), st.get("profile", "full"))
+            agg = rows.setdefault(key, {"n": 0, "bytes": 0, "load_ms": 0, "requests": 0, "opaque": 0})
+            agg["n"] += 1
+            agg["bytes"] += st.get("bytes") or 0
+            agg["load_ms"] += st.get("load_ms") or 0
+            # Registros anteriores sin 'requests': los recursos + la navegación
+            agg["requests"] += st.get("requests") or ((st.get("resources") or 0) + 1)
+            agg["opaque"] += st.get("opaque") or 0
+
+    routes = sorted({r for r, _ in rows})
+    print("KB/pág es una cota inferior: no incluye los recursos de otro origen sin Timing-Allow-Origin "
+          "(columna opaq/pág), que sí cuentan en pet/pág.")
+    print(f"{'ruta':50} {'perfil':6} {'n':>5} {'KB/pág ≥':>10} {'pet/pág':>8} {'opaq/pág':>8} {'ms/pág':>8}")
+    for route in routes:
+        for prof in ("full", "lite"):
+            agg = rows.get((route, prof))
+            if not agg:
+                continue
+            n = agg["n"]
+            print(f"{route[:50]:50} {prof:6} {n:5d} {agg['bytes'] / n / 1024:10.1f} "
+                  f"{agg['requests'] / n:8.1f} {agg['opaque'] / n:8.1f} {agg['load_ms'] / n:8.0f}")
+        full, lite = rows.get((route, "full")), rows.get((route, "lite"))
+        if full and lite:
+            saved = full["bytes"] / full["n"] - lite["bytes"] / lite["n"]
+            fewer = full["requests"] / full["n"] - lite["requests"] / lite["n"]
+            fewer_opaque = full["opaque"] / full["n"] - lite["opaque"] / lite["n"]
+            faster = full["load_ms"] / full["n"] - lite["load_ms"] / lite["n"]
+            print(f"{'':50} {'ahorro':6} {'':5} {saved / 1024:10.1f} {fewer:8.1f} {fewer_opaque:8.1f} {faster:8.0f}")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) >= 2 and sys.argv[1] == "compare":
+        compare(sys.argv[2] if len(sys.argv) > 2 else str(_stats_path()))
+    else:
+        print("Uso: python flow_lite.py compare [lite_stats.jsonl]")
+        sys.exit(2)
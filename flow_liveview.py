@@ -0,0 +1,564 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+FLOWAGILITY - CLIENTE LIVEVIEW (SIN NAVEGADOR)
+- Descarga participants_list por HTTP con las cookies de sesión (login ya hecho).
+- Se une al LiveView por websocket (protocolo Phoenix vsn 2.0.0) y envía
+  'booking_details_show' con phx-value-booking_id directamente, sin clicks.
+- Decodifica el 'rendered' inicial + diffs de LiveView a HTML y mapea el panel
+  al mismo payload {fields, schedule} que JS_MAP_PARTICIPANT_RICH.
+
+FLOW_BASE_URL (p. ej. http://127.0.0.1:8765) redirige a ese host las URL de flowagility.com
+que reciba el cliente: así se prueba contra el LiveView falso de flow_liveview_fake.py
+(python flow_liveview_fake.py selftest | serve).
+Requisitos extra: requests, websocket-client
+"""
+
+import os
+import json
+import time
+from urllib.parse import urlparse, urlunparse, urlencode, urljoin
+
+from lxml import html as lxml_html
+
+try:
+    import requests
+    HAS_REQUESTS = True
+except ImportError:
+    HAS_REQUESTS = False
+
+try:
+    import websocket  # paquete websocket-client
+    HAS_WEBSOCKET = True
+except ImportError:
+    HAS_WEBSOCKET = False
+
+DEFAULT_BASE_URL = "https://www.flowagility.com"
+LV_VSN = "2.0.0"
+HEARTBEAT_S = 30.0
+
+# Claves del formato 'rendered' de LiveView
+COMPONENTS = "c"
+DYNAMICS = "d"
+STATIC = "s"
+TEMPLATES = "p"
+
+# Etiquetas admitidas por JS_MAP_PARTICIPANT_RICH (02EventosProx… = solo ES; DeepSek/debug = ES + EN)
+SIMPLE_FIELD_LABELS_ES = frozenset([
+    "Dorsal", "Guía", "Guia", "Perro", "Raza", "Edad", "Género", "Genero",
+    "Altura (cm)", "Altura", "Nombre de Pedigree", "Nombre de Pedrigree",
+    "País", "Pais", "Licencia", "Equipo", "Club", "Federación", "Federacion",
+])
+SIMPLE_FIELD_LABELS = SIMPLE_FIELD_LABELS_ES | frozenset([
+    "Handler", "Dog", "Breed", "Age", "Gender", "Height (cm)", "Country",
+    "License number", "Team", "Federation", "Fecha", "Date", "Mangas", "Runs",
+])
+
+
+class LiveViewError(Exception):
+    """Error de protocolo/unión con el LiveView."""
+
+
+class LiveViewLoginRequired(LiveViewError):
+    """La sesión no es válida: el servidor redirige a /user/login."""
+
+
+def base_url():
+    # Se lee en cada llamada: los scripts cargan .env después de importar este módulo
+    return (os.getenv("FLOW_BASE_URL", "").strip() or DEFAULT_BASE_URL).rstrip("/")
+
+
+def rebase(url):
+    """URL de flowagility.com (o relativa) → la misma ruta en FLOW_BASE_URL."""
+    base = base_url()
+    if not url:
+        return url
+    u = urlparse(url)
+    if not u.netloc:
+        return urljoin(base + "/", url.lstrip("/"))
+    if base == DEFAULT_BASE_URL or not u.netloc.endswith("flowagility.com"):
+        return url
+    b = urlparse(base)
+    return urlunparse(u._replace(scheme=b.scheme, netloc=b.netloc))
+
+
+# ===================== Rendered (port de rendered.js) =====================
+
+def _is_cid(v):
+    return isinstance(v, int) and not isinstance(v, bool)
+
+
+def _resolve_templates(node, templates=None, component_root=False):
+    """
+    Sustituye estáticos por índice ('s': int) por la plantilla compartida 'p'.
+    En la raíz de un componente 's' entero es una referencia a otro cid: no se toca.
+    """
+    if not isinstance(node, dict):
+        return node
+    templates = node.pop(TEMPLATES, None) or templates
+    st = node.get(STATIC)
+    if not component_root and _is_cid(st) and templates is not None and str(st) in templates:
+        node[STATIC] = templates[str(st)]
+    for k, v in node.items():
+        if k in (STATIC, COMPONENTS):
+            continue
+        if isinstance(v, dict):
+            _resolve_templates(v, templates)
+        elif k == DYNAMICS and isinstance(v, list):
+            for row in v:
+                for cell in row:
+                    _resolve_templates(cell, templates)
+    return node
+
+
+def _clone_merge(target, source):
+    merged = dict(target)
+    merged.update(source)
+    for k in merged:
+        val = source.get(k)
+        tval = target.get(k)
+        if isinstance(val, dict) and STATIC not in val and isinstance(tval, dict):
+            merged[k] = _clone_merge(tval, val)
+    return merged
+
+
+def _mutable_merge(target, source):
+    if STATIC in source:
+        return source
+    for k, val in source.items():
+        tval = target.get(k)
+        if isinstance(val, dict) and STATIC not in val and isinstance(tval, dict):
+            _mutable_merge(tval, val)
+        else:
+            target[k] = val
+    return target
+
+
+class Rendered:
+    """Árbol 'rendered' de un LiveView; admite diffs y se serializa a HTML."""
+
+    def __init__(self, rendered=None):
+        self.rendered = {COMPONENTS: {}}
+        if rendered:
+            self.merge(rendered)
+
+    def merge(self, diff):
+        """Aplica un diff. Devuelve el conjunto de cids de componentes tocados."""
+        diff = json.loads(json.dumps(diff))  # copia profunda: no mutar el mensaje
+        newc = diff.pop(COMPONENTS, None) or {}
+        _resolve_templates(diff)
+        for c in newc.values():
+            _resolve_templates(c, component_root=True)
+
+        oldc = self.rendered.pop(COMPONENTS, {})
+        self.rendered = _mutable_merge(self.rendered, diff)
+        cache = {}
+
+        def find(cid):
+            if cid in cache:
+                return cache[cid]
+            cdiff = newc[cid]
+            scid = cdiff.get(STATIC)
+            if _is_cid(scid):
+                if scid > 0 and str(scid) in newc:
+                    tdiff = find(str(scid))
+                else:
+                    tdiff = oldc.get(str(abs(scid)), {})
+                ndiff = _clone_merge(tdiff, cdiff)
+                ndiff[STATIC] = tdiff.get(STATIC, [])
+            elif STATIC in cdiff or cid not in oldc:
+                ndiff = cdiff
+            else:
+                ndiff = _clone_merge(oldc[cid], cdiff)
+            cache[cid] = ndiff
+            return ndiff
+
+        for cid in list(newc):
+            find(cid)
+        oldc.update(cache)
+        self.rendered[COMPONENTS] = oldc
+        return set(cache)
+
+    # ---------- HTML ----------
+
+    def to_html(self):
+        out = []
+        self._to_buffer(self.rendered, out)
+        return "".join(out)
+
+    def component_html(self, cid):
+        comp = self.rendered[COMPONENTS].get(str(cid))
+        if comp is None:
+            return ""
+        out = []
+        self._to_buffer(comp, out)
+        return "".join(out)
+
+    def _to_buffer(self, node, out):
+        statics = node.get(STATIC) or [""]
+        if DYNAMICS in node:
+            for row in node[DYNAMICS] or []:
+                out.append(statics[0])
+                for i in range(1, len(statics)):
+                    self._dynamic_to_buffer(row[i - 1] if i - 1 < len(row) else "", out)
+                    out.append(statics[i])
+            return
+        out.append(statics[0])
+        for i in range(1, len(statics)):
+            self._dynamic_to_buffer(node.get(str(i - 1), ""), out)
+            out.append(statics[i])
+
+    def _dynamic_to_buffer(self, val, out):
+        if _is_cid(val):
+            comp = self.rendered[COMPONENTS].get(str(val))
+            if comp is not None:
+                self._to_buffer(comp, out)
+        elif isinstance(val, dict):
+            self._to_buffer(val, out)
+        elif val is not None and val is not False:
+            out.append(str(val))
+
+
+# ===================== Mapper (port de JS_MAP_PARTICIPANT_RICH) =====================
+
+def _classes(el):
+    return (el.get("class") or "").split()
+
+
+def _is_header(cls):
+    return (("border-b" in cls and "border-gray-400" in cls)
+            or ("font-bold" in cls and "text-sm" in cls and any(c.startswith("mt-") for c in cls)))
+
+
+def _is_label(cls):
+    return "text-gray-500" in cls and "text-sm" in cls
+
+
+def _is_strong(cls):
+    return "font-bold" in cls and "text-sm" in cls
+
+
+def _txt(el):
+    if el is None:
+        return None
+    t = el.text_content().strip()
+    return t or None
+
+
+def _next_strong(el):
+    cur = el
+    for _ in range(8):
+        cur = cur.getnext()
+        while cur is not None and not isinstance(cur.tag, str):
+            cur = cur.getnext()
+        if cur is None:
+            break
+        if _is_strong(_classes(cur)):
+            return cur
+    return None
+
+
+def find_by_id(doc, el_id):
+    found = doc.xpath("//*[@id=$i]", i=el_id)
+    return found[0] if found else None
+
+
+def map_participant_rich(source, pid, bilingual=True):
+    """
+    Equivalente Python de JS_MAP_PARTICIPANT_RICH sobre HTML (str) o un elemento lxml.
+    bilingual=False reproduce la variante solo-ES de 02EventosProxParticipantesGitHubGPT.
+    Devuelve {fields, schedule} o None si no existe el bloque con id=pid.
+    """
+    if isinstance(source, str):
+        if not source.strip():
+            return None
+        doc = lxml_html.fromstring(source)
+        root = doc if doc.get("id") == pid else find_by_id(doc, pid)
+    else:
+        root = source
+    if root is None:
+        return None
+
+    labels = SIMPLE_FIELD_LABELS if bilingual else SIMPLE_FIELD_LABELS_ES
+    fields, schedule = {}, []
+    current_day = tmp_fecha = tmp_mangas = None
+
+    for node in root.iter():
+        if not isinstance(node.tag, str):
+            continue
+        cls = _classes(node)
+        if _is_header(cls):
+            t = _txt(node)
+            if t:
+                current_day = t
+        elif _is_label(cls):
+            label = _txt(node) or ""
+            value = _txt(_next_strong(node)) or ""
+            low = label.lower()
+            if low.startswith("fecha") or (bilingual and low == "date"):
+                tmp_fecha = value
+            elif low.startswith("mangas") or (bilingual and low == "runs"):
+                tmp_mangas = value
+            elif label in labels and value and not fields.get(label):
+                fields[label] = value
+            if tmp_fecha is not None and tmp_mangas is not None:
+                schedule.append({"day": current_day or "", "fecha": tmp_fecha, "mangas": tmp_mangas})
+                tmp_fecha = tmp_mangas = None
+    return {"fields": fields, "schedule": schedule}
+
+
+def panel_ready(el):
+    """Mismo criterio que panel_ready() en Selenium: hay valores 'fuertes' o grid pintado."""
+    if el is None:
+        return False
+    for d in el.iter("div"):
+        cls = _classes(d)
+        if _is_strong(cls) or ("grid" in cls and "grid-cols-2" in cls):
+            return True
+    return False
+
+
+def booking_ids_from_html(page_html):
+    """booking_id únicos (en orden) de los toggles [phx-click='booking_details_show']."""
+    if not page_html:
+        return []
+    doc = lxml_html.fromstring(page_html)
+    seen, out = set(), []
+    for el in doc.xpath("//*[@phx-click='booking_details_show'][@phx-value-booking_id]"):
+        bid = el.get("phx-value-booking_id")
+        if bid and bid not in seen:
+            seen.add(bid)
+            out.append(bid)
+    return out
+
+
+# ===================== Cliente websocket =====================
+
+class LiveViewClient:
+    """
+    Cliente mínimo de un LiveView de Phoenix:
+        lv = LiveViewClient(url, cookies=driver.get_cookies())
+        lv.connect()
+        for pid in lv.booking_ids():
+            payload = lv.open_booking(pid)
+    """
+
+    def __init__(self, url, cookies=None, user_agent=None, socket_path="/live",
+                 timeout=30.0, panel_timeout=8.0, bilingual=True, session=None):
+        if not (HAS_REQUESTS and HAS_WEBSOCKET):
+            raise ImportError("LiveViewClient requiere 'requests' y 'websocket-client'")
+        self.url = rebase(url)
+        rebased = self.url != url
+        self.socket_path = socket_path
+        self.timeout = timeout
+        self.panel_timeout = panel_timeout
+        self.bilingual = bilingual
+        self.session = session or requests.Session()
+        if user_agent:
+            self.session.headers["User-Agent"] = user_agent
+        for c in cookies or []:
+            # Con otro host (FLOW_BASE_URL) el dominio de la cookie original no encajaría
+            self.session.cookies.set(c["name"], c["value"], domain=None if rebased else c.get("domain"),
+                                     path=c.get("path", "/"))
+
+        self.ws = None
+        self.topic = None
+        self.join_ref = None
+        self.csrf = None
+        self.rendered = None
+        self._ref = 0
+        self._last_beat = 0.0
+        self._html = None
+        self._doc = None
+
+    # ---------- conexión ----------
+
+    def connect(self):
+        r = self.session.get(self.url, timeout=self.timeout)
+        r.raise_for_status()
+        if "/user/login" in r.url:
+            raise LiveViewLoginRequired(f"Redirigido a login desde {self.url}")
+        page_url = r.url
+        doc = lxml_html.fromstring(r.text)
+
+        meta = doc.xpath("//meta[@name='csrf-token']/@content")
+        self.csrf = meta[0] if meta else ""
+        main = doc.xpath("//*[@data-phx-main]") or doc.xpath("//*[@data-phx-session]")
+        if not main:
+            raise LiveViewError(f"No hay contenedor LiveView en {page_url}")
+        main = main[0]
+        self.topic = f"lv:{main.get('id')}"
+
+        u = urlparse(page_url)
+        scheme = "wss" if u.scheme == "https" else "ws"
+        qs = urlencode({"_csrf_token": self.csrf, "vsn": LV_VSN})
+        ws_url = f"{scheme}://{u.netloc}{self.socket_path}/websocket?{qs}"
+        cookie = "; ".join(f"{c.name}={c.value}" for c in self.session.cookies)
+        headers = [f"User-Agent: {self.session.headers.get('User-Agent', '')}"]
+        self.ws = websocket.create_connection(
+            ws_url, header=headers, cookie=cookie,
+            origin=f"{u.scheme}://{u.netloc}", timeout=self.timeout,
+        )
+
+        payload = {
+            "url": page_url,
+            "params": {"_csrf_token": self.csrf, "_mounts": 0},
+            "session": main.get("data-phx-session") or "",
+            "static": main.get("data-phx-static"),
+        }
+        ref = self._push("phx_join", payload, join=True)
+        resp = self._await_reply(ref)
+        self.rendered = Rendered(resp.get("rendered") or {})
+        self._invalidate()
+        return self
+
+    def close(self):
+        try:
+            if self.ws is not None:
+                self.ws.close()
+        except Exception:
+            pass
+        self.ws = None
+
+    def __enter__(self):
+        return self.connect()
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # ---------- protocolo ----------
+
+    def _next_ref(self):
+        self._ref += 1
+        return str(self._ref)
+
+    def _send(self, msg):
+        self.ws.send(json.dumps(msg))
+
+    def _push(self, event, payload, join=False):
+        ref = self._next_ref()
+        if join:
+            self.join_ref = ref
+        self._send([self.join_ref, ref, self.topic, event, payload])
+        return ref
+
+    def _heartbeat(self):
+        if time.time() - self._last_beat >= HEARTBEAT_S:
+            self._send([None, self._next_ref(), "phoenix", "heartbeat", {}])
+            self._last_beat = time.time()
+
+    def _handle(self, msg):
+        """Procesa un mensaje entrante. Devuelve (ref, payload) si es un phx_reply."""
+        _join_ref, ref, topic, event, payload = msg
+        if topic != self.topic:
+            return None
+        if event == "diff":
+            self._apply_diff(payload)
+        elif event in ("phx_error", "phx_close"):
+            raise LiveViewError(f"LiveView cerrado por el servidor ({event})")
+        elif event in ("redirect", "live_redirect"):
+            to = (payload or {}).get("to", "")
+            if "/user/login" in to:
+                raise LiveViewLoginRequired(f"Redirigido a {to}")
+            raise LiveViewError(f"Redirección inesperada a {to}")
+        elif event == "phx_reply":
+            return ref, payload or {}
+        return None
+
+    def _recv(self, timeout):
+        self.ws.settimeout(max(0.05, timeout))
+        try:
+            raw = self.ws.recv()
+        except websocket.WebSocketTimeoutException:
+            return None
+        return json.loads(raw) if raw else None
+
+    def _await_reply(self, ref):
+        end = time.time() + self.timeout
+        while time.time() < end:
+            self._heartbeat()
+            msg = self._recv(end - time.time())
+            if not msg:
+                continue
+            got = self._handle(msg)
+            if got and got[0] == ref:
+                reply = got[1]
+                resp = reply.get("response") or {}
+                if reply.get("status") != "ok":
+                    reason = resp.get("reason", "")
+                    if reason in ("unauthorized", "stale"):
+                        raise LiveViewLoginRequired(f"Join rechazado: {reason}")
+                    raise LiveViewError(f"Respuesta {reply.get('status')}: {resp}")
+                for key in ("redirect", "live_redirect"):
+                    if key in resp:
+                        self._handle([None, None, self.topic, key, resp[key]])
+                if "diff" in resp:
+                    self._apply_diff(resp["diff"])
+                return resp
+        raise LiveViewError(f"Timeout esperando respuesta (ref={ref})")
+
+    def _apply_diff(self, diff):
+        if self.rendered is not None and diff:
+            self.rendered.merge(diff)
+            self._invalidate()
+
+    def _invalidate(self):
+        self._html = None
+        self._doc = None
+
+    # ---------- API ----------
+
+    def html(self):
+        if self._html is None:
+            self._html = self.rendered.to_html() if self.rendered else ""
+        return self._html
+
+    def document(self):
+        if self._doc is None:
+            self._doc = lxml_html.fromstring(self.html() or "<div></div>")
+        return self._doc
+
+    def booking_ids(self):
+        return booking_ids_from_html(self.html())
+
+    def push_event(self, event, value, cid=None, type_="click"):
+        payload = {"type": type_, "event": event, "value": value}
+        if cid is not None:
+            payload["cid"] = cid
+        return self._await_reply(self._push("event", payload))
+
+    def _toggle_target(self, pid):
+        found = self.document().xpath(
+            "//*[@phx-click='booking_details_show'][@phx-value-booking_id=$p]", p=pid)
+        if not found:
+            return None
+        target = (found[0].get("phx-target") or "").strip()
+        return int(target) if target.isdigit() else None
+
+    def panel_element(self, pid):
+        el = find_by_id(self.document(), pid)
+        return el if panel_ready(el) else None
+
+    def open_booking(self, pid):
+        """
+        Abre (si hace falta) el panel de 'pid' y devuelve el payload {fields, schedule}
+        o None si el panel no llega a pintarse en panel_timeout.
+        """
+        el = self.panel_element(pid)
+        if el is None:
+            self.push_event("booking_details_show", {"booking_id": pid}, cid=self._toggle_target(pid))
+            end = time.time() + self.panel_timeout
+            el = self.panel_element(pid)
+            while el is None and time.time() < end:
+                msg = self._recv(end - time.time())
+                if msg:
+                    self._handle(msg)
+                    el = self.panel_element(pid)
+        if el is None:
+            return None
+        return map_participant_rich(el, pid, bilingual=self.bilingual)
+
+    def panel_html(self, pid):
+        el = find_by_id(self.document(), pid)
+        return lxml_html.tostring(el, encoding="unicode") if el is not None else ""
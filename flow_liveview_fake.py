@@ -0,0 +1,297 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+FLOWAGILITY - LIVEVIEW FALSO PARA PRUEBAS (SIN RED NI NAVEGADOR)
+- Servidor local (HTTP + websocket mínimo RFC 6455, solo biblioteca estándar) que imita
+  participants_list de FlowAgility: página con data-phx-main/csrf, phx_join con el
+  'rendered' inicial y 'booking_details_show' → diff con el panel del binomio.
+- El 'rendered' usa lo que hay que saber fusionar: comprensiones ('d'), componentes ('c')
+  con estáticos compartidos ('s': cid), plantillas ('p') y diffs tanto en la respuesta
+  del evento como en un 'diff' aparte.
+- /zone/events/privado/participants_list redirige a /user/login (sesión caducada).
+
+    python flow_liveview_fake.py selftest          # LiveViewClient.open_booking de punta a punta
+    python flow_liveview_fake.py serve [--port N]  # y FLOW_BASE_URL=http://127.0.0.1:N en el script
+
+El selftest compara cada payload con el que daría JS_MAP_PARTICIPANT_RICH sobre ese
+panel ({fields: {etiqueta: valor}, schedule: [{day, fecha, mangas}]}), en sus dos
+variantes (bilingüe y solo-ES), y prueba FLOW_BASE_URL y la redirección a login.
+"""
+
+import os
+import sys
+import json
+import base64
+import struct
+import hashlib
+import argparse
+import threading
+import socketserver
+
+import flow_liveview
+
+_WS_GUID = "258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+SESSION = "fake-session"
+CSRF = "fake-csrf"
+
+# Binomios del evento falso: (booking_id, campos en el orden del panel, días)
+BOOKINGS = [
+    ("bk-001", {"Dorsal": "12", "Guía": "Ana Pérez", "Perro": "Luna", "Raza": "Border Collie",
+                "Club": "Club Agility Norte", "Federación": "RSCE", "Altura (cm)": "48"},
+     [("Sábado", "15/03/2025", "Agility 1, Jumping 1"), ("Domingo", "16/03/2025", "Agility 2")]),
+    ("bk-002", {"Dorsal": "13", "Guía": "Luis García", "Perro": "Kira", "Raza": "Pastor de Shetland",
+                "Club": "Club Agility Norte", "Federación": "RSCE", "Altura (cm)": "36"},
+     [("Sábado", "15/03/2025", "Jumping 1")]),
+    ("bk-003", {"Dorsal": "14", "Guía": "Marta Ruiz", "Perro": "Nala", "Raza": "Mestizo",
+                "Club": "", "Federación": "RFEC", "Altura (cm)": "30"},
+     []),
+]
+FIELD_LABELS = ["Dorsal", "Guía", "Perro", "Raza", "Club", "Federación", "Altura (cm)"]
+
+
+def _label(text):
+    return f'<div class="text-gray-500 text-sm">{text}</div><div class="font-bold text-sm">'
+
+
+# Panel: un valor dinámico por etiqueta y una comprensión con los días
+PANEL_STATICS = (['<div class="grid grid-cols-2">' + _label(FIELD_LABELS[0])]
+                 + [f"</div>{_label(lbl)}" for lbl in FIELD_LABELS[1:]]
+                 + ["</div>", "</div>"])
+DAY_STATICS = ['<div class="border-b border-gray-400">', "</div>" + _label("Fecha"),
+               "</div>" + _label("Mangas"), "</div>"]
+TOGGLE_STATICS = ['<div class="row"><span phx-click="booking_details_show" phx-value-booking_id="',
+                  '" phx-target="', '">Ver</span>', "</div>"]
+COMPONENT_STATICS = ['<div id="', '" class="panel">', "</div>"]
+
+
+def expected_payload(booking):
+    """Lo que JS_MAP_PARTICIPANT_RICH devolvería sobre el panel abierto."""
+    _, fields, days = booking
+    return {"fields": {k: v for k, v in fields.items() if v},
+            "schedule": [{"day": d, "fecha": f, "mangas": m} for d, f, m in days]}
+
+
+def _cid(i):
+    return i + 1
+
+
+def initial_rendered():
+    comps = {}
+    for i, (bid, _, _) in enumerate(BOOKINGS):
+        # El primero trae los estáticos; el resto los comparte ('s': cid del primero)
+        comps[str(_cid(i))] = {"s": COMPONENT_STATICS if i == 0 else 1, "0": bid, "1": ""}
+    rows = [[bid, str(_cid(i)), _cid(i)] for i, (bid, _, _) in enumerate(BOOKINGS)]
+    return {"s": ['<div id="list">', "</div>"], "0": {"s": TOGGLE_STATICS, "d": rows}, "c": comps}
+
+
+def panel_diff(i):
+    _, fields, days = BOOKINGS[i]
+    panel = {"s": 0, **{str(n): fields.get(lbl, "") for n, lbl in enumerate(FIELD_LABELS)},
+             str(len(FIELD_LABELS)): {"s": 1, "d": [list(d) for d in days]}}
+    return {"c": {str(_cid(i)): {"1": panel, "p": {"0": PANEL_STATICS, "1": DAY_STATICS}}}}
+
+
+PAGE = ('<!DOCTYPE html><html><head><meta name="csrf-token" content="{csrf}"></head><body>'
+        '<div id="phx-F1" data-phx-main data-phx-session="{session}" data-phx-static="st"></div>'
+        '</body></html>')
+
+
+# ---------------------------------------------------------------------------
+# Servidor
+# ---------------------------------------------------------------------------
+
+class _Handler(socketserver.StreamRequestHandler):
+    def handle(self):
+        request = self.rfile.readline().decode("latin-1").split()
+        headers = {}
+        while True:
+            line = self.rfile.readline().decode("latin-1").strip()
+            if not line:
+                break
+            k, _, v = line.partition(":")
+            headers[k.strip().lower()] = v.strip()
+        if len(request) < 2:
+            return
+        path = request[1].split("?")[0]
+        if path == "/live/websocket" and headers.get("upgrade", "").lower() == "websocket":
+            self._websocket(headers)
+        elif path == "/zone/events/privado/participants_list":
+            self._http(302, "", {"Location": "/user/login"})
+        elif path.endswith("/participants_list"):
+            self._http(200, PAGE.format(csrf=CSRF, session=SESSION))
+        else:
+            self._http(200 if path == "/user/login" else 404, "<html><body>login</body></html>")
+
+    def _http(self, status, body, extra=None):
+        data = body.encode("utf-8")
+        head = [f"HTTP/1.1 {status} {'OK' if status == 200 else 'X'}",
+                "Content-Type: text/html; charset=utf-8", f"Content-Length: {len(data)}",
+                "Connection: close"] + [f"{k}: {v}" for k, v in (extra or {}).items()]
+        self.wfile.write(("\r\n".join(head) + "\r\n\r\n").encode("latin-1") + data)
+
+    # ---------- websocket ----------
+
+    def _websocket(self, headers):
+        accept = base64.b64encode(hashlib.sha1((headers["sec-websocket-key"] + _WS_GUID).encode()).digest())
+        self.wfile.write(b"HTTP/1.1 101 Switching Protocols\r\nUpgrade: websocket\r\nConnection: Upgrade\r\n"
+                         b"Sec-WebSocket-Accept: " + accept + b"\r\n\r\n")
+        topic = None
+        while True:
+            frame = self._read_frame()
+            if frame is None:
+                return
+            join_ref, ref, msg_topic, event, payload = json.loads(frame)
+            if msg_topic == "phoenix":
+                self._send([None, ref, "phoenix", "phx_reply", {"status": "ok", "response": {}}])
+            elif event == "phx_join":
+                topic = msg_topic
+                if (payload or {}).get("session") != SESSION:
+                    self._send([join_ref, ref, topic, "phx_reply", {"status": "error", "response": {"reason": "stale"}}])
+                else:
+                    self._send([join_ref, ref, topic, "phx_reply",
+                                {"status": "ok", "response": {"rendered": initial_rendered()}}])
+            elif event == "event" and msg_topic == topic:
+                self._event(join_ref, ref, topic, payload or {})
+
+    def _event(self, join_ref, ref, topic, payload):
+        bid = (payload.get("value") or {}).get("booking_id")
+        self.server.events.append(bid)
+        idx = next((i for i, b in enumerate(BOOKINGS) if b[0] == bid), None)
+        if payload.get("event") != "booking_details_show" or idx is None or payload.get("cid") != _cid(idx):
+            self._send([join_ref, ref, topic, "phx_reply", {"status": "error", "response": {"reason": "bad event"}}])
+            return
+        if idx % 2:
+            # Diff como mensaje aparte y respuesta vacía (como cuando pinta otro proceso)
+            self._send([None, None, topic, "diff", panel_diff(idx)])
+            self._send([join_ref, ref, topic, "phx_reply", {"status": "ok", "response": {}}])
+        else:
+            self._send([join_ref, ref, topic, "phx_reply", {"status": "ok", "response": {"diff": panel_diff(idx)}}])
+
+    def _read_exact(self, n):
+        data = self.rfile.read(n)
+        return data if len(data) == n else None
+
+    def _read_frame(self):
+        while True:
+            head = self._read_exact(2)
+            if head is None:
+                return None
+            opcode, n = head[0] & 0x0F, head[1] & 0x7F
+            if n == 126:
+                n = struct.unpack("!H", self._read_exact(2))[0]
+            elif n == 127:
+                n = struct.unpack("!Q", self._read_exact(8))[0]
+            mask = self._read_exact(4) if head[1] & 0x80 else b"\0\0\0\0"
+            data = bytes(b ^ mask[i % 4] for i, b in enumerate(self._read_exact(n) or b""))
+            if opcode == 8:
+                self._frame(8, b"")
+                return None
+            if opcode == 9:
+                self._frame(10, data)
+            elif opcode == 1:
+                return data.decode("utf-8")
+
+    def _frame(self, opcode, data):
+        n = len(data)
+        if n < 126:
+            head = struct.pack("!BB", 0x80 | opcode, n)
+        elif n < 1 << 16:
+            head = struct.pack("!BBH", 0x80 | opcode, 126, n)
+        else:
+            head = struct.pack("!BBQ", 0x80 | opcode, 127, n)
+        self.wfile.write(head + data)
+
+    def _send(self, msg):
+        self._frame(1, json.dumps(msg, ensure_ascii=False).encode("utf-8"))
+
+
+class FakeLiveViewServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, port=0):
+        super().__init__(("127.0.0.1", port), _Handler)
+        self.events = []  # booking_id de cada 'booking_details_show' recibido
+
+    @property
+    def base_url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+    def start(self):
+        threading.Thread(target=self.serve_forever, kwargs={"poll_interval": 0.1}, daemon=True).start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+
+# ---------------------------------------------------------------------------
+# Selftest
+# ---------------------------------------------------------------------------
+
+def selftest():
+    if not (flow_liveview.HAS_REQUESTS and flow_liveview.HAS_WEBSOCKET):
+        print("❌ selftest requiere requests y websocket-client")
+        return False
+    server = FakeLiveViewServer().start()
+    old_base = os.environ.get("FLOW_BASE_URL")
+    os.environ["FLOW_BASE_URL"] = server.base_url
+    checks = []
+    try:
+        # URL real de FlowAgility: FLOW_BASE_URL la lleva al servidor falso
+        url = "https://www.flowagility.com/zone/events/evt1/participants_list"
+        for bilingual in (True, False):
+            server.events.clear()
+            with flow_liveview.LiveViewClient(url, panel_timeout=3.0, timeout=5.0, bilingual=bilingual) as lv:
+                ids = lv.booking_ids()
+                checks.append((f"booking_ids (bilingual={bilingual})", ids == [b[0] for b in BOOKINGS]))
+                for booking in BOOKINGS:
+                    got = lv.open_booking(booking[0])
+                    checks.append((f"{booking[0]} (bilingual={bilingual})", got == expected_payload(booking)))
+                # Ya abierto: se lee del árbol sin volver a pedirlo
+                checks.append(("panel ya abierto", lv.open_booking(BOOKINGS[0][0]) == expected_payload(BOOKINGS[0])
+                               and server.events == [b[0] for b in BOOKINGS]))
+                # El HTML del panel y el mapper sobre ese HTML (lo que archiva flow_snapshots) coinciden
+                html = lv.panel_html(BOOKINGS[1][0])
+                checks.append(("map_participant_rich(panel_html)",
+                               flow_liveview.map_participant_rich(html, BOOKINGS[1][0], bilingual)
+                               == expected_payload(BOOKINGS[1])))
+        try:
+            flow_liveview.LiveViewClient(url.replace("evt1", "privado"), timeout=5.0).connect()
+            checks.append(("redirección a login", False))
+        except flow_liveview.LiveViewLoginRequired:
+            checks.append(("redirección a login", True))
+    finally:
+        if old_base is None:
+            os.environ.pop("FLOW_BASE_URL", None)
+        else:
+            os.environ["FLOW_BASE_URL"] = old_base
+        server.stop()
+    bad = [name for name, ok in checks if not ok]
+    print(f"{'✅' if not bad else '❌'} LiveView falso: {len(checks) - len(bad)}/{len(checks)} comprobaciones OK"
+          + (f" · fallan: {', '.join(bad)}" if bad else ""))
+    return not bad
+
+
+def main():
+    ap = argparse.ArgumentParser(description="LiveView falso de FlowAgility para pruebas")
+    ap.add_argument("cmd", choices=["selftest", "serve"])
+    ap.add_argument("--port", type=int, default=8765, help="serve: puerto local")
+    args = ap.parse_args()
+    if args.cmd == "selftest":
+        return selftest()
+    server = FakeLiveViewServer(args.port)
+    print(f"🧪 LiveView falso en {server.base_url} (FLOW_BASE_URL={server.base_url}); Ctrl+C para salir")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return True
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
@@ -0,0 +1,258 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+FLOWAGILITY - MANIFIESTO SHA256 DE LAS SALIDAS
+- manifest.json en OUT_DIR: {"version", "generated_at", "files": {ruta_relativa: {sha256, size, mtime_ns}}}
+  con 01events, 02participants*, participants/02p_*.json y sus .gz.
+- dump_json(path, obj): escribe el JSON (en streaming, calculando el hash) a un temporal y
+  solo sustituye el fichero si el contenido cambia: los 02p_<id>.json iguales conservan
+  fichero y mtime. La hora de extracción ("timestamp") no cuenta como cambio.
+- build: recalcula el manifiesto (reutiliza el hash si tamaño y mtime no cambiaron).
+  Para participants/02p_*.json(.gz) el sha256 es el del contenido canónico (sin
+  "timestamp"): en un runner con output/ vacío, el mismo evento re-scrapeado da el mismo
+  hash que el remoto y no se vuelve a subir (el remoto conserva su hora anterior).
+- changed --remote M: rutas cuyo sha256 difiere del manifiesto remoto M (el que se subió
+  la vez anterior) → solo eso se sube; el manifiesto se sube al final y los consumidores
+  lo comparan con el suyo para bajar solo lo que cambió.
+
+    python flow_manifest.py build [--out DIR] [--remote output/prev/manifest.json] [--merge]
+    python flow_manifest.py changed --remote output/prev/manifest.json [patrón ...]
+    python flow_manifest.py selftest   # re-scrapear lo mismo → mismo hash
+
+Los .gz deben generarse con 'gzip -n' (sin nombre ni fecha) para que su hash sea estable.
+"""
+
+import os
+import sys
+import json
+import glob
+import gzip
+import hashlib
+import argparse
+import fnmatch
+import tempfile
+from collections.abc import Mapping
+from datetime import datetime
+from pathlib import Path
+
+import flow_records
+
+MANIFEST_NAME = "manifest.json"
+PATTERNS = ["01events.json", "01events.json.gz", "02participants*.json", "02participants*.json.gz",
+            "participants/02p_*.json", "participants/02p_*.json.gz"]
+_CHUNK = 1 << 16
+# Claves de primer nivel que cambian en cada ejecución sin que cambien los datos
+# (hora de extracción; cuántos paneles vinieron por lote depende del ritmo, no del evento)
+VOLATILE_KEYS = ("timestamp", "panels_batched")
+# Ficheros por evento: su sha256 en el manifiesto es el del contenido canónico (JSON sin
+# VOLATILE_KEYS), no el de los bytes. En Actions output/ empieza vacío cada noche y cada
+# 02p_<id>.json nace con otra hora: por bytes nunca coincidiría con el remoto.
+CANONICAL = ("participants/02p_*.json", "participants/02p_*.json.gz")
+
+
+def sha256_file(path):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(_CHUNK), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def content_hash(path):
+    """sha256 del JSON sin claves volátiles (.json o .json.gz); si no se puede leer, el de los bytes."""
+    path = Path(path)
+    try:
+        opener = gzip.open if path.suffix == ".gz" else open
+        with opener(path, "rt", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError, EOFError):
+        return sha256_file(path)
+    if isinstance(data, dict):
+        data = {k: v for k, v in data.items() if k not in VOLATILE_KEYS}
+    canon = json.dumps(data, ensure_ascii=False, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(canon.encode("utf-8")).hexdigest()
+
+
+def file_hash(rel, path):
+    """Hash del manifiesto: contenido canónico para los ficheros por evento, bytes para el resto."""
+    if any(fnmatch.fnmatch(rel, p) for p in CANONICAL):
+        return content_hash(path)
+    return sha256_file(path)
+
+
+class _HashingWriter:
+    """Fichero de texto que va calculando el sha256 de lo escrito (UTF-8)."""
+
+    def __init__(self, fh):
+        self.fh = fh
+        self.h = hashlib.sha256()
+
+    def write(self, s):
+        self.h.update(s.encode("utf-8"))
+        return self.fh.write(s)
+
+
+def _without(obj, keys):
+    """Copia JSON-pura de obj sin las claves volátiles de primer nivel."""
+    if isinstance(obj, Mapping):
+        obj = {k: v for k, v in obj.items() if k not in keys}
+    return json.loads(json.dumps(obj, ensure_ascii=False, default=flow_records.json_default))
+
+
+def dump_json(path, obj, indent=2, volatile=VOLATILE_KEYS):
+    """
+    json.dump(obj, indent=indent) en 'path' solo si el contenido cambia.
+    Las claves 'volatile' de primer nivel (la hora de extracción) no cuentan como cambio:
+    si solo cambian ellas se conserva el fichero anterior, con su hora, su mtime y su hash.
+    Devuelve True si se escribió, False si el fichero ya tenía ese contenido.
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    with open(tmp, "w", encoding="utf-8") as fh:
+        w = _HashingWriter(fh)
+        json.dump(obj, w, ensure_ascii=False, indent=indent, default=flow_records.json_default)
+    try:
+        same = path.exists() and os.path.getsize(path) == os.path.getsize(tmp) and sha256_file(path) == w.h.hexdigest()
+        if not same and volatile and isinstance(obj, Mapping) and path.exists():
+            old = load(path)
+            same = bool(old) and _without(old, volatile) == _without(obj, volatile)
+    except OSError:
+        same = False
+    if same:
+        os.remove(tmp)
+        return False
+    os.replace(tmp, path)
+    return True
+
+
+def load(path):
+    try:
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        return data if isinstance(data, dict) else {}
+    except (OSError, ValueError):
+        return {}
+
+
+def _files(out_dir, patterns):
+    seen = set()
+    for pat in patterns:
+        for p in sorted(glob.glob(str(Path(out_dir) / pat))):
+            rel = Path(p).relative_to(out_dir).as_posix()
+            if rel not in seen and not rel.endswith(".tmp"):
+                seen.add(rel)
+                yield rel
+
+
+def build(out_dir, patterns=PATTERNS, remote=None, merge=False):
+    """
+    Recalcula OUT_DIR/manifest.json; reutiliza hashes del anterior si tamaño y mtime coinciden.
+    La versión sigue a la mayor entre el manifiesto local y el remoto. merge=True conserva
+    las entradas remotas de ficheros que no están aquí (jobs por tandas: cada uno sube
+    solo sus eventos).
+    """
+    out_dir = Path(out_dir)
+    old = load(out_dir / MANIFEST_NAME)
+    old_files = old.get("files", {})
+    files = {}
+    for rel in _files(out_dir, patterns):
+        st = os.stat(out_dir / rel)
+        prev = old_files.get(rel) or {}
+        if prev.get("size") == st.st_size and prev.get("mtime_ns") == st.st_mtime_ns and prev.get("sha256"):
+            sha = prev["sha256"]
+        else:
+            sha = file_hash(rel, out_dir / rel)
+        files[rel] = {"sha256": sha, "size": st.st_size, "mtime_ns": st.st_mtime_ns}
+    if merge:
+        for rel, meta in (remote or {}).get("files", {}).items():
+            files.setdefault(rel, meta)
+    manifest = {
+        "version": max(int(old.get("version") or 0), int((remote or {}).get("version") or 0)) + 1,
+        "generated_at": datetime.now().isoformat(timespec="seconds"),
+        "files": files,
+    }
+    tmp = out_dir / (MANIFEST_NAME + ".tmp")
+    tmp.write_text(json.dumps(manifest, ensure_ascii=False, indent=1, sort_keys=True), encoding="utf-8")
+    os.replace(tmp, out_dir / MANIFEST_NAME)
+    return manifest
+
+
+def changed(local, remote, patterns=None):
+    """Rutas del manifiesto local que faltan o difieren en el remoto (filtradas por patrón)."""
+    rfiles = (remote or {}).get("files", {})
+    out = []
+    for rel, meta in sorted((local or {}).get("files", {}).items()):
+        if patterns and not any(fnmatch.fnmatch(rel, p) for p in patterns):
+            continue
+        if (rfiles.get(rel) or {}).get("sha256") != meta.get("sha256"):
+            out.append(rel)
+    return out
+
+
+def selftest():
+    """Mismo evento escrito dos veces con distinta hora → mismo fichero y hash; otro participante → cambia."""
+    res = {"event_id": "evt1", "participants": [{"BinomID": "b1", "club": "Club A"}],
+           "timestamp": "2025-03-01T02:00:00"}
+    with tempfile.TemporaryDirectory() as d:
+        path = Path(d) / "participants" / "02p_evt1.json"
+        dump_json(path, res)
+        sha, mtime = sha256_file(path), os.stat(path).st_mtime_ns
+        rewritten = dump_json(path, dict(res, timestamp="2025-03-02T02:00:00"))
+        same_ok = not rewritten and sha256_file(path) == sha and os.stat(path).st_mtime_ns == mtime
+        changed_ok = (dump_json(path, dict(res, participants=[{"BinomID": "b1", "club": "Club B"}]))
+                      and sha256_file(path) != sha)
+
+        # Runner nuevo: output/ vacío, mismo evento con otra hora, .gz como 'gzip -9 -n'
+        manifests = []
+        for i, stamp in enumerate(("2025-03-01T02:00:00", "2025-03-02T02:00:00")):
+            out = Path(d) / f"run{i}"
+            rel = "participants/02p_evt1.json"
+            dump_json(out / rel, dict(res, timestamp=stamp))
+            with open(out / rel, "rb") as src, gzip.GzipFile(out / (rel + ".gz"), "wb", 9, mtime=0) as gz:
+                gz.write(src.read())
+            manifests.append(build(out))
+        fresh_ok = not changed(manifests[1], manifests[0])
+        fresh_changed = dump_json(Path(d) / "run1" / rel, dict(res, participants=[{"BinomID": "b2"}]))
+        os.remove(Path(d) / "run1" / (rel + ".gz"))
+        fresh_changed = fresh_changed and changed(build(Path(d) / "run1"), manifests[0]) == [rel]
+    ok = same_ok and changed_ok and fresh_ok and fresh_changed
+    print(f"{'✅' if ok else '❌'} Mismos participantes con otra hora → mismo hash: "
+          f"{'sí' if same_ok else 'NO'}; participante cambiado → nuevo hash: {'sí' if changed_ok else 'NO'}; "
+          f"directorio vacío con otra hora → nada que subir: {'sí' if fresh_ok else 'NO'} "
+          f"(y con cambios, solo ese evento: {'sí' if fresh_changed else 'NO'})")
+    return ok
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Manifiesto sha256 de las salidas de FlowAgility")
+    ap.add_argument("cmd", choices=["build", "changed", "selftest"])
+    ap.add_argument("patterns", nargs="*", help="Solo rutas que encajen (changed)")
+    ap.add_argument("--out", default=os.getenv("OUT_DIR", "./output"), help="Directorio de salidas")
+    ap.add_argument("--remote", default=None, help="Manifiesto subido la vez anterior")
+    ap.add_argument("--merge", action="store_true", help="build: conserva las entradas remotas ausentes aquí")
+    args = ap.parse_args()
+    if args.cmd == "selftest":
+        return selftest()
+    out_dir = Path(args.out)
+    remote = load(args.remote) if args.remote else {}
+
+    if args.cmd == "build":
+        m = build(out_dir, remote=remote, merge=args.merge)
+        print(f"✅ Manifiesto v{m['version']}: {len(m['files'])} ficheros → {out_dir / MANIFEST_NAME}",
+              file=sys.stderr)
+        return True
+
+    local = load(out_dir / MANIFEST_NAME) or build(out_dir, remote=remote)
+    rels = changed(local, remote, args.patterns)
+    for rel in rels:
+        print(rel)
+    total = sum(1 for rel in local.get("files", {})
+                if not args.patterns or any(fnmatch.fnmatch(rel, p) for p in args.patterns))
+    print(f"📦 {len(rels)} de {total} ficheros cambiaron respecto al manifiesto remoto", file=sys.stderr)
+    return True
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+FLOWAGILITY - EXPORTACIÓN PARQUET (COLUMNAR, PARTICIONADA POR MES DEL EVENTO)
+- participants: una fila por binomio y evento, columnas comunes de flow_store
+  (dorsal, guia, perro, raza, licencia, club, federacion, grado, altura…).
+- schedule: una fila por binomio y día (día / fecha / mangas).
+- Partición event_month=YYYY-MM (primera fecha del evento; 'sin_fecha' si no hay).
+- club, raza, federacion, grado y altura (y pais, source) como category:
+  diccionario en Parquet, poca memoria al leer.
+- Origen: la base de flow_store si existe (FLOW_DB / --db); si no, los JSON de OUT_DIR
+  (02participants.json, participantes_detallados.json, 01events.json).
+
+    python flow_parquet.py [--out DIR] [--db PATH] [--dest DIR]
+
+Lectura (solo las columnas y meses que hagan falta):
+    pd.read_parquet("output/parquet/participants", columns=["club", "grado"],
+                    filters=[("event_month", "=", "2025-03")])
+
+Requiere pandas + pyarrow.
+"""
+
+import os
+import re
+import sys
+import json
+import shutil
+import sqlite3
+import argparse
+from pathlib import Path
+
+try:
+    import pandas as pd
+    import pyarrow  # noqa: F401  (motor de to_parquet)
+    HAS_PARQUET = True
+except ImportError:
+    HAS_PARQUET = False
+
+import flow_store
+
+CATEGORICAL = ["club", "raza", "federacion", "grado", "altura", "pais", "source"]
+PART_COLUMNS = [c for c in flow_store.PART_COLS if c not in ("raw", "updated_at")]
+SCHEDULE_COLUMNS = ["source", "event_id", "binom_id", "n", "day", "fecha", "mangas"]
+
+_DATE_RE = re.compile(r"(\d{1,2})/(\d{1,2})/(\d{4})")
+
+
+def event_month(fechas):
+    """'15/03/2025 - 16/03/2025' → '2025-03'; sin fecha reconocible → 'sin_fecha'."""
+    m = _DATE_RE.search(fechas or "")
+    if not m:
+        return "sin_fecha"
+    return f"{int(m.group(3)):04d}-{int(m.group(2)):02d}"
+
+
+# ---------- carga ----------
+
+def _rows_from_db(db_path):
+    db = sqlite3.connect(str(db_path))
+    try:
+        months = {eid: event_month(f) for eid, f in db.execute("SELECT event_id, fechas FROM events")}
+        parts = [dict(zip(PART_COLUMNS, r)) for r in
+                 db.execute(f"SELECT {', '.join(PART_COLUMNS)} FROM participants ORDER BY rowid")]
+        sched = [dict(zip(SCHEDULE_COLUMNS, r)) for r in
+                 db.execute(f"SELECT {', '.join(SCHEDULE_COLUMNS)} FROM schedule")]
+    finally:
+        db.close()
+    return parts, sched, months
+
+
+def _load_json(path):
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _rows_from_json(out_dir):
+    out_dir = Path(out_dir)
+    events = _load_json(out_dir / "01events.json") or []
+    if isinstance(events, dict):
+        events = events.get("events", [])
+    months = {flow_store._event_id(ev): event_month(ev.get("fechas")) for ev in events}
+
+    parts, sched = [], []
+
+    def add(rows, source, event=None):
+        for r in rows or []:
+            rec = flow_store.normalize_participant(r, source, event)
+            parts.append(rec)
+            for n, (day, fecha, mangas) in enumerate(flow_store.schedule_of(r), 1):
+                sched.append({"source": source, "event_id": rec["event_id"], "binom_id": rec["binom_id"],
+                              "n": n, "day": day, "fecha": fecha, "mangas": mangas})
+
+    flat = _load_json(out_dir / "02participants.json")
+    if isinstance(flat, list):
+        add(flat, flow_store._source_of(flat))
+    for ev in _load_json(out_dir / "participantes_detallados.json") or []:
+        info = ev.get("informacion_evento") or {}
+        months.setdefault(flow_store._s(info.get("event_id")), event_month(info.get("event_fechas")))
+        add(ev.get("participantes"), "github", info)
+    return parts, sched, months
+
+
+def load_rows(out_dir, db=None):
+    """(participants, schedule, {event_id: mes}) desde la base de flow_store o los JSON."""
+    db_path = Path(db) if db else flow_store._default_path()
+    if db_path.exists():
+        return _rows_from_db(db_path)
+    return _rows_from_json(out_dir)
+
+
+# ---------- escritura ----------
+
+def _frame(rows, columns, months):
+    df = pd.DataFrame(rows, columns=columns)
+    df["event_month"] = df["event_id"].map(months).fillna("sin_fecha")
+    for col in CATEGORICAL:
+        if col in df.columns:
+            df[col] = df[col].fillna("").astype("category")
+    return df
+
+
+def _write_dataset(df, dest):
+    """Escribe en un directorio temporal y lo cambia por el anterior (sin particiones huérfanas)."""
+    dest = Path(dest)
+    tmp = dest.with_name(dest.name + ".tmp")
+    shutil.rmtree(tmp, ignore_errors=True)
+    df.to_parquet(tmp, engine="pyarrow", partition_cols=["event_month"], index=False)
+    shutil.rmtree(dest, ignore_errors=True)
+    os.replace(tmp, dest)
+
+
+def export(out_dir, dest=None, db=None):
+    if not HAS_PARQUET:
+        print("❌ Falta pandas/pyarrow: pip install pandas pyarrow")
+        return False
+    dest = Path(dest) if dest else Path(out_dir) / "parquet"
+    parts, sched, months = load_rows(out_dir, db)
+    if not parts:
+        print(f"❌ Sin participantes que exportar en {out_dir}")
+        return False
+    # Los meses de eventos sin fila en 'events' se toman de su primer día con fecha
+    for s in sched:
+        if months.get(s["event_id"], "sin_fecha") == "sin_fecha":
+            m = event_month(s["fecha"])
+            if m != "sin_fecha":
+                months[s["event_id"]] = m
+
+    df_p = _frame(parts, PART_COLUMNS, months)
+    _write_dataset(df_p, dest / "participants")
+    df_s = _frame(sched, SCHEDULE_COLUMNS, months)
+    df_s["n"] = df_s["n"].astype("int16")
+    if len(df_s):
+        _write_dataset(df_s, dest / "schedule")
+    print(f"✅ Parquet: {len(df_p)} participantes y {len(df_s)} días en "
+          f"{df_p['event_month'].nunique()} meses → {dest}")
+    return True
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Exporta participantes y horarios a Parquet")
+    ap.add_argument("--out", default=os.getenv("OUT_DIR", "./output"), help="Directorio de los JSON")
+    ap.add_argument("--db", default=None, help="Base de flow_store (FLOW_DB); si no existe, se leen los JSON")
+    ap.add_argument("--dest", default=None, help="Destino (por defecto OUT_DIR/parquet)")
+    args = ap.parse_args()
+    return export(args.out, args.dest, args.db)
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
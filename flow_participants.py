@@ -20,10 +20,16 @@ ENV claves que puedes ajustar sin tocar código:
   FLOW_SELECTOR_PARTS_THEAD    (default: "thead tr th")
   FLOW_SELECTOR_PARTS_ROWS     (default: "tbody tr")
   FLOW_SELECTOR_PARTS_CELLS    (default: "td")
+  FLOW_SELECTOR_PARTS_NEXT     (default: "" → sin paginación; CSS del botón "siguiente")
+  FLOW_TABLE_MODE              (default: snapshot → 1 execute_script por página; elements = lectura antigua)
+  FLOW_TABLE_VIRTUAL           (default: 0; 1 = desplaza listas virtualizadas y acumula filas)
   FLOW_PARTS_URL_SUFFIX        (default: "/participants_list")  # si no se da participants_url
 
 Además:
   HEADLESS=true|false
+  WORKERS (o --workers N): nº de navegadores en paralelo; cada uno hace login
+      una vez y toma eventos de una cola compartida (1 = modo serie)
+  RATE_CAP_PER_MIN: tope global de cargas de página/min entre todos los workers (0 = sin tope)
   THROTTLE_EVENT_S_MIN / THROTTLE_EVENT_S_MAX
   PER_EVENT_MAX_S
   MAX_PANELS_PER_EVENT (no usado si no hay subpaneles)
@@ -35,6 +41,8 @@ Requisitos:
 """
 
 import argparse, json, os, random, sys, time, pathlib, signal, re
+import multiprocessing as mp
+import queue
 from datetime import datetime
 from typing import List, Dict, Tuple, Optional
 
@@ -46,6 +54,14 @@ from selenium.common.exceptions import TimeoutException, NoSuchElementException,
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 
+import flow_jsonstream
+import flow_lite
+import flow_manifest
+import flow_ratelimit
+import flow_session
+import flow_store
+import flow_waits
+
 
 # ------------------------ Utilidades ENV/CLI ------------------------
 
@@ -73,6 +89,7 @@ def parse_args():
     p.add_argument("--chunk-offset", type=int, default=None, help="Offset de tanda (por defecto: env CHUNK_OFFSET o 0)")
     p.add_argument("--limit-events", type=int, default=None, help="Limitar nº de eventos (0 = sin límite)")
     p.add_argument("--max-runtime-min", type=int, default=None, help="Tiempo máx. global (min) para cortar ordenadamente")
+    p.add_argument("--workers", type=int, default=None, help="Navegadores en paralelo (por defecto: env WORKERS o 1)")
     return p.parse_args()
 
 
@@ -135,16 +152,17 @@ def build_driver(headless: bool = True) -> webdriver.Chrome:
     # Evitar “automation” banners
     opts.add_experimental_option("excludeSwitches", ["enable-automation"])
     opts.add_experimental_option("useAutomationExtension", False)
+    flow_lite.apply_options(opts)
 
     # Si chromedriver está en PATH, Selenium lo encuentra. Si no, se puede usar webdriver_manager
     try:
         drv = webdriver.Chrome(options=opts)
-        return drv
     except WebDriverException as e:
         # Fallback a webdriver_manager si hiciera falta en entorno local
         from webdriver_manager.chrome import ChromeDriverManager
         drv = webdriver.Chrome(ChromeDriverManager().install(), options=opts)
-        return drv
+    flow_lite.activate(drv)
+    return drv
 
 
 def selenium_get(driver: webdriver.Chrome, url: str, timeout: int = 30):
@@ -167,6 +185,19 @@ def element_exists(driver: webdriver.Chrome, css: str) -> bool:
 # ------------------------ Login ------------------------
 
 def perform_login(driver: webdriver.Chrome) -> bool:
+    """
+    Login con caché de sesión en disco (flow_session): si hay cookies válidas se
+    inyectan sin pasar por el formulario; los workers del pool comparten un solo login.
+    """
+    email = getenv_str("FLOW_EMAIL", "").strip()
+    if not email or not getenv_str("FLOW_PASS", "").strip():
+        return _form_login(driver)
+    base = getenv_str("FLOW_BASE_URL", "https://flowagility.com").rstrip("/")
+    return flow_session.login(driver, _form_login, base, email,
+                              log=lambda m: print(f"[INFO] {m}", flush=True))
+
+
+def _form_login(driver: webdriver.Chrome) -> bool:
     """
     Realiza login si FLOW_EMAIL/FLOW_PASS están definidos.
     Devuelve True si considera que hay sesión abierta (o no es necesario).
@@ -264,33 +295,182 @@ def header_slugify(h: str) -> str:
     return alias.get(s, s)
 
 
-def extract_table(driver: webdriver.Chrome) -> Tuple[List[Dict], List[str]]:
+# Una sola llamada: cabeceras + textos de todas las celdas (y, si se pide, avanza
+# a la página siguiente o desplaza la lista virtualizada tras leer).
+JS_TABLE_SNAPSHOT = r"""
+const a = arguments[0];
+const txt = el => (el.innerText || el.textContent || "").trim();
+const headers = Array.from(document.querySelectorAll(a.thead)).map(txt);
+const first = document.querySelector(a.rows);
+const width = first ? first.querySelectorAll(a.cells).length : 0;
+// Contenedor con scroll más cercano a las filas (o la ventana), para listas virtualizadas
+let sc = null;
+if (a.virtual && first) {
+  let box = first.parentElement;
+  while (box && box !== document.body &&
+         !(box.scrollHeight > box.clientHeight + 1 && /(auto|scroll)/.test(getComputedStyle(box).overflowY))) {
+    box = box.parentElement;
+  }
+  sc = (box && box !== document.body) ? box : document.scrollingElement;
+}
+const scTop = sc ? (sc === document.scrollingElement ? 0 : sc.getBoundingClientRect().top) - sc.scrollTop : 0;
+// Identidad de fila: atributo de datos o índice de la rejilla; si no hay, su posición
+// dentro del contenido desplazable (estable al hacer scroll)
+const rowKey = (tr, i) => {
+  const id = tr.getAttribute("data-id") || tr.getAttribute("data-row-key") || tr.getAttribute("data-index")
+          || tr.getAttribute("aria-rowindex") || tr.id;
+  if (id) return "id:" + id;
+  return sc ? "y:" + Math.round(tr.getBoundingClientRect().top - scTop) : "i:" + i;
+};
+const rows = [], keys = [];
+for (const tr of document.querySelectorAll(a.rows)) {
+  const tds = tr.querySelectorAll(a.cells);
+  if (!tds.length) continue;
+  keys.push(rowKey(tr, rows.length));
+  rows.push(Array.from(tds).map(txt));
+}
+let more = false, advanced = false;
+if (a.next) {
+  // Solo se informa: el clic (que sí navega) lo hace JS_TABLE_NEXT tras pedir token
+  const btn = document.querySelector(a.next);
+  more = !!(btn && !btn.disabled && btn.getAttribute("aria-disabled") !== "true" && !btn.classList.contains("disabled"));
+} else if (sc) {
+  const before = sc.scrollTop;
+  sc.scrollTop = before + Math.max(sc.clientHeight * 0.9, 200);
+  advanced = sc.scrollTop > before;
+}
+return { headers: headers, rows: rows, keys: keys, width: width, more: more, advanced: advanced,
+         sig: rows.length ? rows[0].join("|") + "#" + rows.length : "" };
+"""
+
+JS_TABLE_NEXT = r"""
+const btn = document.querySelector(arguments[0]);
+if (!btn || btn.disabled) return false;
+btn.click();
+return true;
+"""
+
+# La tabla cambió respecto a la firma anterior (primera fila + nº de filas)
+PRED_TABLE_CHANGED = r"""
+let first = null, n = 0;
+for (const tr of document.querySelectorAll(args.rows)) {
+  const tds = tr.querySelectorAll(args.cells);
+  if (!tds.length) continue;
+  n++;
+  if (first === null) first = Array.from(tds).map(td => (td.innerText || td.textContent || "").trim()).join("|");
+}
+const sig = n ? first + "#" + n : "";
+return sig !== args.sig ? sig : null;
+"""
+
+
+def table_snapshot(driver: webdriver.Chrome, sel_thead: str, sel_rows: str, sel_cells: str,
+                   next_sel: str = "", virtual: bool = False, max_pages: int = 200,
+                   step_wait_s: float = 3.0) -> Tuple[List[str], List[List[str]], int, Dict]:
+    """
+    Cabeceras y filas (listas de textos) con una llamada execute_script por página.
+    - next_sel: CSS del botón "siguiente"; se pulsa tras leer cada página.
+    - virtual: lista virtualizada; se desplaza tras leer y se acumulan filas nuevas.
+    Devuelve (headers_raw, rows, ancho_primera_fila, info{round_trips, pages}).
+    """
+    args = {"thead": sel_thead, "rows": sel_rows, "cells": sel_cells,
+            "next": next_sel, "virtual": bool(virtual) and not next_sel}
+    info = {"round_trips": 0, "pages": 0}
+    headers: List[str] = []
+    rows: List[List[str]] = []
+    seen = set()
+    width = 0
+    for _ in range(max(1, max_pages)):
+        snap = driver.execute_script(JS_TABLE_SNAPSHOT, args) or {}
+        info["round_trips"] += 1
+        info["pages"] += 1
+        if not headers:
+            headers = snap.get("headers") or []
+            width = snap.get("width") or 0
+        new = 0
+        keys = snap.get("keys") or []
+        for i, r in enumerate(snap.get("rows") or []):
+            if args["virtual"]:
+                # Por identidad de fila, no por contenido: dos filas iguales son dos filas
+                key = keys[i] if i < len(keys) else tuple(r)
+                if key in seen:
+                    continue
+                seen.add(key)
+            rows.append(r)
+            new += 1
+        if next_sel:
+            if not snap.get("more"):
+                break
+            # Solo el clic en "siguiente" pide otra página: ahí se consume el token
+            flow_ratelimit.acquire("page")
+            info["round_trips"] += 1
+            if not driver.execute_script(JS_TABLE_NEXT, next_sel):
+                break
+        elif not snap.get("advanced") or (args["virtual"] and not new and info["pages"] > 1):
+            break
+        changed = flow_waits.wait_for(driver, PRED_TABLE_CHANGED, step_wait_s, "table_step",
+                                      {"rows": sel_rows, "cells": sel_cells, "sig": snap.get("sig", "")})
+        info["round_trips"] += 1
+        if changed is None and next_sel:
+            break  # el botón no cambió la tabla: última página
+    return headers, rows, width, info
+
+
+def _table_elements(driver: webdriver.Chrome, sel_thead: str, sel_rows: str,
+                    sel_cells: str) -> Tuple[List[str], List[List[str]], int, Dict]:
+    """Lectura anterior, elemento a elemento (FLOW_TABLE_MODE=elements, para comparar)."""
+    trips = 1
+    ths = driver.find_elements(By.CSS_SELECTOR, sel_thead)
+    headers_raw = [th.text.strip() for th in ths]
+    trips += len(ths)
+    trs = driver.find_elements(By.CSS_SELECTOR, sel_rows)
+    trips += 1
+    width = 0
+    if not headers_raw and trs:
+        width = len(trs[0].find_elements(By.CSS_SELECTOR, sel_cells))
+        trips += 1
+    rows = []
+    for tr in trs:
+        tds = tr.find_elements(By.CSS_SELECTOR, sel_cells)
+        trips += 1 + len(tds)
+        if tds:
+            rows.append([td.text.strip() for td in tds])
+    return headers_raw, rows, width, {"round_trips": trips, "pages": 1}
+
+
+def extract_table(driver: webdriver.Chrome, stats: Optional[Dict] = None) -> Tuple[List[Dict], List[str]]:
     """
     Extrae cabeceras + filas de la tabla de participantes visible en la página actual.
     Usa selectores configurables (ENV) y devuelve (rows, headers_norm).
+    Por defecto todo en un execute_script por página (FLOW_TABLE_MODE=snapshot);
+    con FLOW_SELECTOR_PARTS_NEXT recorre la paginación y con FLOW_TABLE_VIRTUAL=1
+    desplaza listas virtualizadas. 'stats' recibe round_trips / páginas / segundos.
     """
     sel_table = getenv_str("FLOW_SELECTOR_PARTS_TABLE", "table")
     sel_thead = getenv_str("FLOW_SELECTOR_PARTS_THEAD", "thead tr th")
     sel_rows  = getenv_str("FLOW_SELECTOR_PARTS_ROWS", "tbody tr")
     sel_cells = getenv_str("FLOW_SELECTOR_PARTS_CELLS", "td")
+    mode      = getenv_str("FLOW_TABLE_MODE", "snapshot").strip().lower()
 
     wait_css(driver, sel_table, 30)
-    # Tomamos cabeceras
-    headers_raw = [th.text.strip() for th in driver.find_elements(By.CSS_SELECTOR, sel_thead)]
+    t0 = time.time()
+    if mode == "elements":
+        headers_raw, values_rows, width, info = _table_elements(driver, sel_thead, sel_rows, sel_cells)
+    else:
+        headers_raw, values_rows, width, info = table_snapshot(
+            driver, sel_thead, sel_rows, sel_cells,
+            next_sel=getenv_str("FLOW_SELECTOR_PARTS_NEXT", "").strip(),
+            virtual=getenv_int("FLOW_TABLE_VIRTUAL", 0) == 1,
+            max_pages=getenv_int("FLOW_TABLE_MAX_PAGES", 200),
+            step_wait_s=getenv_float("FLOW_TABLE_STEP_WAIT_S", 3.0),
+        )
     headers = [header_slugify(h) for h in headers_raw]
     # Si no hay thead, intentar inferir desde primera fila
-    if not headers:
-        first_row = driver.find_elements(By.CSS_SELECTOR, sel_rows)[:1]
-        if first_row:
-            n = len(first_row[0].find_elements(By.CSS_SELECTOR, sel_cells))
-            headers = [f"col_{i+1}" for i in range(n)]
+    if not headers and width:
+        headers = [f"col_{i+1}" for i in range(width)]
 
     out = []
-    for tr in driver.find_elements(By.CSS_SELECTOR, sel_rows):
-        tds = tr.find_elements(By.CSS_SELECTOR, sel_cells)
-        if not tds:
-            continue
-        values = [td.text.strip() for td in tds]
+    for values in values_rows:
         # Alinear longitudes
         if len(values) < len(headers):
             values += [""] * (len(headers) - len(values))
@@ -299,6 +479,9 @@ def extract_table(driver: webdriver.Chrome) -> Tuple[List[Dict], List[str]]:
         row = dict(zip(headers, values))
         out.append(row)
 
+    if stats is not None:
+        stats.update({"table_mode": mode, "table_round_trips": info["round_trips"],
+                      "table_pages": info["pages"], "table_s": round(time.time() - t0, 2)})
     return out, headers
 
 
@@ -353,17 +536,17 @@ def scrape_participants_for_event(
 
     # Cargar página
     try:
+        flow_ratelimit.acquire("page")
         selenium_get(driver, parts_url, timeout=min(60, per_event_max_s))
+        flow_lite.record(driver, "participants_list")
     except TimeoutException:
         print("[WARN] Timeout cargando lista; aún así intento leer tabla si está presente…", flush=True)
 
-    # Si hay controles como "Mostrar X por página" o paginación:
-    # - Este código sólo extrae la tabla visible. Si hay paginación, puedes:
-    #   1) Subir "mostrar 1000 por página" si existe
-    #   2) Iterar paginación (selector ENV) y concatenar
-    # Para mantenerlo general, aquí extraemos la tabla actual.
+    # Paginación: FLOW_SELECTOR_PARTS_NEXT (botón "siguiente") recorre todas las páginas.
+    # Listas virtualizadas: FLOW_TABLE_VIRTUAL=1. Sin ellas se lee la tabla actual.
 
-    rows, headers = extract_table(driver)
+    table_stats: Dict = {}
+    rows, headers = extract_table(driver, table_stats)
     participants = to_participants_schema(rows, event_id, event_title)
 
     dbg = {
@@ -373,10 +556,155 @@ def scrape_participants_for_event(
         "headers_detected": headers,
         "count": len(participants),
         "duration_s": round(time.time() - t0, 2),
+        **table_stats,
     }
     return participants, dbg
 
 
+# ------------------------ Ejecución: serie / pool de workers ------------------------
+
+def scrape_event_safe(driver: webdriver.Chrome, ev: dict, per_event_max_s: int) -> Tuple[List[Dict], Dict]:
+    try:
+        return scrape_participants_for_event(driver, ev, per_event_max_s=per_event_max_s)
+    except Exception as e:
+        event_id = pick_event_id(ev)
+        print(f"[ERROR] Evento {event_id} → {e}", file=sys.stderr, flush=True)
+        return [], {
+            "event_id": event_id,
+            "event_title": pick_event_title(ev),
+            "error": str(e),
+        }
+
+
+def write_event_file(out_dir: pathlib.Path, event_id: str, participants: List[Dict]):
+    per_event_path = out_dir / "participants" / f"02p_{event_id}.json"
+    try:
+        flow_manifest.dump_json(per_event_path, participants)  # no reescribe si no cambió
+    except Exception as e:
+        print(f"[ERROR] Escribiendo {per_event_path}: {e}", file=sys.stderr, flush=True)
+    flow_store.save_participants(participants, "table", {"event_id": event_id})
+
+
+def run_serial(events_slice: List[dict], headless: bool, per_event_max_s: int,
+               throttle_min: float, throttle_max: float, deadline: float, stop: Dict,
+               out_dir: pathlib.Path, emit):
+    """Modo clásico: un único navegador recorre events_slice en orden; emit(participants, dbg) por evento."""
+    driver = build_driver(headless=headless)
+    try:
+        # Login si procede
+        if not perform_login(driver):
+            print("[WARN] No se pudo verificar login. Intento continuar en público…", flush=True)
+
+        for idx, ev in enumerate(events_slice, 1):
+            if stop["flag"] or time.time() >= deadline:
+                print("[INFO] Tiempo agotado o corte solicitado. Salgo del bucle.", flush=True)
+                break
+
+            event_id = pick_event_id(ev)
+            event_title = pick_event_title(ev)
+            print(f"[INFO] ({idx}/{len(events_slice)}) {event_title} [{event_id}]", flush=True)
+
+            participants, dbg = scrape_event_safe(driver, ev, per_event_max_s)
+
+            # Guardado por evento
+            write_event_file(out_dir, event_id, participants)
+            emit(participants, dbg)
+
+            # Throttle entre eventos
+            if idx < len(events_slice):
+                sleep_s = random.uniform(throttle_min, throttle_max)
+                if time.time() + sleep_s < deadline:
+                    time.sleep(sleep_s)
+
+    finally:
+        try:
+            driver.quit()
+        except Exception:
+            pass
+
+
+def _worker_main(wid: int, tasks, results, stop_evt, cfg: Dict):
+    """Proceso worker: un navegador, un login, eventos de la cola compartida hasta el centinela None."""
+    signal.signal(signal.SIGINT, lambda *_: stop_evt.set())
+    signal.signal(signal.SIGTERM, lambda *_: stop_evt.set())
+    driver = None
+    try:
+        driver = build_driver(headless=cfg["headless"])
+        if not perform_login(driver):
+            print(f"[WARN] Worker {wid}: no se pudo verificar login. Continúo en público…", flush=True)
+        while True:
+            item = tasks.get()
+            if item is None:
+                break
+            idx, ev = item
+            if stop_evt.is_set() or time.time() >= cfg["deadline"]:
+                continue  # drena la cola sin procesar
+            print(f"[INFO] [w{wid}] ({idx + 1}/{cfg['total']}) {pick_event_title(ev)} [{pick_event_id(ev)}]", flush=True)
+            participants, dbg = scrape_event_safe(driver, ev, cfg["per_event_max_s"])
+            results.put((idx, participants, dbg))
+
+            sleep_s = random.uniform(cfg["throttle_min"], cfg["throttle_max"])
+            if time.time() + sleep_s < cfg["deadline"] and not stop_evt.is_set():
+                time.sleep(sleep_s)
+    except Exception as e:
+        print(f"[ERROR] Worker {wid} abortado: {e}", file=sys.stderr, flush=True)
+    finally:
+        try:
+            if driver:
+                driver.quit()
+        except Exception:
+            pass
+        results.put(("done", wid, None))
+
+
+def run_worker_pool(events_slice: List[dict], workers: int, out_dir: pathlib.Path, cfg: Dict, stop: Dict,
+                    emit):
+    """
+    Reparte events_slice entre 'workers' procesos. Los 02p_<id>.json se escriben en el padre
+    según llegan; emit(participants, dbg) se llama en el orden del índice original (solo se
+    retienen los resultados que llegan adelantados) → mismo resultado que en serie.
+    """
+    ctx = mp.get_context("fork") if hasattr(os, "fork") else mp.get_context()
+    tasks, results, stop_evt = ctx.Queue(), ctx.Queue(), ctx.Event()
+    for idx, ev in enumerate(events_slice):
+        tasks.put((idx, ev))
+    for _ in range(workers):
+        tasks.put(None)
+
+    procs = [ctx.Process(target=_worker_main, args=(w, tasks, results, stop_evt, cfg), daemon=True)
+             for w in range(1, workers + 1)]
+    for pr in procs:
+        pr.start()
+
+    by_idx: Dict[int, Tuple[List[Dict], Dict]] = {}
+    next_idx = 0
+    alive = workers
+    while alive:
+        if stop["flag"]:
+            stop_evt.set()
+        try:
+            msg = results.get(timeout=1.0)
+        except queue.Empty:
+            if not any(pr.is_alive() for pr in procs):
+                break
+            continue
+        if msg[0] == "done":
+            alive -= 1
+            continue
+        idx, participants, dbg = msg
+        write_event_file(out_dir, pick_event_id(events_slice[idx]), participants)
+        by_idx[idx] = (participants, dbg)
+        while next_idx in by_idx:
+            emit(*by_idx.pop(next_idx))
+            next_idx += 1
+
+    for pr in procs:
+        pr.join(timeout=30)
+    # Huecos (eventos no procesados por corte): el resto sale en orden
+    for i in sorted(by_idx):
+        emit(*by_idx.pop(i))
+
+
 # ------------------------ Main ------------------------
 
 def main():
@@ -388,6 +716,12 @@ def main():
     limit_events    = args.limit_events    if args.limit_events    is not None else getenv_int("LIMIT_EVENTS", 0)
     max_runtime_min = args.max_runtime_min if args.max_runtime_min is not None else getenv_int("MAX_RUNTIME_MIN", 55)
 
+    workers         = args.workers         if args.workers         is not None else getenv_int("WORKERS", 1)
+    # Límite global de cargas/min (token bucket en fichero, compartido por todos los procesos
+    # de la máquina). RATE_CAP_PER_MIN se mantiene como alias de FLOW_RATE_PER_MIN.
+    rate_cap        = getenv_float("RATE_CAP_PER_MIN", 0.0) or getenv_float("FLOW_RATE_PER_MIN", 0.0)
+    flow_ratelimit.configure(per_min=rate_cap)
+
     dbg_mode = getenv_int("DEBUG_PARTICIPANTS", 0) == 1
 
     throttle_event_s_min = getenv_float("THROTTLE_EVENT_S_MIN", 8.0)
@@ -436,68 +770,40 @@ def main():
     signal.signal(signal.SIGINT, handler)
 
     headless = getenv_str("HEADLESS", "true").lower() == "true"
-    driver = build_driver(headless=headless)
 
-    all_participants: List[Dict] = []
+    # Agregado en streaming: cada evento se añade al llegar su turno; el array se cierra
+    # también con SIGTERM (el handler de arriba solo pide un corte ordenado)
+    out_json = out_dir / "02participants.json"
+    out_dbg  = out_dir / "02participants_debug.json"
     per_event_debug: List[Dict] = []
+    aggregated = flow_jsonstream.JsonArrayWriter(out_json)
 
-    try:
-        # Login si procede
-        if not perform_login(driver):
-            print("[WARN] No se pudo verificar login. Intento continuar en público…", flush=True)
-
-        for idx, ev in enumerate(events_slice, 1):
-            if stop["flag"] or time.time() >= deadline:
-                print("[INFO] Tiempo agotado o corte solicitado. Salgo del bucle.", flush=True)
-                break
-
-            event_id = pick_event_id(ev)
-            event_title = pick_event_title(ev)
-            print(f"[INFO] ({idx}/{len(events_slice)}) {event_title} [{event_id}]", flush=True)
-
-            try:
-                participants, dbg = scrape_participants_for_event(
-                    driver, ev, per_event_max_s=per_event_max_s
-                )
-            except Exception as e:
-                print(f"[ERROR] Evento {event_id} → {e}", file=sys.stderr, flush=True)
-                participants, dbg = [], {
-                    "event_id": event_id,
-                    "event_title": event_title,
-                    "error": str(e),
-                }
-
-            # Guardado por evento
-            per_event_path = out_dir / "participants" / f"02p_{event_id}.json"
-            try:
-                per_event_path.write_text(json.dumps(participants, ensure_ascii=False, indent=2), encoding="utf-8")
-            except Exception as e:
-                print(f"[ERROR] Escribiendo {per_event_path}: {e}", file=sys.stderr, flush=True)
-
-            all_participants.extend(participants)
-            per_event_debug.append(dbg)
-
-            # Throttle entre eventos
-            if idx < len(events_slice):
-                sleep_s = random.uniform(throttle_event_s_min, throttle_event_s_max)
-                if time.time() + sleep_s < deadline:
-                    time.sleep(sleep_s)
+    def emit(participants: List[Dict], dbg: Dict):
+        aggregated.extend(participants)
+        per_event_debug.append(dbg)
 
+    workers = max(1, min(workers, len(events_slice) or 1))
+    try:
+        if workers > 1:
+            print(f"[INFO] Modo pool: {workers} workers (límite global {rate_cap or 'sin tope'}/min)", flush=True)
+            cfg = {
+                "headless": headless,
+                "deadline": deadline,
+                "total": len(events_slice),
+                "per_event_max_s": per_event_max_s,
+                "throttle_min": throttle_event_s_min,
+                "throttle_max": throttle_event_s_max,
+            }
+            run_worker_pool(events_slice, workers, out_dir, cfg, stop, emit)
+        else:
+            run_serial(events_slice, headless, per_event_max_s, throttle_event_s_min, throttle_event_s_max,
+                       deadline, stop, out_dir, emit)
     finally:
         try:
-            driver.quit()
-        except Exception:
-            pass
-
-    # Guardados globales
-    out_json = out_dir / "02participants.json"
-    out_dbg  = out_dir / "02participants_debug.json"
-
-    try:
-        out_json.write_text(json.dumps(all_participants, ensure_ascii=False, indent=2), encoding="utf-8")
-        print(f"[INFO] Escrito {out_json} ({len(all_participants)} participantes)", flush=True)
-    except Exception as e:
-        print(f"[ERROR] Escribiendo {out_json}: {e}", file=sys.stderr, flush=True)
+            aggregated.close()
+            print(f"[INFO] Escrito {out_json} ({aggregated.count} participantes)", flush=True)
+        except Exception as e:
+            print(f"[ERROR] Escribiendo {out_json}: {e}", file=sys.stderr, flush=True)
 
     try:
         meta = {
@@ -31,6 +31,12 @@ try:
 except ImportError:
     HAS_WDM = False
 
+import flow_lite
+import flow_manifest
+import flow_ratelimit
+import flow_session
+import flow_store
+
 BASE = "https://www.flowagility.com"
 SCRIPT_DIR = Path(__file__).resolve().parent
 
@@ -74,6 +80,7 @@ def _get_driver():
     opts.add_argument(f"--user-agent={ua}")
     opts.add_experimental_option("excludeSwitches", ["enable-automation"])
     opts.add_experimental_option('useAutomationExtension', False)
+    flow_lite.apply_options(opts)
 
     exe = None
     for p in ["/usr/local/bin/chromedriver","/usr/bin/chromedriver","/snap/bin/chromedriver"]:
@@ -84,11 +91,16 @@ def _get_driver():
     service = Service(executable_path=exe) if exe else None
     driver = webdriver.Chrome(service=service, options=opts) if service else webdriver.Chrome(options=opts)
     driver.execute_script("Object.defineProperty(navigator,'webdriver',{get:()=>undefined})")
+    flow_lite.activate(driver)
     driver.set_page_load_timeout(75)
     driver.implicitly_wait(2)
     return driver
 
 def _login(driver):
+    """Login con caché de sesión compartida (flow_session); formulario solo si hace falta."""
+    return flow_session.login(driver, _form_login, BASE, FLOW_EMAIL, log=log)
+
+def _form_login(driver):
     log("Login…")
     driver.get(f"{BASE}/user/login")
     WebDriverWait(driver, 45).until(EC.presence_of_element_located((By.TAG_NAME,"body")))
@@ -246,8 +258,10 @@ def extract_event_participants(driver, event, per_event_deadline):
     }
     if not url: return out
     try:
+        flow_ratelimit.acquire("page")
         driver.get(url)
         WebDriverWait(driver, 25).until(EC.presence_of_element_located((By.TAG_NAME,"body")))
+        flow_lite.record(driver, "participants_list")
         _accept_cookies(driver)
     except: return out
 
@@ -305,7 +319,8 @@ def main():
         res = extract_event_participants(driver, ev, _deadline(PER_EVENT_MAX_S))
         aggregated.extend(res["participants"])
         out_path = Path(OUT_DIR)/"participants"/f"02p_{ev.get('id','idx'+str(i))}.json"
-        with open(out_path,"w",encoding="utf-8") as f: json.dump(res,f,ensure_ascii=False,indent=2)
+        flow_manifest.dump_json(out_path, res)
+        flow_store.save_participants(res["participants"], "scrapy", ev)
         sleep(0.3,0.7)
 
     with open(Path(OUT_DIR)/"02participants.json","w",encoding="utf-8") as f:
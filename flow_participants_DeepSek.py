@@ -10,11 +10,15 @@ FLOWAGILITY SCRAPER - MÓDULO 2 (MEJORADO CON PAGINACIÓN): PARTICIPANTES DETALL
 - Navegación por paginación para obtener TODOS los participantes.
 - Intenta subir 'Mostrar por página' (1000/500/250...) si existe.
 - Si no hay paginación, usa scroll infinito como respaldo.
+- PIPELINE_TABS>1: varias pestañas de la misma sesión; mientras se parsea el
+  evento N, las otras ya cargan participants_list de N+1… y conectan LiveView.
 - Salidas:
   * ./output/02participants.json
   * ./output/02participants_debug.json (si DEBUG_PARTICIPANTS=1)
   * ./output/participants/02p_<event_id>.json (por evento)
   * ./output/participants/raw_<event_id>_pageX.html (dump si no hay toggles)
+  * ./output/snapshots/ (SNAPSHOTS=1): HTML de listas y paneles para re-parsear
+    sin navegador (python flow_snapshots.py reparse deepsek)
 """
 
 import os
@@ -47,6 +51,17 @@ try:
 except ImportError:
     HAS_WDM = False
 
+import flow_jsonstream
+import flow_lite
+import flow_manifest
+import flow_ratelimit
+import flow_records
+import flow_session
+import flow_snapshots
+import flow_store
+import flow_throttle
+import flow_waits
+
 BASE = os.getenv("FLOW_BASE_URL", "https://www.flowagility.com").rstrip("/")
 SCRIPT_DIR = Path(__file__).resolve().parent
 
@@ -66,6 +81,23 @@ PER_EVENT_MAX_S = int(os.getenv("PER_EVENT_MAX_S", "600"))  # 0 = sin límite (a
 MAX_RUNTIME_MIN = int(os.getenv("MAX_RUNTIME_MIN", "0"))    # 0 = sin límite global
 DEBUG_PARTICIPANTS = os.getenv("DEBUG_PARTICIPANTS", "0") == "1"
 MAX_PAGES       = int(os.getenv("MAX_PAGES", "0"))          # 0 = todas las páginas
+PIPELINE_TABS   = int(os.getenv("PIPELINE_TABS", "1"))      # 1 = sin precarga en pestañas
+LIVEVIEW_READY_MAX_S = float(os.getenv("LIVEVIEW_READY_MAX_S", "30"))
+BATCH_PANELS    = int(os.getenv("BATCH_PANELS", "8"))       # toggles por lote (<=1 = uno a uno)
+BATCH_PANEL_TIMEOUT_S = float(os.getenv("BATCH_PANEL_TIMEOUT_S", "8"))
+THROTTLE_RPM    = int(os.getenv("THROTTLE_RPM", "60"))      # techo de peticiones/minuto (≈ ritmo uno a uno)
+
+# Pausas adaptativas (AIMD) con los rangos fijos de siempre como punto de partida y mínimo.
+# "batch" es por panel y hereda el rango del toggle: tras un lote se duerme como mínimo
+# nº de paneles × mínimo por toggle, igual que si se hubieran abierto uno a uno.
+TOGGLE_PAUSE_S = (0.37, 0.67)
+THROTTLE = flow_throttle.Throttle({
+    "page":       (0.8, 1.4),
+    "pagination": (0.8, 1.2),
+    "toggle":     TOGGLE_PAUSE_S,
+    "batch":      TOGGLE_PAUSE_S,
+    "event":      (0.5, 1.0),
+}, rpm=THROTTLE_RPM)
 
 # Subir “Mostrar por página” si existe
 PAGESIZE_CANDIDATES = (
@@ -122,6 +154,7 @@ def _get_driver():
     opts.add_argument(f"--user-agent={ua}")
     opts.add_experimental_option("excludeSwitches", ["enable-automation"])
     opts.add_experimental_option('useAutomationExtension', False)
+    flow_lite.apply_options(opts)
 
     exe = None
     for p in ["/usr/local/bin/chromedriver","/usr/bin/chromedriver","/snap/bin/chromedriver"]:
@@ -144,11 +177,16 @@ def _get_driver():
             driver = webdriver.Chrome(options=opts)
 
     driver.execute_script("Object.defineProperty(navigator,'webdriver',{get:()=>undefined})")
+    flow_lite.activate(driver)
     driver.set_page_load_timeout(75)
     driver.implicitly_wait(2)
     return driver
 
 def _login(driver):
+    """Login con caché de sesión compartida (flow_session); formulario solo si hace falta."""
+    return flow_session.login(driver, _form_login, BASE, FLOW_EMAIL, log=log)
+
+def _form_login(driver):
     log("Login…")
     login_url = f"{BASE}/user/login"
     driver.get(login_url)
@@ -200,6 +238,60 @@ def _accept_cookies(driver):
     except Exception: pass
     return True
 
+# ===================== Pestañas en pipeline =====================
+
+class _TabPipeline:
+    """
+    Pestañas de una misma sesión logueada. prefetch() lanza la navegación en pestañas
+    libres (window.location, sin esperar a la carga) y vuelve a la activa;
+    activate() salta a la pestaña que ya estaba cargando esa URL.
+    """
+    def __init__(self, driver, tabs):
+        self.driver = driver
+        self.active = driver.current_window_handle
+        self.handles = [self.active]
+        for _ in range(max(0, tabs - 1)):
+            driver.switch_to.new_window("tab")
+            flow_lite.activate(driver)  # setBlockedURLs es por pestaña
+            self.handles.append(driver.current_window_handle)
+        driver.switch_to.window(self.active)
+        self.loading = {}  # url -> handle
+
+    def _free(self):
+        busy = set(self.loading.values()) | {self.active}
+        return [h for h in self.handles if h not in busy]
+
+    def activate(self, url):
+        """True si 'url' ya estaba precargándose (y queda activa su pestaña)."""
+        h = self.loading.pop(url, None)
+        if h is None:
+            return False
+        self.active = h
+        self.driver.switch_to.window(h)
+        return True
+
+    def prefetch(self, urls):
+        for url in urls:
+            if not url or url in self.loading:
+                continue
+            free = self._free()
+            if not free:
+                break
+            # La precarga es una carga de página más: cuenta para el presupuesto compartido
+            # (y la pestaña que la recibe ya no vuelve a pedir token, ver preloaded)
+            flow_ratelimit.acquire("page")
+            try:
+                self.driver.switch_to.window(free[0])
+                self.driver.execute_script("window.location.href = arguments[0];", url)
+                self.loading[url] = free[0]
+            except WebDriverException as e:
+                log(f"⚠️ No se pudo precargar {url}: {e}")
+        self.driver.switch_to.window(self.active)
+
+def _wait_liveview_connected(driver, timeout):
+    """Espera a que el LiveView principal tenga la clase phx-connected (best-effort)."""
+    return flow_waits.wait_liveview_connected(driver, timeout)
+
 # ===================== PAGE SIZE / PAGINACIÓN / SCROLL =====================
 
 def _try_set_page_size(driver):
@@ -267,6 +359,7 @@ def _navigate_to_page(driver, page_num):
     """Navega a una página específica; devuelve True si cree haber navegado."""
     try:
         log(f"🔄 Navegando a página {page_num}…")
+        flow_ratelimit.acquire("page")
         selectors = [
             f"a[phx-value-page='{page_num}']",
             f"button[phx-value-page='{page_num}']",
@@ -306,18 +399,15 @@ def _navigate_to_page(driver, page_num):
 
 def _collect_by_infinite_scroll(driver, rows_selector="tbody tr", max_wait_idle=2.5, per_event_deadline=None):
     """Carga filas por scroll infinito; no devuelve datos, solo fuerza la carga."""
-    last = -1
-    idle_start = _now()
+    last = len(driver.find_elements(By.CSS_SELECTOR, rows_selector))
     while _left(per_event_deadline) > 0:
-        driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-        sleep(0.6, 0.9)
-        n = len(driver.find_elements(By.CSS_SELECTOR, rows_selector))
-        if n > last:
-            last = n
-            idle_start = _now()
-        else:
-            if (_now() - idle_start) > max_wait_idle:
-                break
+        # Resuelve en cuanto aparecen filas nuevas; si no llegan en max_wait_idle, se acabó
+        grown = flow_waits.scroll_and_wait_growth(
+            driver, min(max_wait_idle, _left(per_event_deadline)),
+            selector=rows_selector, count=last, label="infinite_scroll")
+        if not grown:
+            break
+        last = grown["n"]
 
 # ===================== JS Mapper (PID) =====================
 
@@ -406,6 +496,71 @@ while (node){
 return { fields, schedule };
 """
 
+# ===================== Lote de paneles (execute_async_script) =====================
+
+# Abre K toggles de golpe, espera sus paneles con un MutationObserver y devuelve
+# [{pid, html, payload}] en una sola respuesta. Los pid sin panel vuelven con html=null.
+JS_BATCH_PANELS = r"""
+const pids = arguments[0], timeoutMs = arguments[1];
+const done = arguments[arguments.length - 1];
+
+function mapRich(){
+""" + JS_MAP_PARTICIPANT_RICH + r"""
+}
+
+function ready(pid){
+  const el = document.getElementById(pid);
+  return (el && el.querySelector("div.font-bold.text-sm, div.grid.grid-cols-2")) ? el : null;
+}
+
+pids.forEach(pid => {
+  if (ready(pid)) return;
+  const btn = document.querySelector(
+    "[phx-click='booking_details_show'][phx-value-booking_id='" + CSS.escape(pid) + "']");
+  if (btn) btn.click();
+});
+
+let finished = false, timer = null;
+const obs = new MutationObserver(() => check(false));
+function collect(){
+  return pids.map(pid => {
+    const el = ready(pid);
+    if (!el) return { pid, html: null, payload: null };
+    let payload = null;
+    try { payload = mapRich(pid); } catch (e) { payload = null; }
+    return { pid, html: el.outerHTML, payload };
+  });
+}
+function check(force){
+  if (finished) return;
+  if (force || pids.every(ready)){
+    finished = true;
+    obs.disconnect();
+    if (timer) clearTimeout(timer);
+    done(collect());
+  }
+}
+obs.observe(document.body, { childList: true, subtree: true, attributes: true });
+timer = setTimeout(() => check(true), timeoutMs);
+check(false);
+"""
+
+def _batch_extract_panels(driver, pids, timeout_s=None):
+    """Devuelve {pid: (outerHTML, payload_js)} de los paneles que se pintaron en el lote."""
+    timeout_s = BATCH_PANEL_TIMEOUT_S if timeout_s is None else timeout_s
+    try:
+        driver.set_script_timeout(timeout_s + 5)
+        res = driver.execute_async_script(JS_BATCH_PANELS, list(pids), int(timeout_s * 1000)) or []
+    except Exception as e:
+        log(f"⚠️ Lote de paneles falló ({len(pids)} PIDs): {e}")
+        return {}
+    out = {}
+    for r in res:
+        if isinstance(r, dict) and r.get("pid") and r.get("html"):
+            payload = r.get("payload")
+            out[r["pid"]] = (r["html"], payload if isinstance(payload, dict) else None)
+    return out
+
 # ===================== Helpers PID & apertura segura =====================
 
 def _collect_booking_ids(driver):
@@ -465,12 +620,9 @@ def _get_or_open_panel_by_pid(driver, pid):
             btn = driver.find_element(By.CSS_SELECTOR, sel)
             driver.execute_script("arguments[0].scrollIntoView({block:'center'});", btn)
             driver.execute_script("arguments[0].click();", btn)
-            WebDriverWait(driver, 6).until(lambda d: d.find_element(By.ID, pid))
-            el = driver.find_element(By.ID, pid)
-            t0 = time.time()
-            while time.time() - t0 < 3:
-                if panel_ready(el): return el
-                time.sleep(0.15)
+            # Bloque + valores pintados (antes: WebDriverWait 6 s + sondeo de 3 s)
+            el = flow_waits.wait_panel(driver, pid, 9)
+            if el is not None: return el
             driver.execute_script("window.scrollBy(0, 160);")
         except (StaleElementReferenceException, NoSuchElementException, ElementClickInterceptedException, TimeoutException):
             time.sleep(0.2); continue
@@ -617,30 +769,14 @@ def _merge_sources(bs_data, js_payload):
     return merged
 
 def _fields_to_participant(eid, ename, plist, pid, ev_title, fields_dict):
-    part = {
-        "event_id": eid,
-        "event_name": ename,
-        "participants_url": plist,
-        "BinomID": pid,
-        "dorsal": fields_dict.get("dorsal",""),
-        "guia": fields_dict.get("guia",""),
-        "perro": fields_dict.get("perro",""),
-        "raza": fields_dict.get("raza",""),
-        "edad": fields_dict.get("edad",""),
-        "genero": fields_dict.get("genero",""),
-        "altura_cm": fields_dict.get("altura_cm",""),
-        "nombre_pedigree": fields_dict.get("nombre_pedigree",""),
-        "pais": fields_dict.get("pais",""),
-        "licencia": fields_dict.get("licencia",""),
-        "club": fields_dict.get("club",""),
-        "federacion": fields_dict.get("federacion",""),
-        "equipo": fields_dict.get("equipo",""),
-        "event_title": ev_title or ename,
-        "open_blocks": fields_dict.get("open_blocks", []),
-    }
+    # Registro compacto (flow_records): datos del evento compartidos, cadenas repetidas internadas
+    extra = None
     if DEBUG_PARTICIPANTS and fields_dict.get("_raw_panel_html"):
-        part["raw_panel_html"] = fields_dict["_raw_panel_html"]
-    if part["altura_cm"]: part["altura_cm"] = _parse_altura_cm(part["altura_cm"])
+        extra = {"raw_panel_html": fields_dict["_raw_panel_html"]}
+    part = flow_records.Participant(
+        flow_records.event_meta(eid, ename, plist, ev_title or ename),
+        pid, fields_dict, fields_dict.get("open_blocks", []), extra)
+    if part.altura_cm: part.altura_cm = _parse_altura_cm(part.altura_cm)
     return part
 
 # ===================== URL participantes =====================
@@ -660,7 +796,7 @@ def _participants_url_from_event(ev: dict) -> str:
 
 # ===================== Extracción por evento CON PAGINACIÓN =====================
 
-def extract_event_participants(driver, event, per_event_deadline):
+def extract_event_participants(driver, event, per_event_deadline, preloaded=False):
     plist = _participants_url_from_event(event)
     eid   = event.get("id") or event.get("uuid") or event.get("event_id") or event.get("slug") or ""
     ename = event.get("nombre") or event.get("title") or event.get("name") or ""
@@ -668,28 +804,42 @@ def extract_event_participants(driver, event, per_event_deadline):
     out = {
         "event_id": eid, "event_name": ename, "participants_url": plist,
         "participants_count": 0, "participants": [], "estado": "ok",
-        "pages_processed": 0, "total_participants_found": 0,
+        "pages_processed": 0, "total_participants_found": 0, "panels_batched": 0,
         "timestamp": datetime.now().isoformat()
     }
 
     if not plist:
         out["estado"] = "sin_url"; return out
 
+    t_page = time.time()
     try:
-        log(f"🌐 Cargando página de participantes: {plist}")
-        driver.get(plist)
-        WebDriverWait(driver, 30).until(EC.presence_of_element_located((By.TAG_NAME,"body")))
-        _accept_cookies(driver)
-        sleep(0.8, 1.4)
+        if preloaded:
+            # La pestaña ya navegó en segundo plano (el token "page" se pidió en prefetch):
+            # solo falta que LiveView esté conectado
+            log(f"🌐 Página de participantes precargada: {plist}")
+            WebDriverWait(driver, 30).until(EC.presence_of_element_located((By.TAG_NAME,"body")))
+            if not _wait_liveview_connected(driver, LIVEVIEW_READY_MAX_S):
+                sleep(0.8, 1.4)
+            _accept_cookies(driver)
+        else:
+            log(f"🌐 Cargando página de participantes: {plist}")
+            flow_ratelimit.acquire("page")
+            driver.get(plist)
+            WebDriverWait(driver, 30).until(EC.presence_of_element_located((By.TAG_NAME,"body")))
+            THROTTLE.observe("page", time.time() - t_page)
+            _accept_cookies(driver)
+            THROTTLE.pause("page")
+        flow_lite.record(driver, "participants_list")
     except Exception as e:
         log(f"❌ Error cargando página de participantes: {e}")
+        THROTTLE.observe("page", time.time() - t_page, ok=False)
         out["estado"]="timeout"; return out
 
     # Intentar poner 1000/500 por página
     try:
         if _try_set_page_size(driver):
             log("⬆️ Ajustado 'Mostrar por página' al máximo disponible")
-            sleep(0.8, 1.2)
+            THROTTLE.pause("pagination")
     except Exception:
         pass
 
@@ -736,7 +886,7 @@ def extract_event_participants(driver, event, per_event_deadline):
                     next_page = current_page + 1
                     if _navigate_to_page(driver, next_page):
                         current_page = next_page
-                        sleep(0.8, 1.2)
+                        THROTTLE.pause("pagination")
                         continue
                 break
 
@@ -751,43 +901,75 @@ def extract_event_participants(driver, event, per_event_deadline):
             except Exception:
                 pass
 
-        # Procesar cada participante en la página actual
+        if flow_snapshots.enabled():
+            flow_snapshots.save_list("deepsek", event, current_page, driver.page_source, url=plist, title=ev_title)
+
+        # Procesar participantes en lotes de BATCH_PANELS (un round-trip por lote);
+        # los PIDs que no pinten panel en el lote siguen el camino uno a uno.
         page_participants = []
-        for i, pid in enumerate(pids, 1):
+        window = max(1, BATCH_PANELS)
+        timed_out = False
+        for start in range(0, len(pids), window):
             if _left(per_event_deadline) <= 0:
                 log("⏰ Tiempo agotado para este evento")
                 break
+            chunk = pids[start:start + window]
+            if window > 1:
+                flow_ratelimit.acquire("toggle", cost=len(chunk))
+            t_batch = time.time()
+            batch = _batch_extract_panels(driver, chunk) if window > 1 else {}
+            if window > 1:
+                # Un lote parcial no es un error: los que falten van por el camino uno a uno
+                THROTTLE.observe("batch", time.time() - t_batch)
+                log(f"  📦 Lote {start + 1}-{start + len(chunk)}: {len(batch)}/{len(chunk)} paneles")
+                out["panels_batched"] += len(batch)
+
+            for i, pid in enumerate(chunk, start + 1):
+                if _left(per_event_deadline) <= 0:
+                    log("⏰ Tiempo agotado para este evento")
+                    timed_out = True
+                    break
+
+                if pid in batch:
+                    html, payload_js = batch[pid]
+                else:
+                    log(f"  👤 Participante {i}/{len(pids)} (PID: {pid})")
+                    flow_ratelimit.acquire("toggle")
+                    t_toggle = time.time()
+                    block_el = _get_or_open_panel_by_pid(driver, pid)
+                    THROTTLE.observe("toggle", time.time() - t_toggle, ok=block_el is not None)
+                    if not block_el:
+                        log(f"  ⚠️ No se pudo abrir panel para PID {pid}")
+                        THROTTLE.pause("toggle")
+                        continue
 
-            log(f"  👤 Participante {i}/{len(pids)} (PID: {pid})")
-            block_el = _get_or_open_panel_by_pid(driver, pid)
-            if not block_el:
-                log(f"  ⚠️ No se pudo abrir panel para PID {pid}")
-                continue
+                    html = ""
+                    try:
+                        html = block_el.get_attribute("outerHTML") or ""
+                    except Exception:
+                        html = ""
 
-            sleep(0.25, 0.45)
+                    payload_js = None
+                    try:
+                        payload_js = driver.execute_script(JS_MAP_PARTICIPANT_RICH, pid)
+                    except Exception:
+                        payload_js = None
+                    THROTTLE.pause("toggle")
 
-            html = ""
-            try: 
-                html = block_el.get_attribute("outerHTML") or ""
-            except Exception: 
-                html = ""
+                flow_snapshots.save_panel("deepsek", eid, pid, html, page=current_page, payload=payload_js)
+                bs_data = _parse_panel_html(html) if html else {}
 
-            bs_data = _parse_panel_html(html) if html else {}
+                if not bs_data and (not payload_js or not isinstance(payload_js, dict)):
+                    payload_js = _fallback_map_participant(driver, pid)
 
-            payload_js = None
-            try:
-                payload_js = driver.execute_script(JS_MAP_PARTICIPANT_RICH, pid)
-            except Exception:
-                payload_js = None
+                merged_fields = _merge_sources(bs_data, payload_js)
+                part = _fields_to_participant(eid, ename, plist, pid, ev_title, merged_fields)
+                page_participants.append(part)
 
-            if not bs_data and (not payload_js or not isinstance(payload_js, dict)):
-                payload_js = _fallback_map_participant(driver, pid)
-
-            merged_fields = _merge_sources(bs_data, payload_js)
-            part = _fields_to_participant(eid, ename, plist, pid, ev_title, merged_fields)
-            page_participants.append(part)
-
-            sleep(0.12, 0.22)
+            if timed_out:
+                break
+            if batch:
+                THROTTLE.pause("batch", cost=len(batch), per_unit=True)
 
         all_participants.extend(page_participants)
         pages_processed += 1
@@ -797,7 +979,7 @@ def extract_event_participants(driver, event, per_event_deadline):
             next_page = current_page + 1
             if _navigate_to_page(driver, next_page):
                 current_page = next_page
-                sleep(0.8, 1.2)
+                THROTTLE.pause("pagination")
             else:
                 log("❌ No se pudo navegar a la siguiente página, terminando…")
                 break
@@ -814,6 +996,38 @@ def extract_event_participants(driver, event, per_event_deadline):
 
 # ===================== MAIN =====================
 
+def _save_event_result(ev, idx, res):
+    """Guarda ./output/participants/02p_<event_id>.json."""
+    event_id_for_file = ev.get('id') or ev.get('uuid') or ev.get('event_id') or ev.get('slug') or f"idx{idx}"
+    out_path = Path(OUT_DIR)/"participants"/f"02p_{event_id_for_file}.json"
+    flow_manifest.dump_json(out_path, res)  # no reescribe si el contenido no cambió
+    flow_store.save_participants(res.get("participants", []), "deepsek", ev)
+
+class _Aggregated:
+    """
+    02participants.json (y 02participants_debug.json con DEBUG_PARTICIPANTS) escritos en
+    streaming: cada evento se añade al terminar, sin acumular la lista en memoria.
+    """
+    def __init__(self):
+        self.out = flow_jsonstream.JsonArrayWriter(Path(OUT_DIR, "02participants.json"))
+        self.dbg = (flow_jsonstream.JsonArrayWriter(Path(OUT_DIR, "02participants_debug.json"))
+                    if DEBUG_PARTICIPANTS else None)
+
+    @property
+    def count(self):
+        return self.out.count
+
+    def add(self, res):
+        self.out.extend(res.get("participants", []))
+        if self.dbg is not None:
+            self.dbg.extend(res.get("participants", []))
+
+    def close(self):
+        self.out.close()
+        if self.dbg is not None:
+            self.dbg.close()
+            log("💾 Debug guardado en 02participants_debug.json")
+
 def main():
     print("🚀 MÓDULO 2: PARTICIPANTES DETALLADOS CON PAGINACIÓN (ajustado)")
     Path(OUT_DIR).mkdir(parents=True, exist_ok=True)
@@ -842,38 +1056,42 @@ def main():
         except Exception: pass
         return False
 
-    aggregated = []
-    aggregated_debug = []
+    flow_jsonstream.terminate_on_sigterm()
+    aggregated = _Aggregated()
     global_deadline = _deadline(MAX_RUNTIME_MIN*60) if MAX_RUNTIME_MIN>0 else None
 
     # Interpreta PER_EVENT_MAX_S=0 como “sin límite”
     per_event_seconds = None if PER_EVENT_MAX_S <= 0 else PER_EVENT_MAX_S
 
-    for idx, ev in enumerate(events, 1):
-        if _left(global_deadline) <= 0:
-            log("⏹️ Tope global alcanzado"); break
-
-        log(f"🎯 Evento {idx}/{len(events)}: {ev.get('nombre') or ev.get('title') or ev.get('name') or '(sin nombre)'}")
-        res = extract_event_participants(driver, ev, _deadline(per_event_seconds))
-
-        # guardar por evento
-        event_id_for_file = ev.get('id') or ev.get('uuid') or ev.get('event_id') or ev.get('slug') or f"idx{idx}"
-        out_path = Path(OUT_DIR)/"participants"/f"02p_{event_id_for_file}.json"
-        out_path.write_text(json.dumps(res, ensure_ascii=False, indent=2), encoding="utf-8")
+    pipeline = None
+    if PIPELINE_TABS > 1:
+        pipeline = _TabPipeline(driver, PIPELINE_TABS)
+        log(f"🗂️ Pipeline de pestañas activo: {PIPELINE_TABS} pestañas")
 
-        aggregated.extend(res.get("participants", []))
-        if DEBUG_PARTICIPANTS:
-            aggregated_debug.extend(res.get("participants", []))
-
-        sleep(0.5, 1.0)  # espera entre eventos
-
-    # agregados
-    Path(OUT_DIR,"02participants.json").write_text(json.dumps(aggregated, ensure_ascii=False, indent=2), encoding="utf-8")
-    if DEBUG_PARTICIPANTS:
-        Path(OUT_DIR,"02participants_debug.json").write_text(json.dumps(aggregated_debug, ensure_ascii=False, indent=2), encoding="utf-8")
-        log("💾 Debug guardado en 02participants_debug.json")
-
-    log(f"✅ Total participantes: {len(aggregated)}")
+    try:
+        for idx, ev in enumerate(events, 1):
+            if _left(global_deadline) <= 0:
+                log("⏹️ Tope global alcanzado"); break
+
+            log(f"🎯 Evento {idx}/{len(events)}: {ev.get('nombre') or ev.get('title') or ev.get('name') or '(sin nombre)'}")
+            preloaded = False
+            if pipeline:
+                preloaded = pipeline.activate(_participants_url_from_event(ev))
+                upcoming = events[idx:idx + PIPELINE_TABS - 1]
+                pipeline.prefetch([_participants_url_from_event(e) for e in upcoming])
+            res = extract_event_participants(driver, ev, _deadline(per_event_seconds), preloaded=preloaded)
+
+            _save_event_result(ev, idx, res)
+            aggregated.add(res)
+
+            THROTTLE.pause("event")  # espera entre eventos
+    finally:
+        # También con SIGTERM: el array queda cerrado con los eventos terminados
+        aggregated.close()
+    log(f"✅ Total participantes: {aggregated.count}")
+    flow_waits.report(log)
+    THROTTLE.report(log)
+    flow_ratelimit.report(log)
     try: driver.quit()
     except Exception: pass
     return True
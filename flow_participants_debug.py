@@ -44,6 +44,15 @@ try:
 except ImportError:
     HAS_WDM = False
 
+import flow_jsonstream
+import flow_lite
+import flow_manifest
+import flow_ratelimit
+import flow_records
+import flow_session
+import flow_store
+import flow_waits
+
 BASE = "https://www.flowagility.com"
 SCRIPT_DIR = Path(__file__).resolve().parent
 
@@ -105,6 +114,7 @@ def _get_driver():
     opts.add_argument(f"--user-agent={ua}")
     opts.add_experimental_option("excludeSwitches", ["enable-automation"])
     opts.add_experimental_option('useAutomationExtension', False)
+    flow_lite.apply_options(opts)
 
     exe = None
     for p in ["/usr/local/bin/chromedriver","/usr/bin/chromedriver","/snap/bin/chromedriver"]:
@@ -115,11 +125,16 @@ def _get_driver():
     service = Service(executable_path=exe) if exe else None
     driver = webdriver.Chrome(service=service, options=opts) if service else webdriver.Chrome(options=opts)
     driver.execute_script("Object.defineProperty(navigator,'webdriver',{get:()=>undefined})")
+    flow_lite.activate(driver)
     driver.set_page_load_timeout(75)
     driver.implicitly_wait(2)
     return driver
 
 def _login(driver):
+    """Login con caché de sesión compartida (flow_session); formulario solo si hace falta."""
+    return flow_session.login(driver, _form_login, BASE, FLOW_EMAIL, log=log)
+
+def _form_login(driver):
     log("Login…")
     driver.get(f"{BASE}/user/login")
     WebDriverWait(driver, 45).until(EC.presence_of_element_located((By.TAG_NAME,"body")))
@@ -300,17 +315,15 @@ def _get_or_open_panel_by_pid(driver, pid):
 
     # 2) no existe/está vacío → click en toggle
     sel = f"[phx-click='booking_details_show'][phx-value-booking_id='{pid}']"
+    flow_ratelimit.acquire("toggle")
     for _ in range(6):
         try:
             btn = driver.find_element(By.CSS_SELECTOR, sel)
             driver.execute_script("arguments[0].scrollIntoView({block:'center'});", btn)
             driver.execute_script("arguments[0].click();", btn)  # JS click
-            WebDriverWait(driver, 6).until(lambda d: d.find_element(By.ID, pid))
-            el = driver.find_element(By.ID, pid)
-            t0 = time.time()
-            while time.time() - t0 < 3:
-                if panel_ready(el): return el
-                time.sleep(0.15)
+            # Bloque + valores pintados (antes: WebDriverWait 6 s + sondeo de 3 s)
+            el = flow_waits.wait_panel(driver, pid, 9)
+            if el is not None: return el
             driver.execute_script("window.scrollBy(0, 160);")
         except (StaleElementReferenceException, NoSuchElementException, ElementClickInterceptedException, TimeoutException):
             time.sleep(0.2)
@@ -473,30 +486,14 @@ def _merge_sources(bs_data, js_payload):
     return merged
 
 def _fields_to_participant(eid, ename, plist, pid, ev_title, fields_dict):
-    part = {
-        "event_id": eid,
-        "event_name": ename,
-        "participants_url": plist,
-        "BinomID": pid,
-        "dorsal": fields_dict.get("dorsal",""),
-        "guia": fields_dict.get("guia",""),
-        "perro": fields_dict.get("perro",""),
-        "raza": fields_dict.get("raza",""),
-        "edad": fields_dict.get("edad",""),
-        "genero": fields_dict.get("genero",""),
-        "altura_cm": fields_dict.get("altura_cm",""),
-        "nombre_pedigree": fields_dict.get("nombre_pedigree",""),
-        "pais": fields_dict.get("pais",""),
-        "licencia": fields_dict.get("licencia",""),
-        "club": fields_dict.get("club",""),
-        "federacion": fields_dict.get("federacion",""),
-        "equipo": fields_dict.get("equipo",""),
-        "event_title": ev_title or ename,
-        "open_blocks": fields_dict.get("open_blocks", []),
-    }
+    # Registro compacto (flow_records): datos del evento compartidos, cadenas repetidas internadas
+    extra = None
     if DEBUG_PARTICIPANTS and fields_dict.get("_raw_panel_html"):
-        part["raw_panel_html"] = fields_dict["_raw_panel_html"]
-    if part["altura_cm"]: part["altura_cm"] = _parse_altura_cm(part["altura_cm"])
+        extra = {"raw_panel_html": fields_dict["_raw_panel_html"]}
+    part = flow_records.Participant(
+        flow_records.event_meta(eid, ename, plist, ev_title or ename),
+        pid, fields_dict, fields_dict.get("open_blocks", []), extra)
+    if part.altura_cm: part.altura_cm = _parse_altura_cm(part.altura_cm)
     return part
 
 # ===================== Extracción por evento =====================
@@ -514,8 +511,10 @@ def extract_event_participants(driver, event, per_event_deadline):
         out["estado"] = "sin_url"; return out
 
     try:
+        flow_ratelimit.acquire("page")
         driver.get(plist)
         WebDriverWait(driver, 25).until(EC.presence_of_element_located((By.TAG_NAME,"body")))
+        flow_lite.record(driver, "participants_list")
         _accept_cookies(driver)
         sleep(0.6,1.0)
     except Exception:
@@ -614,34 +613,39 @@ def main():
         except Exception: pass
         return False
 
-    aggregated = []
-    aggregated_debug = []
+    # Agregados en streaming: cada evento se añade al terminar (y se cierran con SIGTERM)
+    flow_jsonstream.terminate_on_sigterm()
+    aggregated = flow_jsonstream.JsonArrayWriter(Path(OUT_DIR, "02participants.json"))
+    aggregated_debug = (flow_jsonstream.JsonArrayWriter(Path(OUT_DIR, "02participants_debug.json"))
+                        if DEBUG_PARTICIPANTS else None)
     global_deadline = _deadline(MAX_RUNTIME_MIN*60) if MAX_RUNTIME_MIN>0 else None
 
-    for idx, ev in enumerate(events, 1):
-        if global_deadline and _left(global_deadline) <= 0:
-            log("⏹️ Tope global alcanzado"); break
-
-        log(f"Evento {idx}/{len(events)}: {ev.get('nombre','(sin nombre)')}")
-        res = extract_event_participants(driver, ev, _deadline(PER_EVENT_MAX_S))
-
-        # guardar por evento
-        out_path = Path(OUT_DIR)/"participants"/f"02p_{ev.get('id','idx'+str(idx))}.json"
-        out_path.write_text(json.dumps(res, ensure_ascii=False, indent=2), encoding="utf-8")
-
-        aggregated.extend(res.get("participants", []))
-        if DEBUG_PARTICIPANTS:
-            aggregated_debug.extend(res.get("participants", []))
-
-        sleep(0.25, 0.55)
-
-    # agregados
-    Path(OUT_DIR,"02participants.json").write_text(json.dumps(aggregated, ensure_ascii=False, indent=2), encoding="utf-8")
-    if DEBUG_PARTICIPANTS:
-        Path(OUT_DIR,"02participants_debug.json").write_text(json.dumps(aggregated_debug, ensure_ascii=False, indent=2), encoding="utf-8")
-        log("💾 Debug guardado en 02participants_debug.json")
-
-    log(f"✅ Total participantes: {len(aggregated)}")
+    try:
+        for idx, ev in enumerate(events, 1):
+            if global_deadline and _left(global_deadline) <= 0:
+                log("⏹️ Tope global alcanzado"); break
+
+            log(f"Evento {idx}/{len(events)}: {ev.get('nombre','(sin nombre)')}")
+            res = extract_event_participants(driver, ev, _deadline(PER_EVENT_MAX_S))
+
+            # guardar por evento
+            out_path = Path(OUT_DIR)/"participants"/f"02p_{ev.get('id','idx'+str(idx))}.json"
+            flow_manifest.dump_json(out_path, res)  # no reescribe si el contenido no cambió
+            flow_store.save_participants(res.get("participants", []), "debug", ev)
+
+            aggregated.extend(res.get("participants", []))
+            if aggregated_debug is not None:
+                aggregated_debug.extend(res.get("participants", []))
+
+            sleep(0.25, 0.55)
+    finally:
+        aggregated.close()
+        if aggregated_debug is not None:
+            aggregated_debug.close()
+            log("💾 Debug guardado en 02participants_debug.json")
+
+    log(f"✅ Total participantes: {aggregated.count}")
+    flow_waits.report(log)
     try: driver.quit()
     except Exception: pass
     return True
@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+FLOWAGILITY SCRAPER - PIPELINE EVENTOS → PARTICIPANTES (UN SOLO PROCESO)
+- Un único Chrome y un único login (flow_session) para las dos etapas.
+- Etapa 1 (productor): los eventos entran en una cola acotada según se leen.
+  * PIPELINE_SOURCE=http (por defecto): hilo con sesión requests que reutiliza las
+    cookies del navegador; pagina / "cargar más" mientras el navegador ya trabaja.
+  * PIPELINE_SOURCE=browser: segunda pestaña con el scroll infinito de /zone/events;
+    cada paso de scroll entrega sus tarjetas nuevas (flow_events.iter_event_cards).
+  * Si el motor HTTP falla, se sigue con la pestaña (sin repetir eventos).
+- Etapa 2 (consumidor): extract_event_participants de flow_participants_DeepSek en
+  la pestaña principal, evento a evento, en cuanto llegan a la cola.
+- Salidas: las mismas que flow_events.py + flow_participants_DeepSek.py
+  (01events.json, 01events_YYYY-MM-DD.json, 02participants*.json, participants/02p_*.json).
+
+Variables: PIPELINE_SOURCE (http|browser), PIPELINE_QUEUE (tamaño de la cola, 16),
+más las de ambos scripts (LIMIT_EVENTS, PER_EVENT_MAX_S, MAX_RUNTIME_MIN, MAX_SCROLLS…).
+"""
+
+import os
+import sys
+import time
+import queue
+import threading
+import traceback
+from pathlib import Path
+
+import flow_events
+import flow_participants_DeepSek as participants
+import flow_jsonstream
+import flow_lite
+import flow_ratelimit
+import flow_waits
+
+from flow_participants_DeepSek import log, OUT_DIR
+
+PIPELINE_SOURCE = os.getenv("PIPELINE_SOURCE", "http").strip().lower()  # http | browser
+PIPELINE_QUEUE  = int(os.getenv("PIPELINE_QUEUE", "16"))
+
+_DONE = object()  # fin de la etapa de eventos
+
+
+def _put(q, item, stop):
+    """put() que no se queda colgado si el consumidor ya terminó."""
+    while not stop.is_set():
+        try:
+            q.put(item, timeout=0.5)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+
+# ===================== Etapa 1: eventos =====================
+
+def _produce_http(driver, q, stop, state):
+    """Arranca el hilo productor HTTP con las cookies del driver (leídas aquí, en el hilo principal)."""
+    session = flow_events._http_session_from_driver(driver)
+
+    def run():
+        try:
+            for ev in flow_events.iter_events_http(session):
+                if not _put(q, ev, stop):
+                    return
+        except Exception as e:
+            state["error"] = e
+            log(f"⚠️ Motor HTTP de eventos falló: {e}")
+        finally:
+            session.close()
+            _put(q, _DONE, stop)
+
+    th = threading.Thread(target=run, name="events-http", daemon=True)
+    th.start()
+    return th
+
+
+def _iter_queue(q):
+    while True:
+        item = q.get()
+        if item is _DONE:
+            return
+        yield item
+
+
+def _iter_browser_tab(driver, main_handle):
+    """
+    Eventos desde una segunda pestaña de la misma sesión. Selenium no admite dos hilos
+    sobre un driver: se alterna de pestaña entre cosecha (scroll) y participantes.
+    """
+    driver.switch_to.new_window("tab")
+    tab = driver.current_window_handle
+    flow_lite.activate(driver)
+    try:
+        flow_ratelimit.acquire("page")
+        driver.get(flow_events.EVENTS_URL)
+        flow_events._accept_cookies(driver)
+        gen = flow_events.iter_event_cards(driver)
+        while True:
+            driver.switch_to.window(tab)
+            try:
+                ev = next(gen)
+            except StopIteration:
+                return
+            driver.switch_to.window(main_handle)
+            yield ev
+    finally:
+        try:
+            driver.switch_to.window(tab)
+            driver.close()
+        except Exception:
+            pass
+        driver.switch_to.window(main_handle)
+
+
+def _event_key(ev):
+    return ev.get("id") or ev.get("enlaces", {}).get("participantes") or ev.get("nombre")
+
+
+# ===================== Runner =====================
+
+def main():
+    print("🚀 PIPELINE: EVENTOS → PARTICIPANTES (un proceso, una sesión)")
+    Path(OUT_DIR).mkdir(parents=True, exist_ok=True)
+    (Path(OUT_DIR)/"participants").mkdir(parents=True, exist_ok=True)
+    t0 = time.time()
+
+    driver = participants._get_driver()
+    if not participants._login(driver):
+        log("❌ Login falló")
+        try: driver.quit()
+        except Exception: pass
+        return False
+    main_handle = driver.current_window_handle
+
+    per_event_seconds = None if participants.PER_EVENT_MAX_S <= 0 else participants.PER_EVENT_MAX_S
+    global_deadline = (participants._deadline(participants.MAX_RUNTIME_MIN * 60)
+                       if participants.MAX_RUNTIME_MIN > 0 else None)
+
+    events, seen = [], set()
+    flow_jsonstream.terminate_on_sigterm()
+    aggregated = participants._Aggregated()
+    processed = 0
+    first_at = None
+    stop = threading.Event()
+    state = {}
+
+    def consume(source):
+        nonlocal processed, first_at
+        for ev in source:
+            key = _event_key(ev)
+            if key in seen:
+                continue
+            seen.add(key)
+            events.append(ev)
+            if participants.LIMIT_EVENTS > 0 and processed >= participants.LIMIT_EVENTS:
+                continue  # se sigue leyendo para dejar 01events.json completo
+            if participants._left(global_deadline) <= 0:
+                continue
+            processed += 1
+            if first_at is None:
+                first_at = time.time() - t0
+                log(f"⏩ Primer evento en cola a los {first_at:.1f}s; arrancan los participantes")
+            log(f"🎯 Evento {processed} (leídos {len(events)}): "
+                f"{ev.get('nombre') or ev.get('title') or ev.get('name') or '(sin nombre)'}")
+            driver.switch_to.window(main_handle)
+            res = participants.extract_event_participants(driver, ev, participants._deadline(per_event_seconds))
+            participants._save_event_result(ev, processed, res)
+            aggregated.add(res)
+            participants.THROTTLE.pause("event")
+
+    try:
+        if PIPELINE_SOURCE == "http" and flow_events.HAS_REQUESTS:
+            q = queue.Queue(maxsize=max(1, PIPELINE_QUEUE))
+            th = _produce_http(driver, q, stop, state)
+            consume(_iter_queue(q))
+            th.join(timeout=5)
+            # Fallo del motor HTTP, o terminó limpio sin eventos (muro de login, cambio de
+            # marcado): como flow_events.extract_events, se sigue con el navegador
+            if state.get("error") is not None or not events:
+                why = "falló" if state.get("error") is not None else "no devolvió eventos"
+                log(f"↪️ HTTP {why}: sigo con la pestaña de eventos ({len(events)} ya leídos por HTTP)")
+                consume(_iter_browser_tab(driver, main_handle))
+        else:
+            consume(_iter_browser_tab(driver, main_handle))
+    except Exception as e:
+        log(f"❌ Error en el pipeline: {e}")
+        traceback.print_exc()
+    finally:
+        stop.set()
+        aggregated.close()
+
+    ok = bool(events)
+    if ok:
+        flow_events._save_events(events)
+
+    log(f"✅ Eventos: {len(events)} · procesados: {processed} · participantes: {aggregated.count} "
+        f"· total {time.time() - t0:.1f}s")
+    flow_waits.report(log)
+    participants.THROTTLE.report(log)
+    flow_ratelimit.report(log)
+    try: driver.quit()
+    except Exception: pass
+    return ok
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
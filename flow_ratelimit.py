@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+FLOWAGILITY - LIMITADOR GLOBAL (TOKEN BUCKET ENTRE PROCESOS)
+- Un cubo de tokens en un fichero pequeño protegido con fcntl.flock: todos los
+  procesos de la máquina (workers del pool, chunks lanzados en paralelo, varios
+  scripts) comparten el mismo presupuesto de peticiones a flowagility.com.
+- acquire("page"), acquire("toggle", cost=n): bloquea hasta que hay tokens.
+- Sin FLOW_RATE_PER_MIN (o 0) no limita nada.
+
+Variables:
+  FLOW_RATE_PER_MIN   peticiones/minuto para toda la máquina (0 = sin límite)
+  FLOW_RATE_BURST     ráfaga máxima (por defecto 1/6 del minuto, mínimo 1)
+  FLOW_RATE_FILE      fichero del cubo (por defecto /tmp/flowagility_ratelimit.bucket)
+
+Solo coordina procesos de la misma máquina: jobs en runners distintos no se ven.
+"""
+
+import os
+import json
+import time
+import tempfile
+
+try:
+    import fcntl
+    HAS_FCNTL = True
+except ImportError:
+    HAS_FCNTL = False
+
+
+class TokenBucket:
+    """Token bucket persistido en 'path'; rate en tokens/s, capacidad 'burst'."""
+
+    def __init__(self, per_min, burst=None, path=None):
+        self.rate = max(0.0, float(per_min)) / 60.0
+        self.burst = float(burst) if burst else max(1.0, float(per_min) / 6.0)
+        self.path = path or os.path.join(tempfile.gettempdir(), "flowagility_ratelimit.bucket")
+        self.waited = {}   # kind -> segundos esperados en este proceso
+        self.count = {}    # kind -> tokens consumidos en este proceso
+
+    def _take(self, cost):
+        """Bajo lock: repone, intenta consumir. Devuelve 0 si lo consigue o los segundos a esperar."""
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            if HAS_FCNTL:
+                fcntl.flock(fd, fcntl.LOCK_EX)
+            raw = os.read(fd, 4096)
+            now = time.time()
+            try:
+                st = json.loads(raw.decode("utf-8")) if raw else {}
+            except ValueError:
+                st = {}
+            tokens = float(st.get("tokens", self.burst))
+            updated = float(st.get("updated", now))
+            tokens = min(self.burst, tokens + max(0.0, now - updated) * self.rate)
+            wait = 0.0
+            if tokens >= cost:
+                tokens -= cost
+            else:
+                wait = (cost - tokens) / self.rate
+            os.lseek(fd, 0, os.SEEK_SET)
+            os.ftruncate(fd, 0)
+            os.write(fd, json.dumps({"tokens": tokens, "updated": now}).encode("utf-8"))
+            return wait
+        finally:
+            if HAS_FCNTL:
+                fcntl.flock(fd, fcntl.LOCK_UN)
+            os.close(fd)
+
+    def acquire(self, kind="page", cost=1):
+        """Bloquea hasta obtener 'cost' tokens. Devuelve los segundos esperados."""
+        if self.rate <= 0:
+            return 0.0
+        cost = min(float(cost), self.burst)  # un lote mayor que la ráfaga no podría pasar nunca
+        waited = 0.0
+        while True:
+            wait = self._take(cost)
+            if wait <= 0:
+                break
+            time.sleep(wait)
+            waited += wait
+        self.waited[kind] = self.waited.get(kind, 0.0) + waited
+        self.count[kind] = self.count.get(kind, 0) + cost
+        return waited
+
+    def report(self, log=print):
+        if self.rate <= 0 or not self.count:
+            return
+        parts = [f"{k}: {int(self.count[k])} tokens / {self.waited.get(k, 0.0):.1f} s"
+                 for k in sorted(self.count)]
+        log(f"🪣 Límite global {self.rate * 60:.0f}/min → " + ", ".join(parts))
+
+
+_DEFAULT = None
+
+
+def configure(per_min=None, burst=None, path=None):
+    """(Re)crea el cubo por defecto; sin argumentos lee FLOW_RATE_* del entorno."""
+    global _DEFAULT
+    if per_min is None:
+        per_min = float(os.getenv("FLOW_RATE_PER_MIN", "0") or 0)
+    if burst is None:
+        burst = float(os.getenv("FLOW_RATE_BURST", "0") or 0) or None
+    if path is None:
+        path = os.getenv("FLOW_RATE_FILE", "").strip() or None
+    _DEFAULT = TokenBucket(per_min, burst, path)
+    return _DEFAULT
+
+
+def bucket():
+    return _DEFAULT if _DEFAULT is not None else configure()
+
+
+def acquire(kind="page", cost=1):
+    return bucket().acquire(kind, cost)
+
+
+def report(log=print):
+    if _DEFAULT is not None:
+        _DEFAULT.report(log)
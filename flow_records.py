@@ -0,0 +1,289 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+FLOWAGILITY - REGISTROS COMPACTOS DE PARTICIPANTES EN MEMORIA
+- Participant (DeepSek / debug): con __slots__; event_id, event_name, participants_url y
+  event_title viven en un EventMeta compartido por referencia entre todos los
+  participantes del evento (event_meta() lo reutiliza); open_blocks como tupla de tuplas.
+- GitHubRow (GitHubGPT): los 14 campos fijos en slots y Día/Fecha/Mangas 1..6 como tupla
+  de (día, fecha, mangas) de longitud variable (sin los huecos vacíos del final).
+- Cadenas repetidas (raza, club, federación, país, altura, equipo… y las del horario)
+  internadas con sys.intern: una sola copia por valor.
+- Ambos son Mapping de solo lectura con las claves y el orden de siempre: r.get("club"),
+  r.items(), dict(r) siguen funcionando. Para serializar: json.dump(..., default=json_default)
+  → mismo JSON que los dicts de antes.
+
+    python flow_records.py bench [--n 10000]   # memoria por 10k participantes: dict vs registro
+"""
+
+import sys
+import json
+import random
+import argparse
+import tracemalloc
+from operator import attrgetter
+from collections.abc import Mapping
+
+
+def _intern(v):
+    return sys.intern(v) if type(v) is str else v
+
+
+class EventMeta:
+    """Datos del evento que antes se repetían en cada participante."""
+    __slots__ = ("event_id", "event_name", "participants_url", "event_title")
+
+    def __init__(self, event_id, event_name, participants_url, event_title):
+        self.event_id = event_id
+        self.event_name = event_name
+        self.participants_url = participants_url
+        self.event_title = event_title
+
+
+_META = {}
+
+
+def event_meta(event_id, event_name, participants_url, event_title):
+    """EventMeta compartido para esos cuatro valores (caché acotada)."""
+    key = (event_id, event_name, participants_url, event_title)
+    meta = _META.get(key)
+    if meta is None:
+        if len(_META) >= 1024:
+            _META.clear()
+        meta = _META[key] = EventMeta(*key)
+    return meta
+
+
+class _Record(Mapping):
+    """Base: _GET da, en orden de salida, clave JSON → función(registro) → valor."""
+    __slots__ = ()
+    _GET = {}
+
+    def __getitem__(self, key):
+        get = self._GET.get(key)
+        if get is not None:
+            return get(self)
+        if self.extra and key in self.extra:
+            return self.extra[key]
+        raise KeyError(key)
+
+    def __iter__(self):
+        yield from self._GET
+        if self.extra:
+            yield from self.extra
+
+    def __len__(self):
+        return len(self._GET) + len(self.extra or ())
+
+    def to_dict(self):
+        d = {k: get(self) for k, get in self._GET.items()}
+        if self.extra:
+            d.update(self.extra)
+        return d
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self.to_dict()!r})"
+
+
+# ---------- DeepSek / debug ----------
+
+FLOW_FIELDS = ("dorsal", "guia", "perro", "raza", "edad", "genero", "altura_cm", "nombre_pedigree",
+               "pais", "licencia", "club", "federacion", "equipo")
+_FLOW_INTERN = frozenset(("raza", "edad", "genero", "altura_cm", "pais", "club", "federacion", "equipo"))
+_BLOCK_KEYS = ("titulo", "fecha", "mangas")
+
+
+def _pack_blocks(blocks):
+    """[{titulo, fecha, mangas}] → tupla de tuplas; cualquier otra forma se guarda tal cual."""
+    if not isinstance(blocks, list) or not all(isinstance(b, dict) and tuple(b) == _BLOCK_KEYS
+                                               for b in blocks):
+        return blocks
+    return tuple(tuple(_intern(b[k]) for k in _BLOCK_KEYS) for b in blocks)
+
+
+def _unpack_blocks(blocks):
+    if not isinstance(blocks, tuple):
+        return blocks
+    return [dict(zip(_BLOCK_KEYS, b)) for b in blocks]
+
+
+class Participant(_Record):
+    """Participante de flow_participants_DeepSek / _debug (esquema snake_case con open_blocks)."""
+    __slots__ = ("meta", "BinomID") + FLOW_FIELDS + ("blocks", "extra")
+    _GET = {
+        "event_id": attrgetter("meta.event_id"),
+        "event_name": attrgetter("meta.event_name"),
+        "participants_url": attrgetter("meta.participants_url"),
+        "BinomID": attrgetter("BinomID"),
+        **{k: attrgetter(k) for k in FLOW_FIELDS},
+        "event_title": attrgetter("meta.event_title"),
+        "open_blocks": lambda r: _unpack_blocks(r.blocks),
+    }
+
+    def __init__(self, meta, binom_id, fields, open_blocks=None, extra=None):
+        self.meta = meta
+        self.BinomID = binom_id
+        for k in FLOW_FIELDS:
+            v = fields.get(k, "")
+            setattr(self, k, _intern(v) if k in _FLOW_INTERN else v)
+        self.blocks = _pack_blocks(open_blocks if open_blocks is not None else [])
+        self.extra = extra or None
+
+
+# ---------- GitHubGPT ----------
+
+GITHUB_FIELDS = ("BinomID", "Dorsal", "Guía", "Perro", "Raza", "Edad", "Género", "Altura (cm)",
+                 "Nombre de Pedigree", "País", "Licencia", "Club", "Federación", "Equipo")
+_GITHUB_SLOTS = ("binom_id", "dorsal", "guia", "perro", "raza", "edad", "genero", "altura",
+                 "nombre_pedigree", "pais", "licencia", "club", "federacion", "equipo")
+_GITHUB_INTERN = frozenset(("raza", "edad", "genero", "altura", "pais", "club", "federacion", "equipo"))
+SCHEDULE_DAYS = 6
+_SCHEDULE_KEYS = tuple((f"Día {j}", f"Fecha {j}", f"Mangas {j}") for j in range(1, SCHEDULE_DAYS + 1))
+_GITHUB_KEYS = GITHUB_FIELDS + tuple(k for keys in _SCHEDULE_KEYS for k in keys)
+
+
+def _schedule_get(j, i):
+    def get(r):
+        return r.schedule[j][i] if j < len(r.schedule) else ""
+    return get
+
+
+class GitHubRow(_Record):
+    """Fila de 02EventosProxParticipantesGitHubGPT (claves en castellano, Día/Fecha/Mangas 1..6)."""
+    __slots__ = _GITHUB_SLOTS + ("schedule", "extra")
+    _GET = {
+        **{k: attrgetter(s) for k, s in zip(GITHUB_FIELDS, _GITHUB_SLOTS)},
+        **{k: _schedule_get(j, i) for j, keys in enumerate(_SCHEDULE_KEYS) for i, k in enumerate(keys)},
+    }
+
+    def __init__(self, fields, schedule=()):
+        """fields: las 14 claves de GITHUB_FIELDS; schedule: [(día, fecha, mangas)] (máx. 6)."""
+        for k, s in zip(GITHUB_FIELDS, _GITHUB_SLOTS):
+            v = fields.get(k, "")
+            setattr(self, s, _intern(v) if s in _GITHUB_INTERN else v)
+        days = [tuple(_intern(v) for v in d) for d in list(schedule)[:SCHEDULE_DAYS]]
+        while days and not any(days[-1]):
+            days.pop()  # los huecos del final se rellenan con "" al leer
+        self.schedule = tuple(days)
+        self.extra = None
+
+    @classmethod
+    def from_dict(cls, d):
+        """Fila ya serializada → GitHubRow; si no tiene exactamente el esquema, se deja el dict."""
+        if not isinstance(d, dict) or tuple(d) != _GITHUB_KEYS:
+            return d
+        return cls(d, [tuple(d[k] for k in keys) for keys in _SCHEDULE_KEYS])
+
+
+def compact_rows(rows):
+    """Lista de filas GitHubGPT leídas de JSON → registros compactos (las raras se quedan como dict)."""
+    return [GitHubRow.from_dict(r) for r in rows or []]
+
+
+def json_default(o):
+    """default= para json.dump/dumps: los registros se serializan como el dict de siempre."""
+    if isinstance(o, _Record):
+        return o.to_dict()
+    raise TypeError(f"Object of type {type(o).__name__} is not JSON serializable")
+
+
+# ---------------------------------------------------------------------------
+# Medida: memoria por N participantes (dicts de antes frente a registros)
+# ---------------------------------------------------------------------------
+
+def _fresh(s):
+    # Cadena nueva (como las que devuelve _clean al parsear cada panel), no el literal compartido
+    return (s + " ")[:-1]
+
+
+def _synthetic(n, seed=1):
+    rnd = random.Random(seed)
+    clubs = [f"Club Agility {i}" for i in range(60)]
+    razas = ["Border Collie", "Pastor de Shetland", "Jack Russell Terrier", "Caniche", "Mestizo",
+             "Pastor Belga Malinois", "Papillon", "Pumi", "Schnauzer Miniatura", "Kelpie Australiano"]
+    feds = ["RSCE", "RFEC", "FCI"]
+    alturas = ["20", "30", "40", "50", "60"]
+    days = [("Sábado", "15/03/2025", "Agility 1, Jumping 1"), ("Domingo", "16/03/2025", "Agility 2, Jumping 2")]
+    for i in range(n):
+        ev = i // 150
+        yield {
+            "eid": f"evt{ev:04d}", "ename": f"Prueba de Agility {ev}",
+            "plist": f"https://www.flowagility.com/zone/events/evt{ev:04d}/participants_list",
+            "pid": f"booking-{i:08d}",
+            "fields": {"dorsal": str(i % 400), "guia": f"Guía Nº {i}", "perro": f"Perro {i}",
+                       "raza": rnd.choice(razas), "edad": str(rnd.randint(2, 12)),
+                       "genero": rnd.choice(["Macho", "Hembra"]), "altura_cm": rnd.choice(alturas),
+                       "nombre_pedigree": f"Pedigree {i}", "pais": "España", "licencia": f"L{i:06d}",
+                       "club": rnd.choice(clubs), "federacion": rnd.choice(feds), "equipo": ""},
+            "days": days[: rnd.randint(1, 2)],
+        }
+
+
+def _as_dicts(items, layout):
+    """Lo que construían _fields_to_participant / _payload_to_row."""
+    out = []
+    for it in items:
+        f = {k: _fresh(v) for k, v in it["fields"].items()}
+        days = [tuple(_fresh(v) for v in d) for d in it["days"]]
+        if layout == "flow":
+            out.append({"event_id": it["eid"], "event_name": it["ename"], "participants_url": it["plist"],
+                        "BinomID": it["pid"], **f, "event_title": it["ename"],
+                        "open_blocks": [dict(zip(_BLOCK_KEYS, d)) for d in days]})
+        else:
+            row = {k: f.get(s, "") for k, s in zip(GITHUB_FIELDS[1:], _GITHUB_SLOTS[1:])}
+            row = {"BinomID": it["pid"], **row}
+            for j, keys in enumerate(_SCHEDULE_KEYS):
+                for i, k in enumerate(keys):
+                    row[k] = days[j][i] if j < len(days) else ""
+            out.append(row)
+    return out
+
+
+def _as_records(items, layout):
+    out = []
+    for it in items:
+        f = {k: _fresh(v) for k, v in it["fields"].items()}
+        days = [tuple(_fresh(v) for v in d) for d in it["days"]]
+        if layout == "flow":
+            meta = event_meta(it["eid"], it["ename"], it["plist"], it["ename"])
+            out.append(Participant(meta, it["pid"], f, [dict(zip(_BLOCK_KEYS, d)) for d in days]))
+        else:
+            row = {"BinomID": it["pid"], **{k: f.get(s, "") for k, s in zip(GITHUB_FIELDS[1:], _GITHUB_SLOTS[1:])}}
+            out.append(GitHubRow(row, days))
+    return out
+
+
+def _measure(build, items):
+    tracemalloc.start()
+    base = tracemalloc.get_traced_memory()[0]
+    rows = build(items)
+    size = tracemalloc.get_traced_memory()[0] - base
+    tracemalloc.stop()
+    return rows, size
+
+
+def bench(n=10000):
+    items = list(_synthetic(n))
+    for layout, label in (("flow", "DeepSek (Participant)"), ("github", "GitHubGPT (GitHubRow)")):
+        dicts, before = _measure(lambda it: _as_dicts(it, layout), items)
+        recs, after = _measure(lambda it: _as_records(it, layout), items)
+        same = (json.dumps(dicts, ensure_ascii=False, indent=2)
+                == json.dumps(recs, ensure_ascii=False, indent=2, default=json_default))
+        print(f"📏 {label}: {n} participantes → dict {before / 1024 / 1024:.2f} MB "
+              f"({before // n} B/part.) · registro {after / 1024 / 1024:.2f} MB ({after // n} B/part.) "
+              f"→ {100 * (1 - after / before):.0f}% menos · JSON idéntico: {'sí' if same else 'NO'}")
+        del dicts, recs
+    return True
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Registros compactos de participantes")
+    ap.add_argument("cmd", choices=["bench"])
+    ap.add_argument("--n", type=int, default=10000, help="Participantes sintéticos")
+    args = ap.parse_args()
+    return bench(args.n)
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
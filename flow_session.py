@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+FLOWAGILITY - CACHÉ DE SESIÓN AUTENTICADA
+- Guarda en disco las cookies tras un login correcto (con su caducidad) y las
+  reinyecta en drivers nuevos por CDP (Network.setCookies), sin pasar por /user/login.
+- Antes de usarlas comprueba su validez con un GET barato (requests, sin seguir
+  redirecciones); si no hay requests, lo comprueba con el propio driver. Ese GET
+  consume un token "page" de flow_ratelimit, como cualquier otra página.
+- Un lock de fichero (fcntl) serializa el login: con varios workers en paralelo
+  solo uno rellena el formulario y el resto reutiliza sus cookies.
+
+Variables:
+  FLOW_SESSION_CACHE=0        desactiva la caché
+  FLOW_SESSION_FILE           ruta del fichero (por defecto ~/.cache/flowagility/)
+  FLOW_SESSION_MAX_AGE_S      vida máxima de cookies sin 'expiry' (por defecto 6 h)
+  FLOW_SESSION_CHECK_PATH     ruta protegida para validar (por defecto /zone/events)
+"""
+
+import os
+import json
+import time
+import hashlib
+from contextlib import contextmanager
+from pathlib import Path
+
+import flow_ratelimit
+
+try:
+    import fcntl
+    HAS_FCNTL = True
+except ImportError:  # Windows: sin lock entre procesos
+    HAS_FCNTL = False
+
+try:
+    import requests
+    HAS_REQUESTS = True
+except ImportError:
+    HAS_REQUESTS = False
+
+LOGIN_MARKER = "/user/login"
+
+
+def _flag(name, default="1"):
+    return os.getenv(name, default).strip().lower() in ("1", "true", "yes")
+
+
+class SessionStore:
+    """Cookies autenticadas de (base, email) persistidas en un JSON con permisos 0600."""
+
+    def __init__(self, base, email, path=None):
+        self.base = base.rstrip("/")
+        self.email = email or ""
+        if path is None:
+            path = os.getenv("FLOW_SESSION_FILE", "").strip()
+        if not path:
+            key = hashlib.sha1(f"{self.base}|{self.email}".encode("utf-8")).hexdigest()[:12]
+            path = Path.home() / ".cache" / "flowagility" / f"session_{key}.json"
+        self.path = Path(path)
+        self.max_age_s = float(os.getenv("FLOW_SESSION_MAX_AGE_S", str(6 * 3600)))
+        self.check_url = self.base + os.getenv("FLOW_SESSION_CHECK_PATH", "/zone/events")
+
+    # ---------- disco ----------
+
+    def load(self):
+        """Cookies guardadas y no caducadas, o None."""
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+        now = time.time()
+        if now - float(data.get("saved_at", 0)) > self.max_age_s:
+            return None
+        cookies = data.get("cookies") or []
+        for c in cookies:
+            exp = c.get("expiry")
+            if exp is not None and float(exp) <= now:
+                return None
+        return cookies or None
+
+    def save(self, cookies):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(".tmp")
+        tmp.write_text(json.dumps({"saved_at": time.time(), "cookies": cookies}), encoding="utf-8")
+        os.chmod(tmp, 0o600)
+        os.replace(tmp, self.path)
+
+    def invalidate(self):
+        try:
+            self.path.unlink()
+        except OSError:
+            pass
+
+    @contextmanager
+    def lock(self):
+        """Lock exclusivo entre procesos mientras se hace (o se espera) el login."""
+        if not HAS_FCNTL:
+            yield
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(str(self.path) + ".lock", "w") as fh:
+            fcntl.flock(fh, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(fh, fcntl.LOCK_UN)
+
+    # ---------- validación / inyección ----------
+
+    def is_valid(self, cookies, driver=None):
+        """True si check_url responde sin mandar a /user/login."""
+        if HAS_REQUESTS or driver is not None:
+            flow_ratelimit.acquire("page")
+        if HAS_REQUESTS:
+            jar = {c["name"]: c["value"] for c in cookies if "name" in c}
+            try:
+                r = requests.get(self.check_url, cookies=jar, allow_redirects=False, timeout=15,
+                                 headers={"User-Agent": os.getenv("CHROME_UA", "Mozilla/5.0")})
+            except requests.RequestException:
+                return False
+            if 300 <= r.status_code < 400:
+                return False
+            return r.status_code == 200 and LOGIN_MARKER not in r.url
+        if driver is not None:
+            try:
+                driver.get(self.check_url)
+                return LOGIN_MARKER not in (driver.current_url or "")
+            except Exception:
+                return False
+        return True
+
+    def inject(self, driver, cookies):
+        """Carga las cookies en el navegador sin navegar (CDP); respaldo con add_cookie."""
+        cdp = []
+        for c in cookies:
+            item = {
+                "name": c["name"], "value": c["value"],
+                "domain": c.get("domain") or self.base.split("://", 1)[-1],
+                "path": c.get("path", "/"),
+                "secure": bool(c.get("secure", False)),
+                "httpOnly": bool(c.get("httpOnly", False)),
+            }
+            if c.get("expiry") is not None:
+                item["expires"] = float(c["expiry"])
+            if c.get("sameSite"):
+                item["sameSite"] = c["sameSite"]
+            cdp.append(item)
+        try:
+            driver.execute_cdp_cmd("Network.setCookies", {"cookies": cdp})
+            return True
+        except Exception:
+            pass
+        try:
+            driver.get(self.base + "/robots.txt")
+            for c in cookies:
+                driver.add_cookie({k: v for k, v in c.items()
+                                   if k in ("name", "value", "path", "domain", "secure", "httpOnly", "expiry", "sameSite")})
+            return True
+        except Exception:
+            return False
+
+
+def _same_as_driver(driver, cookies):
+    """True si el driver ya lleva exactamente esas cookies (p. ej. relogin tras caducar)."""
+    try:
+        current = {c["name"]: c["value"] for c in driver.get_cookies()}
+    except Exception:
+        return False
+    return bool(cookies) and all(current.get(c["name"]) == c["value"] for c in cookies)
+
+
+def login(driver, form_login, base, email, log=print):
+    """
+    Login con caché: reutiliza cookies guardadas si siguen valiendo; si no, ejecuta
+    form_login(driver) bajo lock y guarda las cookies resultantes.
+    """
+    if not _flag("FLOW_SESSION_CACHE"):
+        return form_login(driver)
+
+    store = SessionStore(base, email)
+
+    def _try_cached():
+        cookies = store.load()
+        if not cookies or _same_as_driver(driver, cookies):
+            return False
+        if not store.is_valid(cookies, driver=driver):
+            return False
+        return store.inject(driver, cookies)
+
+    if _try_cached():
+        log("🍪 Sesión reutilizada desde caché (sin formulario de login)")
+        return True
+
+    with store.lock():
+        # Otro worker puede haber hecho login mientras esperábamos el lock
+        if _try_cached():
+            log("🍪 Sesión reutilizada (login hecho por otro worker)")
+            return True
+        ok = form_login(driver)
+        if ok:
+            try:
+                store.save(driver.get_cookies())
+                log("🍪 Cookies de sesión guardadas en caché")
+            except Exception as e:
+                log(f"⚠️ No se pudieron guardar las cookies: {e}")
+        else:
+            store.invalidate()
+        return ok
@@ -0,0 +1,347 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+FLOWAGILITY - ARCHIVO DE SNAPSHOTS HTML + RE-PARSEO OFFLINE
+- SNAPSHOTS=1: cada participants_list (por página), cada panel abierto (por booking_id)
+  y cada tanda de tarjetas de eventos se guarda comprimida (gzip) y direccionada por
+  contenido (sha256): el mismo HTML se guarda una sola vez.
+- index.jsonl (solo añadir) relaciona cada snapshot con su script, event_id,
+  booking_id y página; cada línea lleva también el evento (lista) o el orden (tarjetas).
+- reparse: reconstruye las salidas desde el archivo, sin navegador, en todos los núcleos:
+    deepsek → 02participants.json        (_parse_panel_html + port Python de JS_MAP_PARTICIPANT_RICH)
+    github  → participantes_detallados.json (port de JS_MAP_PARTICIPANT_RICH, variante ES)
+    events  → 01events.json               (flow_cards)
+- Límite: el re-parseo usa flow_liveview.map_participant_rich (port lxml), no el JS que
+  corre en el navegador; si el JS cambia, el port puede divergir. Por eso cada panel
+  guarda también el payload que devolvió el JS en vivo (si lo hubo) y reparse informa
+  de la paridad port/JS sobre esos paneles (los que difieren, por booking_id).
+
+    python flow_snapshots.py reparse [deepsek|github|events ...] [--out DIR] [--workers N]
+
+Variables: SNAPSHOTS (0/1), FLOW_SNAPSHOTS_DIR (por defecto OUT_DIR/snapshots).
+Si hay varios snapshots del mismo (evento, booking_id) gana el último.
+"""
+
+import os
+import sys
+import json
+import gzip
+import time
+import hashlib
+import argparse
+import importlib.util
+import multiprocessing as mp
+from pathlib import Path
+
+import flow_records
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+GITHUB_SCRIPT = SCRIPT_DIR / "02EventosProxParticipantesGitHubGPT.py"
+
+
+def enabled():
+    # Se lee en cada llamada: los scripts cargan .env después de importar este módulo
+    return os.getenv("SNAPSHOTS", "0").strip().lower() in ("1", "true", "yes")
+
+
+def _default_root():
+    custom = os.getenv("FLOW_SNAPSHOTS_DIR", "").strip()
+    return Path(custom) if custom else Path(os.getenv("OUT_DIR", "./output")) / "snapshots"
+
+
+class SnapshotArchive:
+    """objects/<sha[:2]>/<sha>.html.gz + index.jsonl bajo 'root'."""
+
+    def __init__(self, root=None):
+        self.root = Path(root) if root else _default_root()
+        self.index_path = self.root / "index.jsonl"
+
+    # ---------- blobs ----------
+
+    def _blob(self, sha):
+        return self.root / "objects" / sha[:2] / f"{sha}.html.gz"
+
+    def put(self, html):
+        data = (html or "").encode("utf-8")
+        sha = hashlib.sha256(data).hexdigest()
+        path = self._blob(sha)
+        if not path.exists():
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+            with open(tmp, "wb") as f:
+                f.write(gzip.compress(data, compresslevel=6))
+            os.replace(tmp, path)
+        return sha
+
+    def get(self, sha):
+        with gzip.open(self._blob(sha), "rb") as f:
+            return f.read().decode("utf-8")
+
+    # ---------- índice ----------
+
+    def record(self, html, **entry):
+        """Guarda el HTML y añade su línea al índice (una sola escritura O_APPEND)."""
+        entry["sha"] = self.put(html)
+        entry["ts"] = round(time.time(), 3)
+        self.root.mkdir(parents=True, exist_ok=True)
+        line = (json.dumps(entry, ensure_ascii=False) + "\n").encode("utf-8")
+        fd = os.open(self.index_path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            os.write(fd, line)
+        finally:
+            os.close(fd)
+        return entry["sha"]
+
+    def entries(self, source=None):
+        try:
+            f = open(self.index_path, encoding="utf-8")
+        except OSError:
+            return
+        with f:
+            for line in f:
+                try:
+                    e = json.loads(line)
+                except ValueError:
+                    continue  # línea a medio escribir
+                if source is None or e.get("source") == source:
+                    yield e
+
+
+_DEFAULT = None
+
+
+def archive():
+    global _DEFAULT
+    if _DEFAULT is None:
+        _DEFAULT = SnapshotArchive()
+    return _DEFAULT
+
+
+def _event_id(ev):
+    return ev.get("id") or ev.get("uuid") or ev.get("event_id") or ev.get("slug") or ""
+
+
+def save_list(source, event, page, html, url="", title=""):
+    """participants_list (una página) con el evento completo, para poder re-parsear sin 01events."""
+    if not enabled() or not html:
+        return None
+    try:
+        return archive().record(html, kind="list", source=source, event_id=_event_id(event),
+                                page=page, url=url, title=title, event=event)
+    except Exception as e:
+        print(f"[snapshots] ⚠️ No se pudo guardar la lista: {e}", flush=True)
+        return None
+
+
+def save_panel(source, event_id, pid, html, page=None, payload=None):
+    """payload: lo que devolvió JS_MAP_PARTICIPANT_RICH en vivo (para la paridad del reparse)."""
+    if not enabled() or not html:
+        return None
+    extra = {"js": payload} if isinstance(payload, dict) else {}
+    try:
+        return archive().record(html, kind="panel", source=source, event_id=event_id,
+                                booking_id=pid, page=page, **extra)
+    except Exception as e:
+        print(f"[snapshots] ⚠️ No se pudo guardar el panel {pid}: {e}", flush=True)
+        return None
+
+
+def save_cards(source, html):
+    if not enabled() or not html:
+        return None
+    try:
+        return archive().record(html, kind="cards", source=source)
+    except Exception as e:
+        print(f"[snapshots] ⚠️ No se pudieron guardar las tarjetas: {e}", flush=True)
+        return None
+
+
+# ---------------------------------------------------------------------------
+# Re-parseo offline (procesos en paralelo)
+# ---------------------------------------------------------------------------
+
+_MODULES = {}
+
+
+def _scraper(source):
+    """Módulo del script que generó los snapshots (se carga una vez por proceso)."""
+    mod = _MODULES.get(source)
+    if mod is None:
+        if source == "deepsek":
+            import flow_participants_DeepSek as mod
+        elif source == "github":
+            # El nombre empieza por dígito: no se puede importar con 'import'
+            spec = importlib.util.spec_from_file_location("eventos_github", GITHUB_SCRIPT)
+            mod = importlib.util.module_from_spec(spec)
+            spec.loader.exec_module(mod)
+        else:
+            import flow_events as mod
+        _MODULES[source] = mod
+    return mod
+
+
+def _reparse_event(task):
+    """
+    Worker: (source, root, event, url, title, [(pid, (sha, página, js))]) →
+    (filas del evento, nº de paneles con payload JS archivado, pids en que el port difiere).
+    """
+    import flow_liveview
+    source, root, event, plist, title, panels = task
+    arch = SnapshotArchive(root)
+    mod = _scraper(source)
+    eid = _event_id(event)
+    ename = event.get("nombre") or event.get("title") or event.get("name") or ""
+    rows, checked, mismatched = [], 0, []
+    for pid, (sha, page, js) in panels:
+        html = arch.get(sha)
+        payload = flow_liveview.map_participant_rich(html, pid, bilingual=(source == "deepsek"))
+        if js is not None:
+            checked += 1
+            if payload != js:
+                mismatched.append(pid)
+        if source == "deepsek":
+            bs_data = mod._parse_panel_html(html)
+            merged = mod._merge_sources(bs_data, payload)
+            # Como en vivo: el título largo (h1) solo se lee en la primera página
+            ev_title = title if page in (None, 1) else ""
+            rows.append(mod._fields_to_participant(eid, ename, plist, pid, ev_title, merged))
+        else:
+            rows.append(mod._payload_to_row(pid, payload or {}))
+    return rows, checked, mismatched
+
+
+def _reparse_cards(task):
+    source, root, sha = task
+    import flow_cards
+    mod = _scraper(source)
+    return [(c.get("id", ""), flow_cards.parse_card(c, mod.BASE, mod._clean))
+            for c in flow_cards.card_elements(SnapshotArchive(root).get(sha))]
+
+
+def _group_events(arch, source):
+    """Eventos en orden de aparición → {event, url, title, panels{pid: sha}} (gana el último)."""
+    events = {}
+    for e in arch.entries(source):
+        eid = e.get("event_id") or ""
+        slot = events.setdefault(eid, {"event": {"id": eid} if eid else {}, "url": "", "title": "", "panels": {}})
+        if e.get("kind") == "list":
+            slot["event"] = e.get("event") or slot["event"]
+            slot["url"] = e.get("url") or slot["url"]
+            if e.get("title"):
+                slot["title"] = e["title"]
+        elif e.get("kind") == "panel" and e.get("booking_id"):
+            slot["panels"].pop(e["booking_id"], None)  # conserva el orden de la última captura
+            slot["panels"][e["booking_id"]] = (e["sha"], e.get("page"), e.get("js"))
+    return [v for v in events.values() if v["panels"]]
+
+
+def _write_json(path, data):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    tmp.write_text(json.dumps(data, ensure_ascii=False, indent=2, default=flow_records.json_default),
+                   encoding="utf-8")
+    os.replace(tmp, path)
+
+
+def _report_parity(source, results):
+    """Port Python frente al payload JS archivado en vivo."""
+    checked = sum(c for _, c, _ in results)
+    mismatched = [pid for _, _, bad in results for pid in bad]
+    if not checked:
+        print(f"ℹ️ {source}: sin payloads JS archivados; paridad port/JS sin comprobar")
+    elif mismatched:
+        print(f"⚠️ {source}: el port difiere del JS en {len(mismatched)}/{checked} paneles "
+              f"(p. ej. {', '.join(mismatched[:5])})")
+    else:
+        print(f"🔍 {source}: port idéntico al JS en {checked}/{checked} paneles archivados")
+
+
+def reparse(sources, out_dir, workers=0, root=None):
+    arch = SnapshotArchive(root)
+    out_dir = Path(out_dir)
+    workers = workers or os.cpu_count() or 1
+    ctx = mp.get_context("fork") if hasattr(os, "fork") else mp.get_context()
+    t0 = time.time()
+    with ctx.Pool(processes=workers) as pool:
+        for source in sources:
+            if source == "events":
+                shas = [e["sha"] for e in arch.entries("events") if e.get("kind") == "cards"]
+                events, seen = [], set()
+                for batch in pool.imap(_reparse_cards, [("events", str(arch.root), s) for s in shas], chunksize=4):
+                    for cid, ev in batch:
+                        if cid and cid in seen:
+                            continue
+                        seen.add(cid)
+                        events.append(ev)
+                if events:
+                    _write_json(out_dir / "01events.json", events)
+                print(f"✅ events: {len(events)} eventos desde {len(shas)} snapshots de tarjetas")
+                continue
+
+            groups = _group_events(arch, source)
+            tasks = [(source, str(arch.root), g["event"], g["url"], g["title"], list(g["panels"].items()))
+                     for g in groups]
+            results = pool.map(_reparse_event, tasks, chunksize=1)
+            _report_parity(source, results)
+            results = [rows for rows, _, _ in results]
+            if source == "deepsek":
+                aggregated = [p for rows in results for p in rows]
+                _write_json(out_dir / "02participants.json", aggregated)
+                print(f"✅ deepsek: {len(aggregated)} participantes de {len(groups)} eventos → 02participants.json")
+            else:
+                now = time.strftime("%Y-%m-%dT%H:%M:%S")
+                data = []
+                for g, rows in zip(groups, results):
+                    ev = g["event"]
+                    data.append({
+                        "informacion_evento": {
+                            "event_id": ev.get("id", ""),
+                            "event_nombre": ev.get("nombre", ""),
+                            "event_fechas": ev.get("fechas", ""),
+                            "event_club": ev.get("club", ""),
+                            "event_lugar": ev.get("lugar", ""),
+                            "event_url_participantes": g["url"],
+                            "total_participantes": len(rows),
+                            "timestamp_extraccion": now,
+                        },
+                        "participantes": rows,
+                    })
+                _write_json(out_dir / "participantes_detallados.json", data)
+                print(f"✅ github: {sum(len(r) for r in results)} participantes de {len(groups)} eventos "
+                      f"→ participantes_detallados.json")
+    print(f"⏱️ Re-parseo en {time.time() - t0:.1f}s con {workers} procesos")
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Archivo de snapshots HTML de FlowAgility")
+    sub = ap.add_subparsers(dest="cmd")
+    rp = sub.add_parser("reparse", help="Reconstruye las salidas desde el archivo (sin navegador)")
+    rp.add_argument("sources", nargs="*", metavar="{deepsek,github,events}",
+                    help="Qué salidas reconstruir (por defecto, las que haya en el índice)")
+    rp.add_argument("--out", default=os.getenv("OUT_DIR", "./output"), help="Directorio de salida")
+    rp.add_argument("--workers", type=int, default=0, help="Procesos (0 = todos los núcleos)")
+    rp.add_argument("--root", default=None, help="Directorio del archivo (FLOW_SNAPSHOTS_DIR)")
+    args = ap.parse_args()
+    if args.cmd != "reparse":
+        ap.print_help()
+        return False
+
+    bad = [s for s in args.sources if s not in ("deepsek", "github", "events")]
+    if bad:
+        ap.error(f"fuente no válida: {', '.join(bad)}")
+
+    arch = SnapshotArchive(args.root)
+    sources = args.sources
+    if not sources:
+        present = {e.get("source") for e in arch.entries()}
+        sources = [s for s in ("events", "deepsek", "github") if s in present]
+    if not sources:
+        print(f"❌ No hay snapshots en {arch.root}")
+        return False
+    reparse(sources, args.out, args.workers, args.root)
+    return True
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
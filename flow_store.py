@@ -0,0 +1,481 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+FLOWAGILITY - ALMACÉN SQLITE (EVENTOS, PARTICIPANTES, HORARIOS)
+- STORE=1: cada script, además de sus JSON de siempre, hace upsert en una única base
+  SQLite (FLOW_DB, por defecto OUT_DIR/flowagility.sqlite):
+    events        una fila por evento (01events)                    clave: event_id
+    participants  una fila por binomio, evento y origen             clave: (source, event_id, BinomID)
+    schedule      días/fechas/mangas de cada binomio                clave: (source, event_id, BinomID, n)
+  source es el esquema que escribió la fila (github, deepsek, table): una pasada de
+  GitHubGPT y otra de DeepSek sobre el mismo evento comparten BinomID y no se pisan.
+- Cada esquema de salida (flow_participants, DeepSek/debug, 02EventosProxParticipantesGitHubGPT)
+  se normaliza a las mismas columnas; la fila original se guarda en 'raw' (JSON) para
+  poder regenerar los JSON de siempre.
+- Escrituras por lotes (FLOW_DB_BATCH filas) en transacciones BEGIN IMMEDIATE, WAL y
+  busy_timeout: los chunks que corren a la vez en la misma máquina comparten la base.
+- Índices en event_id, BinomID, Licencia y club.
+
+    python flow_store.py import [--out DIR]   # carga los JSON existentes de OUT_DIR
+    python flow_store.py export [--out DIR]   # 01events.json, 02participants.json,
+                                              # participantes_detallados.json desde la base
+
+Variables: STORE (0/1), FLOW_DB, FLOW_DB_BATCH (500), FLOW_DB_TIMEOUT_S (60).
+"""
+
+import os
+import re
+import sys
+import json
+import glob
+import time
+import sqlite3
+import hashlib
+import argparse
+from pathlib import Path
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS events (
+    event_id         TEXT PRIMARY KEY,
+    nombre           TEXT,
+    fechas           TEXT,
+    organizacion     TEXT,
+    club             TEXT,
+    lugar            TEXT,
+    pais_bandera     TEXT,
+    info_url         TEXT,
+    participants_url TEXT,
+    raw              TEXT,
+    updated_at       REAL
+);
+CREATE TABLE IF NOT EXISTS participants (
+    event_id         TEXT NOT NULL,
+    binom_id         TEXT NOT NULL,
+    source           TEXT NOT NULL DEFAULT '',
+    event_name       TEXT,
+    participants_url TEXT,
+    dorsal           TEXT,
+    guia             TEXT,
+    perro            TEXT,
+    raza             TEXT,
+    edad             TEXT,
+    genero           TEXT,
+    altura           TEXT,
+    nombre_pedigree  TEXT,
+    pais             TEXT,
+    licencia         TEXT,
+    club             TEXT,
+    federacion       TEXT,
+    equipo           TEXT,
+    grado            TEXT,
+    raw              TEXT,
+    updated_at       REAL,
+    PRIMARY KEY (source, event_id, binom_id)
+);
+CREATE TABLE IF NOT EXISTS schedule (
+    source    TEXT NOT NULL DEFAULT '',
+    event_id  TEXT NOT NULL,
+    binom_id  TEXT NOT NULL,
+    n         INTEGER NOT NULL,
+    day       TEXT,
+    fecha     TEXT,
+    mangas    TEXT,
+    PRIMARY KEY (source, event_id, binom_id, n)
+);
+CREATE INDEX IF NOT EXISTS ix_events_club         ON events(club);
+CREATE INDEX IF NOT EXISTS ix_participants_binom  ON participants(binom_id);
+CREATE INDEX IF NOT EXISTS ix_participants_lic    ON participants(licencia);
+CREATE INDEX IF NOT EXISTS ix_participants_club   ON participants(club);
+CREATE INDEX IF NOT EXISTS ix_participants_source ON participants(source, event_id);
+CREATE INDEX IF NOT EXISTS ix_participants_event  ON participants(event_id);
+CREATE INDEX IF NOT EXISTS ix_schedule_event      ON schedule(event_id);
+"""
+
+EVENT_COLS = ["event_id", "nombre", "fechas", "organizacion", "club", "lugar", "pais_bandera",
+              "info_url", "participants_url", "raw", "updated_at"]
+PART_COLS = ["event_id", "binom_id", "source", "event_name", "participants_url", "dorsal", "guia",
+             "perro", "raza", "edad", "genero", "altura", "nombre_pedigree", "pais", "licencia",
+             "club", "federacion", "equipo", "grado", "raw", "updated_at"]
+
+# Columna común → claves posibles en cada esquema de salida
+_ALIASES = {
+    "dorsal":          ["dorsal", "Dorsal"],
+    "guia":            ["guia", "Guía", "Guia"],
+    "perro":           ["perro", "Perro"],
+    "raza":            ["raza", "Raza"],
+    "edad":            ["edad", "Edad"],
+    "genero":          ["genero", "Género", "Genero", "sexo"],
+    "altura":          ["altura_cm", "Altura (cm)", "Altura", "altura", "talla"],
+    "nombre_pedigree": ["nombre_pedigree", "Nombre de Pedigree"],
+    "pais":            ["pais", "País", "Pais"],
+    "licencia":        ["licencia", "Licencia"],
+    "club":            ["club", "Club"],
+    "federacion":      ["federacion", "Federación", "Federacion", "fed"],
+    "equipo":          ["equipo", "Equipo"],
+    "grado":           ["grado", "Grado"],
+}
+
+
+def enabled():
+    # Se lee en cada llamada: los scripts cargan .env después de importar este módulo
+    return os.getenv("STORE", "0").strip().lower() in ("1", "true", "yes")
+
+
+def _default_path():
+    custom = os.getenv("FLOW_DB", "").strip()
+    return Path(custom) if custom else Path(os.getenv("OUT_DIR", "./output")) / "flowagility.sqlite"
+
+
+def _upsert_sql(table, cols, key):
+    updates = ", ".join(f"{c}=excluded.{c}" for c in cols if c not in key)
+    return (f"INSERT INTO {table} ({', '.join(cols)}) VALUES ({', '.join('?' * len(cols))}) "
+            f"ON CONFLICT({', '.join(key)}) DO UPDATE SET {updates}")
+
+
+_SQL_EVENT = _upsert_sql("events", EVENT_COLS, ["event_id"])
+_SQL_PART = _upsert_sql("participants", PART_COLS, ["source", "event_id", "binom_id"])
+_INDEXES = ("ix_participants_binom", "ix_participants_lic", "ix_participants_club", "ix_participants_source",
+            "ix_participants_event", "ix_schedule_event")
+
+
+def _s(v):
+    return "" if v is None else str(v)
+
+
+def _pick(row, keys):
+    for k in keys:
+        v = row.get(k)
+        if v not in (None, ""):
+            return _s(v)
+    return ""
+
+
+def _event_id(ev):
+    return _s(ev.get("id") or ev.get("uuid") or ev.get("event_id") or ev.get("slug"))
+
+
+def _binom_id(row):
+    bid = _s(row.get("BinomID") or row.get("binomid") or row.get("binom_id"))
+    if bid:
+        return bid
+    # Tablas sin BinomID (flow_participants): clave estable a partir del contenido
+    basis = json.dumps({k: v for k, v in row.items() if k not in ("raw_panel_html",)},
+                       ensure_ascii=False, sort_keys=True)
+    return "h:" + hashlib.sha1(basis.encode("utf-8")).hexdigest()[:20]
+
+
+def schedule_of(row):
+    """[(day, fecha, mangas)] de open_blocks (DeepSek) o Día/Fecha/Mangas j (GitHubGPT)."""
+    blocks = row.get("open_blocks")
+    if isinstance(blocks, list):
+        return [(_s(b.get("titulo")), _s(b.get("fecha")), _s(b.get("mangas")))
+                for b in blocks if isinstance(b, dict)]
+    out = []
+    for j in range(1, 7):
+        day, fec, man = _s(row.get(f"Día {j}")), _s(row.get(f"Fecha {j}")), _s(row.get(f"Mangas {j}"))
+        if day or fec or man:
+            out.append((day, fec, man))
+    return out
+
+
+def normalize_participant(row, source, event=None):
+    """Fila de cualquier esquema → dict con las columnas comunes de 'participants' (sin raw)."""
+    event = event or {}
+    rec = {
+        "event_id": _s(row.get("event_id")) or _event_id(event),
+        "binom_id": _binom_id(row),
+        "source": source,
+        "event_name": (_s(row.get("event_name") or row.get("event_title"))
+                       or _s(event.get("nombre") or event.get("event_nombre") or event.get("name"))),
+        "participants_url": (_s(row.get("participants_url"))
+                             or _s((event.get("enlaces") or {}).get("participantes")
+                                   or event.get("event_url_participantes"))),
+    }
+    for col, keys in _ALIASES.items():
+        rec[col] = _pick(row, keys)
+    return rec
+
+
+class Store:
+    """Conexión SQLite con upserts por lotes (una transacción por lote)."""
+
+    def __init__(self, path=None, batch=None, timeout=None):
+        self.path = Path(path) if path else _default_path()
+        self.batch = max(1, int(batch or os.getenv("FLOW_DB_BATCH", "500")))
+        timeout = float(timeout or os.getenv("FLOW_DB_TIMEOUT_S", "60"))
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # isolation_level=None: las transacciones se abren a mano (BEGIN IMMEDIATE)
+        self.db = sqlite3.connect(str(self.path), timeout=timeout, isolation_level=None)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.execute(f"PRAGMA busy_timeout={int(timeout * 1000)}")
+        self._tx(self._init_schema)
+
+    @staticmethod
+    def _init_schema(cur):
+        """Crea las tablas; las bases anteriores (clave sin source) se migran en el sitio."""
+        pk = [r[1] for r in sorted(cur.execute("PRAGMA table_info(participants)").fetchall(),
+                                   key=lambda r: r[5]) if r[5]]
+        migrate = bool(pk) and "source" not in pk
+        if migrate:
+            for ix in _INDEXES:
+                cur.execute(f"DROP INDEX IF EXISTS {ix}")
+            cur.execute("ALTER TABLE participants RENAME TO participants_v1")
+            cur.execute("ALTER TABLE schedule RENAME TO schedule_v1")
+        for stmt in SCHEMA.split(";"):
+            if stmt.strip():
+                cur.execute(stmt)
+        if migrate:
+            cols = ", ".join(PART_COLS)
+            old = ", ".join("COALESCE(source, '')" if c == "source" else c for c in PART_COLS)
+            cur.execute(f"INSERT INTO participants ({cols}) SELECT {old} FROM participants_v1")
+            # La clave vieja era (event_id, binom_id): el origen de cada horario sale de su fila
+            cur.execute("INSERT INTO schedule (source, event_id, binom_id, n, day, fecha, mangas) "
+                        "SELECT COALESCE(p.source, ''), s.event_id, s.binom_id, s.n, s.day, s.fecha, s.mangas "
+                        "FROM schedule_v1 s LEFT JOIN participants_v1 p USING (event_id, binom_id)")
+            cur.execute("DROP TABLE participants_v1")
+            cur.execute("DROP TABLE schedule_v1")
+
+    def _tx(self, fn):
+        """BEGIN IMMEDIATE toma el lock de escritura al empezar: otro proceso espera (busy_timeout)."""
+        cur = self.db.cursor()
+        cur.execute("BEGIN IMMEDIATE")
+        try:
+            fn(cur)
+        except BaseException:
+            cur.execute("ROLLBACK")
+            raise
+        cur.execute("COMMIT")
+
+    def _batched(self, items, write):
+        n = 0
+        for i in range(0, len(items), self.batch):
+            chunk = items[i:i + self.batch]
+            self._tx(lambda cur: write(cur, chunk))
+            n += len(chunk)
+        return n
+
+    # ---------- escritura ----------
+
+    def upsert_events(self, events):
+        now = time.time()
+        rows = []
+        for ev in events or []:
+            eid = _event_id(ev)
+            if not eid:
+                continue
+            links = ev.get("enlaces") or {}
+            rows.append((eid, _s(ev.get("nombre")), _s(ev.get("fechas")), _s(ev.get("organizacion")),
+                         _s(ev.get("club")), _s(ev.get("lugar")), _s(ev.get("pais_bandera")),
+                         _s(links.get("info")), _s(links.get("participantes")),
+                         json.dumps(ev, ensure_ascii=False), now))
+        return self._batched(rows, lambda cur, chunk: cur.executemany(_SQL_EVENT, chunk))
+
+    def upsert_participants(self, rows, source, event=None, replace=False):
+        """
+        rows: filas de cualquiera de los esquemas de salida. 'event' (01events o
+        informacion_evento) da event_id/nombre/url si la fila no los trae.
+        replace=True: rows es el evento completo → antes se borran las filas de ese origen
+        y evento(s), en la misma transacción. Sin BinomID la clave es un hash del contenido
+        y, si no, una fila que cambia (p. ej. Grado) dejaría la versión vieja.
+        """
+        now = time.time()
+        parts, sched = [], []
+        for r in rows or []:
+            rec = normalize_participant(r, source, event)
+            raw = {k: v for k, v in r.items() if k != "raw_panel_html"}
+            parts.append((*[rec[c] for c in PART_COLS[:19]], json.dumps(raw, ensure_ascii=False), now))
+            sched.append((source, rec["event_id"], rec["binom_id"], schedule_of(r)))
+
+        def write(cur, chunk):
+            cur.executemany(_SQL_PART, [p for p, _ in chunk])
+            for _, (src, eid, bid, days) in chunk:
+                cur.execute("DELETE FROM schedule WHERE source=? AND event_id=? AND binom_id=?", (src, eid, bid))
+                cur.executemany("INSERT INTO schedule (source, event_id, binom_id, n, day, fecha, mangas) "
+                                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                                [(src, eid, bid, n, *d) for n, d in enumerate(days, 1)])
+
+        pairs = list(zip(parts, sched))
+        if not replace:
+            return self._batched(pairs, write)
+
+        def replace_events(cur):
+            for eid in sorted({s[1] for s in sched}):
+                cur.execute("DELETE FROM participants WHERE source=? AND event_id=?", (source, eid))
+                cur.execute("DELETE FROM schedule WHERE source=? AND event_id=?", (source, eid))
+            write(cur, pairs)
+
+        self._tx(replace_events)
+        return len(pairs)
+
+    # ---------- lectura / exportación ----------
+
+    def events(self):
+        cur = self.db.execute("SELECT raw FROM events ORDER BY rowid")
+        return [json.loads(raw) for (raw,) in cur]
+
+    def participants(self, source=None, event_id=None):
+        sql, args = "SELECT raw FROM participants WHERE 1=1", []
+        if source:
+            sql += " AND source=?"; args.append(source)
+        if event_id:
+            sql += " AND event_id=?"; args.append(event_id)
+        return [json.loads(raw) for (raw,) in self.db.execute(sql + " ORDER BY rowid", args)]
+
+    def detallados(self):
+        """Esquema de participantes_detallados.json (GitHubGPT), agrupado por evento."""
+        info = {r[0]: r[1:] for r in self.db.execute(
+            "SELECT event_id, nombre, fechas, club, lugar, participants_url, updated_at FROM events")}
+        out, by_event = [], {}
+        cur = self.db.execute("SELECT event_id, event_name, participants_url, raw, updated_at "
+                              "FROM participants WHERE source='github' ORDER BY rowid")
+        for eid, ename, url, raw, ts in cur:
+            slot = by_event.get(eid)
+            if slot is None:
+                nombre, fechas, club, lugar, purl, _ = info.get(eid, (ename, "", "", "", url, ts))
+                slot = by_event[eid] = {
+                    "informacion_evento": {
+                        "event_id": eid, "event_nombre": nombre or ename, "event_fechas": fechas,
+                        "event_club": club, "event_lugar": lugar,
+                        "event_url_participantes": url or purl,
+                        "total_participantes": 0,
+                        "timestamp_extraccion": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(ts)),
+                    },
+                    "participantes": [],
+                }
+                out.append(slot)
+            slot["participantes"].append(json.loads(raw))
+            slot["informacion_evento"]["total_participantes"] += 1
+        return out
+
+    def close(self):
+        try:
+            self.db.close()
+        except Exception:
+            pass
+
+
+_DEFAULT = None
+
+
+def store():
+    global _DEFAULT
+    if _DEFAULT is None:
+        _DEFAULT = Store()
+    return _DEFAULT
+
+
+def save_events(events):
+    if not enabled() or not events:
+        return 0
+    try:
+        return store().upsert_events(events)
+    except Exception as e:
+        print(f"[store] ⚠️ No se pudieron guardar los eventos: {e}", flush=True)
+        return 0
+
+
+def save_participants(rows, source, event=None, replace=True):
+    """Los scripts guardan cada evento completo al cerrarlo: por defecto sustituye sus filas."""
+    if not enabled() or not rows:
+        return 0
+    try:
+        return store().upsert_participants(rows, source, event, replace)
+    except Exception as e:
+        print(f"[store] ⚠️ No se pudieron guardar los participantes: {e}", flush=True)
+        return 0
+
+
+# ---------------------------------------------------------------------------
+# Importación de los JSON existentes / exportación desde la base
+# ---------------------------------------------------------------------------
+
+def _load_json(path):
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"⚠️ {path}: {e}")
+        return None
+
+
+def _source_of(rows):
+    """DeepSek/debug escriben event_name + open_blocks; flow_participants, event_title + Grado."""
+    for r in rows:
+        if isinstance(r, dict):
+            return "deepsek" if "open_blocks" in r or "event_name" in r else "table"
+    return "table"
+
+
+def import_dir(st, out_dir):
+    out_dir = Path(out_dir)
+    n_ev = n_p = 0
+    for path in sorted(glob.glob(str(out_dir / "01events*.json"))):
+        data = _load_json(path)
+        if isinstance(data, dict):
+            data = data.get("events")
+        n_ev += st.upsert_events(data if isinstance(data, list) else [])
+    for path in sorted(glob.glob(str(out_dir / "participants" / "02p_*.json"))):
+        data = _load_json(path)
+        rows = data.get("participants", []) if isinstance(data, dict) else data
+        if isinstance(rows, list):
+            eid = data.get("event_id", "") if isinstance(data, dict) else ""
+            ev = {"event_id": eid or re.sub(r"^02p_", "", Path(path).stem)}
+            n_p += st.upsert_participants(rows, _source_of(rows), ev, replace=True)
+    data = _load_json(out_dir / "02participants.json") if (out_dir / "02participants.json").exists() else None
+    if isinstance(data, list):
+        n_p += st.upsert_participants(data, _source_of(data))
+    for path in sorted(glob.glob(str(out_dir / "participantes_detallados*.json"))):
+        for ev in _load_json(path) or []:
+            info = ev.get("informacion_evento") or {}
+            n_p += st.upsert_participants(ev.get("participantes") or [], "github", info, replace=True)
+    print(f"✅ Importados {n_ev} eventos y {n_p} filas de participantes → {st.path}")
+
+
+def _write_json(path, data):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    tmp.write_text(json.dumps(data, ensure_ascii=False, indent=2), encoding="utf-8")
+    os.replace(tmp, path)
+
+
+def export_dir(st, out_dir):
+    out_dir = Path(out_dir)
+    events = st.events()
+    if events:
+        _write_json(out_dir / "01events.json", events)
+    # Mismo esquema de fila en DeepSek, Scrapy y debug: el primer origen con datos
+    parts = []
+    for source in ("deepsek", "scrapy", "debug", "table"):
+        parts = st.participants(source)
+        if parts:
+            break
+    if parts:
+        _write_json(out_dir / "02participants.json", parts)
+    det = st.detallados()
+    if det:
+        _write_json(out_dir / "participantes_detallados.json", det)
+    print(f"✅ Exportados {len(events)} eventos, {len(parts)} participantes y "
+          f"{sum(len(e['participantes']) for e in det)} detallados → {out_dir}")
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Almacén SQLite de FlowAgility")
+    ap.add_argument("cmd", choices=["import", "export"])
+    ap.add_argument("--out", default=os.getenv("OUT_DIR", "./output"), help="Directorio de los JSON")
+    ap.add_argument("--db", default=None, help="Ruta de la base (FLOW_DB)")
+    args = ap.parse_args()
+    st = Store(args.db)
+    try:
+        if args.cmd == "import":
+            import_dir(st, args.out)
+        else:
+            export_dir(st, args.out)
+    finally:
+        st.close()
+    return True
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+FLOWAGILITY - THROTTLE ADAPTATIVO (AIMD)
+- Un controlador por tipo de acción ("page", "toggle", "batch", "event"…).
+- Mide la latencia de respuesta (observe) y los fallos/timeouts: mientras todo va
+  bien acorta la pausa de forma aditiva (sube la tasa); ante lentitud
+  (> SLOW_FACTOR × media) o error la multiplica. Un relogin (penalize) frena todo.
+- La pausa arranca en la media del rango fijo de siempre y nunca baja de su mínimo
+  (× THROTTLE_FLOOR_RATIO): nunca va más rápido que el caso más rápido anterior.
+- pause(..., per_unit=True) duerme cost × pausa: el mínimo también se aplica por unidad.
+- Techo global de peticiones por minuto (ventana deslizante de 60 s) en cualquier modo.
+
+THROTTLE_MODE=fixed reproduce las pausas aleatorias fijas de siempre.
+Variables: THROTTLE_MODE (adaptive|fixed), THROTTLE_RPM, THROTTLE_STEP_S,
+THROTTLE_BACKOFF, THROTTLE_SLOW_FACTOR, THROTTLE_FLOOR_RATIO.
+"""
+
+import os
+import time
+import random
+from collections import deque
+
+EWMA_ALPHA = 0.2
+WARMUP = 3
+
+
+class _Action:
+    def __init__(self, min_s, max_s, floor_ratio=1.0):
+        self.min_s = min_s
+        self.max_s = max_s
+        mid = (min_s + max_s) / 2.0
+        # Pausa objetivo; arranca en la media del rango fijo
+        self.interval = mid
+        self.floor = max(0.0, min_s * floor_ratio)
+        self.cap = max(mid * 8.0, max_s)
+        self.ewma = None
+        self.n = 0
+        self.errors = 0
+        self.slow = 0
+        self.slept = 0.0
+        self.pauses = 0
+
+
+class Throttle:
+    """
+    Pausas por acción. defaults = {accion: (min_s, max_s)} con los rangos fijos actuales;
+    rpm = techo de peticiones/minuto (0 = sin techo).
+    """
+
+    def __init__(self, defaults, rpm=0, mode=None):
+        # Se lee el entorno aquí (no al importar): los scripts cargan .env después
+        self.mode = (mode or os.getenv("THROTTLE_MODE", "adaptive")).strip().lower()
+        self.rpm = int(os.getenv("THROTTLE_RPM", str(rpm or 0)))
+        self.step_s = float(os.getenv("THROTTLE_STEP_S", "0.05"))           # s menos de pausa por éxito
+        self.backoff = float(os.getenv("THROTTLE_BACKOFF", "2.0"))          # ×pausa al fallar
+        self.slow_factor = float(os.getenv("THROTTLE_SLOW_FACTOR", "2.0"))  # latencia > factor × media
+        self.floor_ratio = float(os.getenv("THROTTLE_FLOOR_RATIO", "1.0"))
+        self.actions = {name: _Action(a, b, self.floor_ratio) for name, (a, b) in defaults.items()}
+        self.window = deque()
+
+    def _state(self, action):
+        st = self.actions.get(action)
+        if st is None:
+            st = self.actions[action] = _Action(0.5, 1.0, self.floor_ratio)
+        return st
+
+    @property
+    def adaptive(self):
+        return self.mode == "adaptive"
+
+    # ---------- pausa ----------
+
+    def _sleep(self, st, secs):
+        if secs > 0:
+            time.sleep(secs)
+            st.slept += secs
+
+    def _respect_rpm(self, st, cost):
+        if not self.rpm:
+            return
+        now = time.time()
+        while self.window and now - self.window[0] >= 60.0:
+            self.window.popleft()
+        while len(self.window) + cost > self.rpm and self.window:
+            self._sleep(st, max(0.0, 60.0 - (now - self.window[0])) + 0.01)
+            now = time.time()
+            while self.window and now - self.window[0] >= 60.0:
+                self.window.popleft()
+        for _ in range(cost):
+            self.window.append(now)
+
+    def pause(self, action, cost=1, per_unit=False):
+        """
+        Duerme lo necesario antes de la siguiente acción 'action' (cost = nº de peticiones).
+        per_unit=True: el rango es por unidad y se duerme cost × pausa (p. ej. un lote de toggles).
+        """
+        st = self._state(action)
+        st.pauses += 1
+        if self.adaptive:
+            secs = max(st.floor, st.interval * random.uniform(0.85, 1.15))
+        else:
+            secs = random.uniform(st.min_s, st.max_s)
+        self._sleep(st, secs * (cost if per_unit else 1))
+        self._respect_rpm(st, cost)
+
+    # ---------- retroalimentación ----------
+
+    def observe(self, action, latency_s, ok=True):
+        """Registra la respuesta de una acción: ajusta la pausa (AIMD) en modo adaptive."""
+        st = self._state(action)
+        st.n += 1
+        slow = (st.ewma is not None and st.n > WARMUP and latency_s > self.slow_factor * st.ewma)
+        if not ok:
+            st.errors += 1
+        if slow:
+            st.slow += 1
+        if ok:
+            st.ewma = latency_s if st.ewma is None else (1 - EWMA_ALPHA) * st.ewma + EWMA_ALPHA * latency_s
+        if not self.adaptive:
+            return
+        if not ok or slow:
+            st.interval = min(st.cap, max(st.interval, st.floor) * self.backoff)
+        else:
+            st.interval = max(st.floor, st.interval - self.step_s)
+
+    def penalize(self, factor=None):
+        """Relogin o señal de saturación: frena todas las acciones."""
+        if not self.adaptive:
+            return
+        f = factor or self.backoff
+        for st in self.actions.values():
+            st.interval = min(st.cap, max(st.interval, st.floor) * f)
+
+    # ---------- informe ----------
+
+    def summary(self):
+        return {
+            name: {
+                "mode": self.mode,
+                "interval_s": round(st.interval, 3),
+                "pauses": st.pauses,
+                "slept_s": round(st.slept, 1),
+                "observed": st.n,
+                "errors": st.errors,
+                "slow": st.slow,
+                "ewma_latency_s": round(st.ewma, 3) if st.ewma is not None else None,
+            }
+            for name, st in self.actions.items()
+        }
+
+    def report(self, log=print):
+        total = sum(st.slept for st in self.actions.values())
+        log(f"🐢 Throttle ({self.mode}, techo {self.rpm or '∞'} rpm): {total:.1f} s de pausa en total")
+        for name, st in self.summary().items():
+            if st["pauses"] or st["observed"]:
+                log(f"   {name}: {st['pauses']} pausas / {st['slept_s']} s / pausa actual {st['interval_s']} s / "
+                    f"errores {st['errors']} / lentas {st['slow']}")
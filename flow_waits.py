@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+FLOWAGILITY - ESPERAS POR EVENTOS DEL DOM
+- wait_for(driver, predicado_js, timeout): un único execute_async_script que evalúa el
+  predicado, y si aún no se cumple lo re-evalúa en cada mutación del DOM
+  (MutationObserver). Resuelve en cuanto la condición se cumple, sin sleeps.
+- Predicados de uso común: LiveView conectado (phx-connected), estado de
+  participants_list, panel de un booking_id pintado, crecimiento tras scroll.
+- STATS acumula la latencia de cada espera por etiqueta; report() la imprime.
+
+WAIT_LOG=1 imprime cada espera individual.
+"""
+
+import os
+import time
+
+WAIT_LOG = os.getenv("WAIT_LOG", "0") == "1"
+
+# Cuerpo JS común: 'pred(args)' devuelve algo truthy cuando la condición se cumple.
+_WAIT_TEMPLATE = r"""
+const args = arguments[0] || {}, timeoutMs = arguments[1];
+const done = arguments[arguments.length - 1];
+const pred = function(args){
+%s
+};
+const t0 = performance.now();
+let finished = false, timer = null, obs = null;
+function evalPred(){ try { return pred(args); } catch (e) { return null; } }
+function finish(v){
+  if (finished) return;
+  finished = true;
+  if (obs) obs.disconnect();
+  if (timer) clearTimeout(timer);
+  done({ ok: !!v, value: v || null, ms: performance.now() - t0 });
+}
+function check(){ const v = evalPred(); if (v) finish(v); }
+check();
+if (!finished){
+  obs = new MutationObserver(check);
+  obs.observe(document.documentElement, { childList: true, subtree: true, attributes: true, characterData: true });
+  timer = setTimeout(() => finish(evalPred()), timeoutMs);
+}
+"""
+
+# ---------- predicados ----------
+
+PRED_LIVEVIEW_CONNECTED = r"""
+return document.querySelector("[data-phx-main].phx-connected, .phx-connected");
+"""
+
+# 'login' | 'ok' | 'empty' (mismo criterio que el bucle de estado original)
+PRED_LIST_STATE = r"""
+if (location.pathname.indexOf("/user/login") !== -1) return "login";
+if (document.querySelector("[phx-click='booking_details_show']")) return "ok";
+const ps = document.getElementsByTagName("p");
+for (const p of ps){
+  const t = p.textContent || "";
+  if (t.indexOf("No hay") !== -1 || t.indexOf("No results") !== -1) return "empty";
+}
+return null;
+"""
+
+PRED_ELEMENT_ID = r"""
+return document.getElementById(args.id);
+"""
+
+# Panel con valores 'fuertes' (font-bold text-sm); args.grid admite también el grid 2 columnas
+PRED_PANEL_READY = r"""
+const el = document.getElementById(args.id);
+if (!el) return null;
+let sel = "div[class*='font-bold'][class*='text-sm']";
+if (args.grid) sel += ", div[class*='grid'][class*='grid-cols-2']";
+return el.querySelector(sel) ? el : null;
+"""
+
+# Crece la página tras un scroll: más alto que args.h o más nodos args.sel que args.n
+PRED_GROWTH = r"""
+const h = document.body ? document.body.scrollHeight : 0;
+const n = args.sel ? document.querySelectorAll(args.sel).length : 0;
+if ((args.h != null && h > args.h) || (args.sel && n > args.n)) return { h: h, n: n };
+return null;
+"""
+
+
+class WaitStats:
+    """Latencias por etiqueta (ms) y nº de esperas que agotaron el timeout."""
+
+    def __init__(self):
+        self.by_label = {}
+
+    def add(self, label, ms, ok):
+        st = self.by_label.setdefault(label, {"n": 0, "timeouts": 0, "ms": []})
+        st["n"] += 1
+        st["ms"].append(ms)
+        if not ok:
+            st["timeouts"] += 1
+
+    def summary(self):
+        out = {}
+        for label, st in self.by_label.items():
+            ms = sorted(st["ms"])
+            out[label] = {
+                "n": st["n"],
+                "timeouts": st["timeouts"],
+                "avg_ms": round(sum(ms) / len(ms), 1) if ms else 0.0,
+                "p95_ms": round(ms[min(len(ms) - 1, int(len(ms) * 0.95))], 1) if ms else 0.0,
+                "max_ms": round(ms[-1], 1) if ms else 0.0,
+            }
+        return out
+
+
+STATS = WaitStats()
+_SCRIPTS = {}
+
+
+def wait_for(driver, predicate_js, timeout, label="wait", args=None):
+    """
+    Espera a que predicate_js (cuerpo de función JS que recibe 'args') devuelva algo truthy.
+    Devuelve ese valor (WebElement, str, dict…) o None si vence 'timeout' o falla el script
+    (p. ej. por una navegación a mitad de espera).
+    """
+    script = _SCRIPTS.get(predicate_js)
+    if script is None:
+        script = _SCRIPTS[predicate_js] = _WAIT_TEMPLATE % predicate_js
+    t0 = time.time()
+    res = None
+    try:
+        driver.set_script_timeout(timeout + 5)
+        res = driver.execute_async_script(script, args or {}, int(max(0.0, timeout) * 1000))
+    except Exception:
+        res = None
+    ms = (time.time() - t0) * 1000
+    ok = bool(isinstance(res, dict) and res.get("ok"))
+    STATS.add(label, ms, ok)
+    if WAIT_LOG:
+        print(f"[wait] {label}: {'ok' if ok else 'timeout'} en {ms:.0f} ms", flush=True)
+    return res.get("value") if ok else None
+
+
+# ---------- atajos ----------
+
+def wait_liveview_connected(driver, timeout, label="liveview_connected"):
+    return wait_for(driver, PRED_LIVEVIEW_CONNECTED, timeout, label) is not None
+
+
+def wait_list_state(driver, timeout, label="list_state"):
+    """'login' | 'ok' | 'empty' | 'timeout' para una página participants_list."""
+    state = wait_for(driver, PRED_LIST_STATE, timeout, label)
+    if state is None and "/user/login" in (getattr(driver, "current_url", "") or ""):
+        return "login"
+    return state or "timeout"
+
+
+def wait_element_id(driver, el_id, timeout, label="element_id"):
+    return wait_for(driver, PRED_ELEMENT_ID, timeout, label, {"id": el_id})
+
+
+def wait_panel(driver, pid, timeout, grid=True, label="panel_ready"):
+    return wait_for(driver, PRED_PANEL_READY, timeout, label, {"id": pid, "grid": grid})
+
+
+def scroll_and_wait_growth(driver, timeout, height=None, selector=None, count=0, label="scroll_growth"):
+    """Scroll al final y espera a que la página crezca. Devuelve {h, n} o None si no creció."""
+    try:
+        driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
+    except Exception:
+        return None
+    return wait_for(driver, PRED_GROWTH, timeout, label, {"h": height, "sel": selector, "n": count})
+
+
+def report(log=print):
+    """Imprime la latencia de espera por etiqueta."""
+    summary = STATS.summary()
+    if not summary:
+        return summary
+    log("⏱️ Esperas (MutationObserver): etiqueta → n / avg / p95 / max / timeouts")
+    for label, st in sorted(summary.items()):
+        log(f"   {label}: {st['n']} / {st['avg_ms']:.0f} ms / {st['p95_ms']:.0f} ms / "
+            f"{st['max_ms']:.0f} ms / {st['timeouts']}")
+    return summary